@@ -22,6 +22,7 @@ export const AuthProvider = ({ children }) => {
             // The backend returns { access_token, token_type, user_id, email, role, name }
             // We'll store the token and user info
             localStorage.setItem('token', data.access_token);
+            localStorage.setItem('refresh_token', data.refresh_token);
             const userData = {
                 email: data.email,
                 role: data.role,
@@ -39,6 +40,7 @@ export const AuthProvider = ({ children }) => {
 
     const logout = () => {
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
         localStorage.removeItem('user');
         setUser(null);
     };
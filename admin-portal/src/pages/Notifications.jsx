@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { getSentNotifications, createNotification, uploadFile } from '../services/api';
+import { getSentNotifications, createNotification, uploadFile, openNotificationStream } from '../services/api';
 import { Bell, CheckCircle, Eye, Paperclip, FileText } from 'lucide-react';
 
 const Notifications = () => {
@@ -20,11 +20,16 @@ const Notifications = () => {
 
     useEffect(() => {
         fetchData();
-        const interval = setInterval(() => {
-            fetchData(true); // Pass true to indicate background refresh (optional, to avoid loading spinner if desired)
-        }, 10000); // Refresh every 10 seconds
-
-        return () => clearInterval(interval);
+        // New batches and read counts are pushed by the server instead of polled
+        return openNotificationStream({
+            batch: (batch) => setNotifications(prev =>
+                prev.some(item => item.id === batch.id) ? prev : [batch, ...prev]
+            ),
+            batch_read: ({ id, read_count }) => setNotifications(prev =>
+                prev.map(item => item.id === id ? { ...item, read_count } : item)
+            ),
+            reset: () => fetchData(true),
+        });
     }, []);
 
     const fetchData = async (isBackground = false) => {
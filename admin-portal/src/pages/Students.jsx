@@ -18,7 +18,7 @@ const Students = () => {
 
     const fetchStudents = async () => {
         try {
-            const data = await getStudents();
+            const data = await getStudents('id,admission_number,class_grade,section,gender,date_of_birth');
             setStudents(data);
         } catch (error) {
             console.error("Failed to fetch students", error);
@@ -15,7 +15,7 @@ const Teachers = () => {
 
     const fetchTeachers = async () => {
         try {
-            const data = await getTeachers();
+            const data = await getTeachers('id,full_name,email,is_active');
             setTeachers(data);
         } catch (error) {
             console.error("Failed to fetch teachers", error);
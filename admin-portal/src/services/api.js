@@ -26,6 +26,47 @@ api.interceptors.request.use(
     }
 );
 
+// Refresh tokens are single use, so requests failing together share one
+// refresh rather than each presenting the same token (which the server
+// treats as a replay and answers by revoking the whole session)
+let refreshing = null;
+
+const refreshAccessToken = (refreshToken) => {
+    if (!refreshing) {
+        refreshing = axios.post(`${API_URL}/auth/refresh`, { refresh_token: refreshToken })
+            .then(({ data }) => {
+                localStorage.setItem('token', data.access_token);
+                localStorage.setItem('refresh_token', data.refresh_token);
+                return data.access_token;
+            })
+            .finally(() => {
+                refreshing = null;
+            });
+    }
+    return refreshing;
+};
+
+// Access tokens are short-lived: on a 401, rotate the refresh token once and retry
+api.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        const refreshToken = localStorage.getItem('refresh_token');
+        if (error.response?.status === 401 && refreshToken && !original._retried) {
+            original._retried = true;
+            try {
+                const accessToken = await refreshAccessToken(refreshToken);
+                original.headers.Authorization = `Bearer ${accessToken}`;
+                return api(original);
+            } catch (refreshError) {
+                localStorage.removeItem('token');
+                localStorage.removeItem('refresh_token');
+            }
+        }
+        return Promise.reject(error);
+    }
+);
+
 export const loginUser = async (email, password) => {
     const response = await api.post('/auth/login', { email, password });
     return response.data;
@@ -36,8 +77,9 @@ export const getUserProfile = async (email) => {
     return response.data;
 };
 
-export const getStudents = async () => {
-    const response = await api.get('/users/students');
+// `fields` (e.g. 'id,class_grade') limits the response to the columns a view shows
+export const getStudents = async (fields) => {
+    const response = await api.get('/users/students', { params: fields ? { fields } : {} });
     return response.data;
 };
 
@@ -61,6 +103,28 @@ export const getAttendance = async (params) => {
     return response.data;
 };
 
+// Per-student and per-class percentages, late counts and absence streaks
+// ({ class_grade, section?, date_from?, date_to? }; defaults to this month)
+export const getAttendanceSummary = async (params) => {
+    const response = await api.get('/attendance/summary', { params });
+    return response.data;
+};
+
+// Raise one fee for every student of a grade/section
+// ({ academic_year, fee_type, amount, due_date, class_grade, section? })
+export const createFeesBulk = async (feeData) => {
+    const response = await api.post('/fees/bulk', feeData);
+    return response.data;
+};
+
+// Billed/paid/outstanding/overdue totals ({ level: 'student'|'section'|'grade',
+// academic_year?, class_grade?, section?, outstanding_only?, cursor?, limit? });
+// the next page's cursor is returned alongside the rows
+export const getFeeLedger = async (params) => {
+    const response = await api.get('/fees/ledger', { params });
+    return { rows: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
 export const markAttendance = async (attendanceData) => {
     const response = await api.post('/attendance/batch', attendanceData);
     return response.data;
@@ -101,6 +165,48 @@ export const createNotification = async (notificationData) => {
     return response.data;
 };
 
+// Server-sent events for sent batches ('batch', 'batch_read', 'reset'),
+// replacing polling of the sent list. `handlers` maps event names to
+// callbacks taking the parsed data. Returns a function closing the stream.
+export const openNotificationStream = (handlers) => {
+    let source = null;
+    let lastEventId = null;
+    let closed = false;
+
+    const open = () => {
+        const params = new URLSearchParams({ access_token: localStorage.getItem('token') || '' });
+        if (lastEventId) {
+            params.set('last_event_id', lastEventId);
+        }
+        source = new EventSource(`${API_URL}/notifications/stream?${params}`);
+        Object.entries(handlers).forEach(([name, handler]) => {
+            source.addEventListener(name, (event) => {
+                if (event.lastEventId) {
+                    lastEventId = event.lastEventId;
+                }
+                handler(JSON.parse(event.data));
+            });
+        });
+        // EventSource retries dropped connections by itself, but gives up on
+        // an error status: that is the access token expiring. Any API call
+        // refreshes it, then the stream is reopened where it left off.
+        source.onerror = () => {
+            if (source.readyState !== EventSource.CLOSED || closed) return;
+            api.get('/notifications/sent', { params: { limit: 1 } })
+                .catch(() => {})
+                .finally(() => {
+                    if (!closed) setTimeout(open, 1000);
+                });
+        };
+    };
+
+    open();
+    return () => {
+        closed = true;
+        source.close();
+    };
+};
+
 export const uploadFile = async (file) => {
     const formData = new FormData();
     formData.append('file', file);
@@ -117,8 +223,8 @@ export const getDashboardStats = async () => {
     return response.data;
 };
 
-export const getTeachers = async () => {
-    const response = await api.get('/teachers/');
+export const getTeachers = async (fields) => {
+    const response = await api.get('/teachers/', { params: fields ? { fields } : {} });
     return response.data;
 };
 
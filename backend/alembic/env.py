@@ -0,0 +1,65 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.core.config import settings
+from app.db.base_class import Base
+from app.models.user import User
+from app.models.student import StudentProfile, ParentProfile, Address, EmergencyContact
+from app.models.teacher import TeacherProfile
+from app.models.event import Holiday
+from app.models.fee import Fee, FeeReminder
+from app.models.attendance import Attendance, AttendanceDailyRollup
+from app.models.timetable import Timetable
+from app.models.result import Result
+from app.models.notification import Notification, NotificationBatch, NotificationReceipt
+from app.models.feed import Feed
+from app.models.job import Job
+from app.models.cache_version import CacheVersion
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# An explicit sqlalchemy.url (e.g. set by a test) wins over app settings
+if not config.get_main_option("sqlalchemy.url"):
+    # The same URL the app connects with: SQLALCHEMY_DATABASE_URI, or one
+    # assembled from POSTGRES_* (as on Render)
+    config.set_main_option("sqlalchemy.url", settings.assemble_db_connection.replace("%", "%%"))
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite can't ALTER most things in place
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,23 @@
+"""Baseline: the schema as built by init_db.py and the migrate_*.py scripts
+
+Existing databases are brought up to date with those scripts once and then
+stamped (`alembic stamp 0001`); new databases are created with init_db.py
+and stamped at head. Schema changes from here on are Alembic revisions.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,48 @@
+"""Indexes for the filter and sort columns of the list endpoints
+
+attendance(student_id, date) and results(student_id, exam_title, subject)
+are already covered by their unique constraints; the legacy notifications
+table is no longer read, so inbox lookups are indexed on
+notification_batches instead.
+
+On PostgreSQL the indexes are built CONCURRENTLY, outside a transaction,
+so writes are not blocked while they build.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_attendance_class_section_date", "attendance", ["class_grade", "section", "date"]),
+    ("ix_holidays_date", "holidays", ["date"]),
+    ("ix_fees_student_id", "fees", ["student_id"]),
+    ("ix_timetable_class_section_day_start", "timetable", ["class_grade", "section", "day_of_week", "start_time"]),
+    ("ix_notification_batches_target_student_id", "notification_batches", ["target_student_id"]),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, _ in INDEXES:
+                op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,45 @@
+"""Fee reminder log and the index its daily scan uses
+
+fee_reminders records each reminder sent (fee, window), so the reminder
+job can be rerun without sending duplicates. ix_fees_status_due_date lets
+it find pending fees due within the reminder windows with a range scan.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "fee_reminders",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("fee_id", sa.Integer(), sa.ForeignKey("fees.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("window_days", sa.Integer(), nullable=False),
+        sa.Column("batch_id", sa.Integer(), sa.ForeignKey("notification_batches.id"), nullable=True),
+        sa.Column("sent_on", sa.Date(), nullable=False),
+        sa.UniqueConstraint("fee_id", "window_days", name="uq_fee_reminders_fee_window"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_fee_reminders_id", "fee_reminders", ["id"], if_not_exists=True)
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_fees_status_due_date", "fees", ["status", "due_date"],
+                if_not_exists=True, postgresql_concurrently=True,
+            )
+    else:
+        op.create_index("ix_fees_status_due_date", "fees", ["status", "due_date"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fees_status_due_date", table_name="fees", if_exists=True)
+    op.drop_index("ix_fee_reminders_id", table_name="fee_reminders", if_exists=True)
+    op.drop_table("fee_reminders", if_exists=True)
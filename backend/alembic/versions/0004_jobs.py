@@ -0,0 +1,44 @@
+"""Background job queue table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_by", sa.String(), nullable=True),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("progress_done", sa.Integer(), nullable=False),
+        sa.Column("progress_total", sa.Integer(), nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"], if_not_exists=True)
+    op.create_index("ix_jobs_status_run_after", "jobs", ["status", "run_after"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_jobs_status_run_after", table_name="jobs", if_exists=True)
+    op.drop_index("ix_jobs_id", table_name="jobs", if_exists=True)
+    op.drop_table("jobs", if_exists=True)
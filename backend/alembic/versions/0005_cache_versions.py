@@ -0,0 +1,30 @@
+"""Change counters shared between the API and worker processes
+
+cache_versions holds one counter per cached subject (e.g. an exam's
+analytics), bumped by whichever process writes it, so in-process caches
+everywhere move on to fresh entries.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions", if_exists=True)
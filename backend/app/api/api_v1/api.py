@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from app.api.api_v1.endpoints import (
-    auth, users, events, fees, attendance, timetable, results, notifications, feed, dashboard, teachers, utils
+    auth, users, events, fees, attendance, timetable, results, notifications, feed, dashboard, teachers, utils, jobs
 )
 
 api_router = APIRouter()
@@ -16,3 +16,4 @@ api_router.include_router(notifications.router, prefix="/notifications", tags=["
 api_router.include_router(feed.router, prefix="/feed", tags=["feed"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(utils.router, prefix="/utils", tags=["utils"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -1,28 +1,51 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy import case, func, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.api.etag import conditional_get
+from app.api.deps import get_async_db
 from app.api.api_v1.endpoints.auth import get_db
-from app.models.attendance import Attendance
+from app.api.api_v1.endpoints.dashboard import invalidate_dashboard
+from app.api.pagination import paginate_async
+from app.api.response_cache import cache_key, cached_json, query_cache, store_json
+from app.db.upsert import bulk_upsert
+from app.models.attendance import (
+    NON_WORKING_STATUSES, Attendance, AttendanceDailyRollup, AttendanceStatus, attended_weight,
+)
 from app.models.student import StudentProfile
-from app.schemas.attendance import Attendance as AttendanceSchema, AttendanceCreate
+from app.schemas.attendance import (
+    Attendance as AttendanceSchema,
+    AttendanceCreate,
+    AttendanceSummary,
+    ClassAttendanceSummary,
+    StudentAttendanceSummary,
+)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[AttendanceSchema])
-def read_attendance(
+summary_adapter = TypeAdapter(AttendanceSummary)
+
+@router.get("/", response_model=List[AttendanceSchema], dependencies=[Depends(conditional_get)])
+async def read_attendance(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     student_id: Optional[int] = None,
     class_grade: Optional[str] = None,
     section: Optional[str] = None,
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
-    db: Session = Depends(get_db)
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Retrieve attendance records.
     """
-    query = db.query(Attendance)
+    query = select(Attendance)
     
     if student_id:
         query = query.filter(Attendance.student_id == student_id)
@@ -35,7 +58,165 @@ def read_attendance(
     if date_to:
         query = query.filter(Attendance.date <= date_to)
         
-    return query.offset(skip).limit(limit).all()
+    return await paginate_async(db, query, [(Attendance.id, False)], response, cursor=cursor, skip=skip, limit=limit)
+
+@router.get("/summary", response_model=AttendanceSummary, dependencies=[Depends(conditional_get)])
+async def read_attendance_summary(
+    class_grade: str,
+    section: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> Any:
+    """
+    Attendance percentages, late counts and absence streaks per student and
+    per class over a date range (the current month by default).
+
+    Days attended are weighted as on the dashboard (ATTENDED_WEIGHTS:
+    Present and Late 1, Half Day 0.5), over the working days recorded
+    (NON_WORKING_STATUSES rows are left out). Computed in one aggregating
+    query and cached until attendance is next written.
+    """
+    if date_from is None:
+        date_from = date.today().replace(day=1)
+    if date_to is None:
+        date_to = (date_from.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+
+    key = cache_key(
+        "attendance_summary", ["attendance"],
+        class_grade=class_grade, section=section, date_from=date_from, date_to=date_to,
+    )
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached_json(cached)
+
+    result = await db.execute(attendance_summary_query(class_grade, section, date_from, date_to))
+    summary = summarize_attendance(result.all(), date_from, date_to)
+    return store_json(key, summary_adapter, summary)
+
+def attendance_summary_query(class_grade: str, section: Optional[str], date_from: date, date_to: date):
+    """
+    One row per (student, class_grade, section) with day counts and the
+    longest run of consecutive absences.
+
+    Streaks are found with the gaps-and-islands trick: numbering each
+    student's working days, and separately their absent and non-absent days,
+    in date order, the difference between the two numbers is constant along
+    a run of consecutive days of the same kind. Rows are grouped into those
+    runs first, then per student, so the longest absence is a MAX over runs.
+    """
+    conditions = [
+        Attendance.class_grade == class_grade,
+        Attendance.date >= date_from,
+        Attendance.date <= date_to,
+        Attendance.status.notin_(NON_WORKING_STATUSES),
+    ]
+    if section:
+        conditions.append(Attendance.section == section)
+
+    is_absent = Attendance.status == AttendanceStatus.ABSENT.value
+    days = (
+        select(
+            Attendance.student_id,
+            Attendance.class_grade,
+            Attendance.section,
+            Attendance.status,
+            is_absent.label("is_absent"),
+            (
+                func.row_number().over(partition_by=Attendance.student_id, order_by=Attendance.date)
+                - func.row_number().over(partition_by=[Attendance.student_id, is_absent], order_by=Attendance.date)
+            ).label("run"),
+        )
+        .where(*conditions)
+        .subquery("days")
+    )
+
+    def count_of(*statuses: AttendanceStatus):
+        return func.sum(case((days.c.status.in_([s.value for s in statuses]), 1), else_=0))
+
+    # Collapse each run of consecutive absent (or non-absent) days to one row
+    runs = (
+        select(
+            days.c.student_id,
+            days.c.class_grade,
+            days.c.section,
+            days.c.is_absent,
+            func.count().label("days"),
+            func.sum(attended_weight(days.c.status)).label("present_days"),
+            count_of(AttendanceStatus.HALF_DAY).label("half_days"),
+            count_of(AttendanceStatus.LATE).label("late_days"),
+        )
+        .group_by(days.c.student_id, days.c.class_grade, days.c.section, days.c.is_absent, days.c.run)
+        .subquery("runs")
+    )
+    absent_run = case((runs.c.is_absent, runs.c.days), else_=0)
+
+    return (
+        select(
+            runs.c.student_id,
+            runs.c.class_grade,
+            runs.c.section,
+            func.sum(runs.c.days).label("working_days"),
+            func.sum(runs.c.present_days).label("present_days"),
+            func.sum(absent_run).label("absent_days"),
+            func.sum(runs.c.half_days).label("half_days"),
+            func.sum(runs.c.late_days).label("late_count"),
+            func.max(absent_run).label("longest_absence_streak"),
+        )
+        .group_by(runs.c.student_id, runs.c.class_grade, runs.c.section)
+        .order_by(runs.c.class_grade, runs.c.section, runs.c.student_id)
+    )
+
+def _percentage(present: float, working_days: int) -> float:
+    return round(present / working_days * 100, 1) if working_days else 0.0
+
+def summarize_attendance(rows, date_from: date, date_to: date) -> AttendanceSummary:
+    """
+    Build the summary from per-student rows, rolling them up per class and section.
+    """
+    students = []
+    classes: Dict[Tuple[Optional[str], Optional[str]], Dict[str, Any]] = {}
+    for row in rows:
+        present = float(row.present_days or 0)
+        students.append(StudentAttendanceSummary(
+            student_id=row.student_id,
+            class_grade=row.class_grade,
+            section=row.section,
+            working_days=row.working_days,
+            present_days=present,
+            absent_days=row.absent_days or 0,
+            half_days=row.half_days or 0,
+            late_count=row.late_count or 0,
+            attendance_percentage=_percentage(present, row.working_days),
+            longest_absence_streak=row.longest_absence_streak,
+        ))
+        totals = classes.setdefault((row.class_grade, row.section), Counter())
+        totals["students"] += 1
+        totals["student_days"] += row.working_days
+        totals["present_days"] += present
+        totals["absent_days"] += row.absent_days or 0
+        totals["late_count"] += row.late_count or 0
+
+    return AttendanceSummary(
+        date_from=date_from,
+        date_to=date_to,
+        classes=[
+            ClassAttendanceSummary(
+                class_grade=grade,
+                section=section,
+                students=totals["students"],
+                student_days=totals["student_days"],
+                present_days=totals["present_days"],
+                absent_days=totals["absent_days"],
+                late_count=totals["late_count"],
+                attendance_percentage=_percentage(totals["present_days"], totals["student_days"]),
+            )
+            for (grade, section), totals in classes.items()
+        ],
+        students=students,
+    )
 
 @router.post("/batch", response_model=List[AttendanceSchema])
 def mark_batch_attendance(
@@ -45,28 +226,66 @@ def mark_batch_attendance(
     """
     Mark attendance for multiple students.
     """
-    created_records = []
-    for record in attendance_in:
-        # Check if attendance already exists for this student on this date
-        existing = db.query(Attendance).filter(
-            Attendance.student_id == record.student_id,
-            Attendance.date == record.date
-        ).first()
-        
-        if existing:
-            # Update existing
-            for key, value in record.dict().items():
-                setattr(existing, key, value)
-            db.add(existing)
-            created_records.append(existing)
-        else:
-            # Create new
-            new_record = Attendance(**record.dict())
-            db.add(new_record)
-            created_records.append(new_record)
-            
+    # Statuses being overwritten, so the daily rollups can be adjusted by delta
+    keys = {(record.student_id, record.date): record.status for record in attendance_in}
+    previous = db.query(Attendance.student_id, Attendance.date, Attendance.status).filter(
+        tuple_(Attendance.student_id, Attendance.date).in_(list(keys))
+    ).all()
+
+    # Single INSERT ... ON CONFLICT (student_id, date) DO UPDATE ... RETURNING
+    records = bulk_upsert(
+        db,
+        Attendance,
+        (record.dict() for record in attendance_in),
+        index_elements=["student_id", "date"],
+    )
+    # Serialize before commit expires the returned rows (avoids a refresh per row)
+    by_key = {
+        (record.student_id, record.date): AttendanceSchema.model_validate(record)
+        for record in records
+    }
+    deltas = Counter()
+    for student_id, day, status in previous:
+        deltas[(day, status)] -= 1
+    for (student_id, day), status in keys.items():
+        deltas[(day, status)] += 1
+    apply_rollup_deltas(db, deltas)
     db.commit()
-    for record in created_records:
-        db.refresh(record)
-        
-    return created_records
+    invalidate_dashboard()
+
+    # Respond in request order, one entry per submitted record
+    return [by_key[(record.student_id, record.date)] for record in attendance_in]
+
+def apply_rollup_deltas(db: Session, deltas: Dict[Tuple[date, str], int]) -> None:
+    """
+    Add per (date, status) count changes to the daily rollups in one upsert.
+    """
+    rows = [
+        {"date": day, "status": status, "count": delta}
+        for (day, status), delta in deltas.items() if delta
+    ]
+    bulk_upsert(
+        db,
+        AttendanceDailyRollup,
+        rows,
+        index_elements=["date", "status"],
+        increment_columns=["count"],
+        returning=False,
+    )
+
+def rebuild_attendance_rollups(db: Session) -> int:
+    """
+    Regenerate the daily rollups from raw attendance rows with one GROUP BY.
+    Returns the number of rollup rows written.
+    """
+    db.query(AttendanceDailyRollup).delete(synchronize_session=False)
+    result = db.execute(
+        insert(AttendanceDailyRollup).from_select(
+            ["date", "status", "count"],
+            select(Attendance.date, Attendance.status, func.count(Attendance.id))
+            .group_by(Attendance.date, Attendance.status),
+        )
+    )
+    db.commit()
+    invalidate_dashboard()
+    return result.rowcount
@@ -1,9 +1,21 @@
+import time
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel, EmailStr
 from app.db.session import SessionLocal
+from app.api.deps import bearer_scheme, get_async_db
+from app.core.config import settings
 from app.models.user import User
-from app.core.security import get_password_hash, verify_password
+from app.models.student import StudentProfile
+from app.core.security import (
+    create_access_token, create_refresh_token, decode_token, password_hasher, revoked_tokens
+)
+from app.schemas.token import TokenRefresh
 
 router = APIRouter()
 
@@ -25,10 +37,28 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+async def _get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(
+        select(User).options(selectinload(User.student_profile)).where(User.email == email)
+    )
+    return result.scalars().first()
+
+def _issue_tokens(user: User, family: Optional[str] = None) -> dict:
+    access_token, expires_in = create_access_token(user, user.student_profile)
+    return {
+        "access_token": access_token,
+        "refresh_token": create_refresh_token(user.id, family),
+        "token_type": "bearer",
+        "expires_in": expires_in,
+    }
+
+# Password hashing runs in security.password_hasher's process pool, so these
+# endpoints are async: a burst of logins waits there without tying up the
+# request threadpool.
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user exists
-    user = db.query(User).filter(User.email == user_in.email).first()
+    user = await _get_user_by_email(db, user_in.email)
     if user:
         raise HTTPException(
             status_code=400,
@@ -38,27 +68,37 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     new_user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=await password_hasher.hash(user_in.password),
         full_name=user_in.full_name,
         role=user_in.role,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+
+    # Imported here: the dashboard module depends on this one for get_db
+    from app.api.api_v1.endpoints.dashboard import invalidate_dashboard
+    invalidate_dashboard()
     return {"email": new_user.email, "id": new_user.id}
 
 @router.post("/login")
-def login(user_in: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_in.email).first()
+async def login(user_in: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await _get_user_by_email(db, user_in.email)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     
-    if not verify_password(user_in.password, user.hashed_password):
+    verified, new_hash = await password_hasher.verify_and_update(user_in.password, user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+
+    # Transparently upgrade hashes made with an older PASSWORD_HASH_ROUNDS
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
         
     return {
-        "access_token": "fake-jwt-token", # TODO: Generate real JWT
-        "token_type": "bearer",
+        **_issue_tokens(user),
         "user": {
             "email": user.email,
             "full_name": user.full_name,
@@ -72,15 +112,72 @@ class UserChangePassword(BaseModel):
     new_password: str
 
 @router.post("/change-password")
-def change_password(user_in: UserChangePassword, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == user_in.email).first()
+async def change_password(user_in: UserChangePassword, db: AsyncSession = Depends(get_async_db)):
+    user = await _get_user_by_email(db, user_in.email)
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
     
-    if not verify_password(user_in.current_password, user.hashed_password):
+    verified, _ = await password_hasher.verify_and_update(user_in.current_password, user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=400, detail="Incorrect current password")
     
-    user.hashed_password = get_password_hash(user_in.new_password)
-    db.commit()
+    user.hashed_password = await password_hasher.hash(user_in.new_password)
+    await db.commit()
     
     return {"message": "Password updated successfully"}
+
+@router.post("/refresh")
+async def refresh_token(token_in: TokenRefresh, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchange a refresh token for a new access/refresh pair.
+
+    Refresh tokens are single use: the presented one is revoked, and replaying
+    an already-rotated token revokes its whole family (every token descended
+    from the same login), since that suggests it was stolen. Clients must
+    therefore send one refresh at a time. Revocations are tracked per
+    process (see TokenRevocationList).
+    """
+    try:
+        claims = decode_token(token_in.refresh_token, "refresh", check_revoked=False)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    family_lifetime = time.time() + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    if revoked_tokens.is_revoked(claims["fam"]):
+        raise HTTPException(status_code=401, detail="Refresh token has been revoked")
+    # Consumed before anything is awaited, so two concurrent requests with
+    # the same token cannot both get past this point
+    if not revoked_tokens.revoke_once(claims["jti"], claims["exp"]):
+        revoked_tokens.revoke(claims["fam"], family_lifetime)
+        raise HTTPException(status_code=401, detail="Refresh token has been revoked")
+
+    # Re-read the user so role and class changes reach the new access token
+    result = await db.execute(
+        select(User).options(selectinload(User.student_profile)).where(User.id == int(claims["sub"]))
+    )
+    user = result.scalars().first()
+    if not user or not user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    return _issue_tokens(user, claims["fam"])
+
+@router.post("/logout")
+async def logout(
+    token_in: TokenRefresh,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+):
+    """
+    Revoke the refresh token's family and, if sent, the current access token.
+    """
+    try:
+        claims = decode_token(token_in.refresh_token, "refresh", check_revoked=False)
+        revoked_tokens.revoke(claims["fam"], time.time() + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+    except JWTError:
+        pass
+    if credentials:
+        try:
+            access = decode_token(credentials.credentials, "access")
+            revoked_tokens.revoke(access["jti"], access["exp"])
+        except JWTError:
+            pass
+    return {"message": "Logged out"}
@@ -1,30 +1,65 @@
 from typing import Any
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from datetime import datetime, timedelta
 
-from app.api.api_v1.endpoints.auth import get_db
+from app.api.deps import get_async_db
+from app.api.response_cache import cache_key
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.models.user import User
-from app.models.attendance import Attendance, AttendanceStatus
+from app.models.attendance import NON_WORKING_STATUSES, AttendanceDailyRollup, attended_weight
 from app.models.event import Holiday
-from app.models.notification import Notification
+from app.models.notification import NotificationBatch
 from app.schemas import dashboard as dashboard_schemas
 
 router = APIRouter()
 
+# Snapshots are keyed on the versions of the tables they read (see
+# app.db.table_versions), so a write committed while one is being built
+# leaves it under a key no later request asks for
+dashboard_cache = TTLCache(ttl=settings.DASHBOARD_CACHE_TTL)
+DASHBOARD_TABLES = [
+    User.__tablename__,
+    Holiday.__tablename__,
+    AttendanceDailyRollup.__tablename__,
+    NotificationBatch.__tablename__,
+]
+
+def invalidate_dashboard() -> None:
+    """
+    Drop the cached snapshot; called by endpoints that change what it shows.
+    """
+    dashboard_cache.invalidate()
+
 @router.get("/stats", response_model=dashboard_schemas.DashboardData)
-def get_dashboard_stats(
-    db: Session = Depends(get_db)
+async def get_dashboard_stats(
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get dashboard statistics.
     """
-    # 1. Total Students
-    total_students = db.query(User).filter(User.role == "student").count()
+    key = cache_key("dashboard", DASHBOARD_TABLES)
+    snapshot = dashboard_cache.get(key)
+    if snapshot is None:
+        snapshot = await build_dashboard_snapshot(db)
+        dashboard_cache.set(key, snapshot)
+    return snapshot
 
-    # 2. Total Teachers
-    total_teachers = db.query(User).filter(User.role == "teacher").count()
+async def build_dashboard_snapshot(db: AsyncSession) -> dashboard_schemas.DashboardData:
+    """
+    Compute the dashboard from the database, reading attendance from daily rollups.
+    """
+    # 1 & 2. Total Students and Teachers
+    result = await db.execute(
+        select(User.role, func.count(User.id))
+        .where(User.role.in_(["student", "teacher"]))
+        .group_by(User.role)
+    )
+    role_counts = dict(result.all())
+    total_students = role_counts.get("student", 0)
+    total_teachers = role_counts.get("teacher", 0)
 
     # 3. Events This Month
     today = datetime.now().date()
@@ -35,26 +70,29 @@ def get_dashboard_stats(
     else:
         end_of_month = today.replace(month=today.month + 1, day=1) - timedelta(days=1)
     
-    events_count = db.query(Holiday).filter(
-        Holiday.date >= start_of_month,
-        Holiday.date <= end_of_month
-    ).count()
+    events_count = await db.scalar(
+        select(func.count(Holiday.id)).where(
+            Holiday.date >= start_of_month,
+            Holiday.date <= end_of_month
+        )
+    )
 
     # 4. Avg Attendance (Overall)
-    # Calculate percentage of 'Present' vs Total records
-    total_attendance_records = db.query(Attendance).count()
+    # Days attended (weighted as in ATTENDED_WEIGHTS) over working days, as
+    # /attendance/summary counts them, summed over the per-day rollups
+    result = await db.execute(select(
+        func.coalesce(func.sum(AttendanceDailyRollup.count), 0),
+        func.coalesce(func.sum(attended_weight(AttendanceDailyRollup.status) * AttendanceDailyRollup.count), 0),
+    ).where(AttendanceDailyRollup.status.notin_(NON_WORKING_STATUSES)))
+    total_attendance_records, weighted_present = result.one()
     if total_attendance_records > 0:
-        present_count = db.query(Attendance).filter(Attendance.status == AttendanceStatus.PRESENT).count()
-        # Half day counts as 0.5? For simplicity let's count Present as 1, Half Day as 0.5
-        half_day_count = db.query(Attendance).filter(Attendance.status == AttendanceStatus.HALF_DAY).count()
-        
-        weighted_present = present_count + (half_day_count * 0.5)
-        avg_attendance = (weighted_present / total_attendance_records) * 100
+        avg_attendance = (float(weighted_present) / total_attendance_records) * 100
     else:
         avg_attendance = 0.0
 
     # 5. Recent Notices (Limit 3)
-    recent_notices = db.query(Notification).order_by(Notification.created_at.desc()).limit(3).all()
+    result = await db.execute(select(NotificationBatch).order_by(NotificationBatch.created_at.desc()).limit(3))
+    recent_notices = result.scalars().all()
     # Format for schema
     formatted_notices = []
     for notice in recent_notices:
@@ -66,9 +104,10 @@ def get_dashboard_stats(
         ))
 
     # 6. Upcoming Events (Limit 2)
-    upcoming_events = db.query(Holiday).filter(
+    result = await db.execute(select(Holiday).where(
         Holiday.date >= today
-    ).order_by(Holiday.date.asc()).limit(2).all()
+    ).order_by(Holiday.date.asc()).limit(2))
+    upcoming_events = result.scalars().all()
     
     formatted_events = []
     for event in upcoming_events:
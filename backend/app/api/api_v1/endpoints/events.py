@@ -1,20 +1,43 @@
 from typing import List
-from fastapi import APIRouter, Depends
+from typing import Optional
+from fastapi import APIRouter, Depends, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.models.event import Holiday
 from app.schemas import event as event_schemas
+from app.api.etag import conditional_get
 from app.api.api_v1.endpoints.auth import get_db
+from app.api.pagination import paginate
+from app.api.response_cache import cache_key, cached_json, query_cache, store_json
+from app.api.api_v1.endpoints.dashboard import invalidate_dashboard
 
 router = APIRouter()
 
-@router.get("/", response_model=List[event_schemas.Holiday])
-def read_events(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+events_adapter = TypeAdapter(List[event_schemas.Holiday])
+
+@router.get("/", response_model=List[event_schemas.Holiday], dependencies=[Depends(conditional_get)])
+def read_events(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
     """
     Retrieve holidays and events.
     """
-    events = db.query(Holiday).order_by(Holiday.date).offset(skip).limit(limit).all()
-    return events
+    key = cache_key("events", ["holidays"], skip=skip, limit=limit, cursor=cursor)
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached_json(cached)
+
+    events = paginate(
+        db.query(Holiday),
+        [(Holiday.date, False), (Holiday.id, False)],
+        response, cursor=cursor, skip=skip, limit=limit,
+    )
+    return store_json(key, events_adapter, events, response)
 
 @router.post("/", response_model=event_schemas.Holiday)
 def create_event(event_in: event_schemas.HolidayCreate, db: Session = Depends(get_db)):
@@ -25,4 +48,5 @@ def create_event(event_in: event_schemas.HolidayCreate, db: Session = Depends(ge
     db.add(event)
     db.commit()
     db.refresh(event)
+    invalidate_dashboard()
     return event
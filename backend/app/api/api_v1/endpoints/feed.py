@@ -1,26 +1,39 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.etag import conditional_get
 from app.api import deps
+from app.api.pagination import paginate_async
+from app.api.response_cache import cache_key, cached_json, query_cache, store_json
 from app.models.feed import Feed
 from app.schemas.feed import Feed as FeedSchema
 
 router = APIRouter()
 
-@router.get("/", response_model=List[FeedSchema])
-def read_feeds(
-    db: Session = Depends(deps.get_db),
+feeds_adapter = TypeAdapter(List[FeedSchema])
+
+@router.get("/", response_model=List[FeedSchema], dependencies=[Depends(conditional_get)])
+async def read_feeds(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve all feeds.
     """
-    feeds = (
-        db.query(Feed)
-        .order_by(Feed.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    key = cache_key("feed", ["feeds"], skip=skip, limit=limit, cursor=cursor)
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached_json(cached)
+
+    feeds = await paginate_async(
+        db,
+        select(Feed),
+        [(Feed.created_at, True), (Feed.id, True)],
+        response, cursor=cursor, skip=skip, limit=limit,
     )
-    return feeds
+    return store_json(key, feeds_adapter, feeds, response)
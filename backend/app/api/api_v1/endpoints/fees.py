@@ -1,17 +1,37 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import logging
+import secrets
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Literal, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import String, and_, case, cast, distinct, exists, func, insert, literal, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.api import deps
-from app.models.fee import Fee
+from app.api.api_v1.endpoints.dashboard import invalidate_dashboard
+from app.api.api_v1.endpoints.notifications import publish_batch
+from app.api.etag import conditional_get
+from app.api.pagination import paginate
+from app.core.config import settings
+from app.core.pubsub import notification_broker
+from app.db.session import SessionLocal
+from app.models.fee import Fee, FeeReminder, FeeStatus
+from app.models.notification import NotificationBatch
+from app.models.student import StudentProfile
 from app.models.user import User
-from app.schemas.fee import Fee as FeeSchema
+from app.schemas.token import TokenPrincipal
+from app.schemas.fee import Fee as FeeSchema, FeeBulkCreate, FeeBulkResult, FeeLedgerEntry
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[FeeSchema])
+@router.get("/", response_model=List[FeeSchema], dependencies=[Depends(conditional_get)])
 def read_fees(
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: TokenPrincipal = Depends(deps.get_current_active_user),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
@@ -29,3 +49,220 @@ def read_fees(
         .all()
     )
     return fees
+
+@router.post("/bulk", response_model=FeeBulkResult)
+def create_fees_bulk(
+    fee_in: FeeBulkCreate,
+    db: Session = Depends(deps.get_db),
+) -> Any:
+    """
+    Raise a fee for every student of a grade (or one section of it).
+
+    A single INSERT ... SELECT over the students, so a whole grade costs one
+    statement. Reference numbers are <reference_prefix><student id>, the
+    prefix being unique to this call. Students who already have this fee
+    type for the academic year are skipped, so retrying is safe.
+    """
+    students = [StudentProfile.class_grade == fee_in.class_grade]
+    if fee_in.section:
+        students.append(StudentProfile.section == fee_in.section)
+    already_raised = exists().where(
+        Fee.student_id == StudentProfile.id,
+        Fee.academic_year == fee_in.academic_year,
+        Fee.fee_type == fee_in.fee_type,
+    )
+    eligible = db.query(func.count(StudentProfile.id)).filter(*students).scalar()
+
+    reference_prefix = f"FR/{fee_in.academic_year}/{secrets.token_hex(3).upper()}/"
+    rows = select(
+        StudentProfile.id,
+        literal(fee_in.academic_year),
+        literal(fee_in.fee_type),
+        literal(fee_in.amount),
+        literal(fee_in.due_date),
+        literal(FeeStatus.PENDING.value),
+        literal(reference_prefix) + cast(StudentProfile.id, String),
+    ).where(*students, ~already_raised)
+    result = db.execute(
+        insert(Fee).from_select(
+            ["student_id", "academic_year", "fee_type", "amount", "due_date", "status", "reference_number"], rows,
+        )
+    )
+    db.commit()
+    return FeeBulkResult(created=result.rowcount, skipped=eligible - result.rowcount, reference_prefix=reference_prefix)
+
+@router.get("/ledger", response_model=List[FeeLedgerEntry], dependencies=[Depends(conditional_get)])
+def read_fee_ledger(
+    response: Response,
+    level: Literal["student", "section", "grade"] = "student",
+    academic_year: Optional[str] = None,
+    class_grade: Optional[str] = None,
+    section: Optional[str] = None,
+    outstanding_only: bool = False,
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Any:
+    """
+    Billed, paid, outstanding and overdue totals per student, section or grade.
+
+    One grouped query per page; pages are ordered by grade, section and
+    student and continue via the X-Next-Cursor header.
+    """
+    is_paid = Fee.status == FeeStatus.PAID.value
+    # Missing grades/sections group (and sort) as "" so cursors stay comparable
+    grade = func.coalesce(StudentProfile.class_grade, "").label("class_grade")
+    section_key = func.coalesce(StudentProfile.section, "").label("section")
+    groups = {
+        "grade": [grade],
+        "section": [grade, section_key],
+        "student": [grade, section_key, StudentProfile.id.label("student_id")],
+    }[level]
+    outstanding = func.sum(case((is_paid, 0), else_=Fee.amount))
+
+    query = (
+        db.query(
+            *groups,
+            *([User.full_name.label("student_name"), StudentProfile.admission_number] if level == "student" else []),
+            func.count(distinct(Fee.student_id)).label("students"),
+            func.count(Fee.id).label("fee_count"),
+            func.sum(Fee.amount).label("total_amount"),
+            func.sum(case((is_paid, Fee.amount), else_=0)).label("paid_amount"),
+            outstanding.label("outstanding_amount"),
+            func.sum(case((and_(~is_paid, Fee.due_date < date.today()), Fee.amount), else_=0)).label("overdue_amount"),
+        )
+        .join(StudentProfile, StudentProfile.id == Fee.student_id)
+        .group_by(*groups)
+    )
+    if level == "student":
+        query = query.join(User, User.id == StudentProfile.user_id).group_by(User.full_name, StudentProfile.admission_number)
+    if academic_year:
+        query = query.filter(Fee.academic_year == academic_year)
+    if class_grade:
+        query = query.filter(StudentProfile.class_grade == class_grade)
+    if section:
+        query = query.filter(StudentProfile.section == section)
+    if outstanding_only:
+        query = query.having(outstanding > 0)
+
+    order_by = [
+        (func.coalesce(StudentProfile.class_grade, ""), False),
+        (func.coalesce(StudentProfile.section, ""), False),
+        (StudentProfile.id, False),
+    ][:len(groups)]
+    return paginate(
+        query, order_by, response, cursor=cursor, skip=skip, limit=limit,
+        key=lambda row: [getattr(row, column.key) for column in groups],
+    )
+
+def _reminder_line(fee: Any, today: date) -> str:
+    days = (fee.due_date - today).days
+    if days > 1:
+        when = f"is due in {days} days ({fee.due_date:%d %b %Y})"
+    elif days == 1:
+        when = "is due tomorrow"
+    elif days == 0:
+        when = "is due today"
+    else:
+        when = f"was due on {fee.due_date:%d %b %Y} and is overdue"
+    return f"{fee.fee_type} of Rs.{fee.amount:,.2f} {when}."
+
+def send_fee_reminders(
+    db: Session,
+    today: Optional[date] = None,
+    windows: Optional[Sequence[int]] = None,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Send one notification per student for their pending fees entering a reminder window.
+
+    A fee falls in the smallest window (days before due) that still covers
+    it, so a run missed on the 7-day mark still reminds at 1 day. Candidates
+    come from one range scan over (status, due_date) and what was already
+    sent from one more query; all notifications and their log rows are then
+    inserted in two batched statements and committed together. Reruns on
+    the same day find everything logged and insert nothing; a concurrent
+    run that loses the race on the log's unique key rolls back whole.
+    """
+    today = today or date.today()
+    windows = sorted(set(settings.FEE_REMINDER_DAYS if windows is None else windows))
+    if not windows:
+        return {"fees": 0, "students": 0, "notifications": 0}
+    in_range = [
+        Fee.status == FeeStatus.PENDING.value,
+        Fee.due_date.between(today + timedelta(days=windows[0]), today + timedelta(days=windows[-1])),
+    ]
+    candidates = (
+        db.query(Fee.id, Fee.student_id, Fee.fee_type, Fee.amount, Fee.due_date)
+        .filter(*in_range)
+        .order_by(Fee.student_id, Fee.due_date, Fee.id)
+        .all()
+    )
+    already_sent = set(
+        db.query(FeeReminder.fee_id, FeeReminder.window_days)
+        .join(Fee, Fee.id == FeeReminder.fee_id)
+        .filter(*in_range)
+        .all()
+    )
+
+    due: Dict[int, List[Any]] = defaultdict(list)
+    for fee in candidates:
+        window = next(w for w in windows if w >= (fee.due_date - today).days)
+        if (fee.id, window) not in already_sent:
+            due[fee.student_id].append((fee, window))
+    stats = {"fees": sum(len(fees) for fees in due.values()), "students": len(due), "notifications": 0}
+    if dry_run or not due:
+        return stats
+
+    students = list(due)
+    try:
+        batch_ids = db.scalars(
+            insert(NotificationBatch).returning(NotificationBatch.id, sort_by_parameter_order=True),
+            [
+                {
+                    "title": "Fee reminder",
+                    "message": " ".join(_reminder_line(fee, today) for fee, _ in due[student_id]),
+                    "target_student_id": student_id,
+                    "total_count": 1,
+                }
+                for student_id in students
+            ],
+        ).all()
+        db.execute(insert(FeeReminder), [
+            {"fee_id": fee.id, "window_days": window, "batch_id": batch_id, "sent_on": today}
+            for student_id, batch_id in zip(students, batch_ids)
+            for fee, window in due[student_id]
+        ])
+        db.commit()
+    except IntegrityError:
+        # Another run logged these reminders first (the unique key on
+        # fee_reminders fires on the insert itself, not only on commit)
+        db.rollback()
+        return {**stats, "notifications": 0}
+    invalidate_dashboard()
+    if notification_broker.active:
+        for batch in db.query(NotificationBatch).filter(NotificationBatch.id.in_(batch_ids)).order_by(NotificationBatch.id):
+            publish_batch(batch)
+    return {**stats, "notifications": len(batch_ids)}
+
+async def fee_reminder_loop(interval: float) -> None:
+    """
+    Run send_fee_reminders now and then every `interval` seconds, in a thread.
+
+    Being idempotent, it is safe for every worker process to run this.
+    """
+    while True:
+        def run() -> Dict[str, int]:
+            db = SessionLocal()
+            try:
+                return send_fee_reminders(db)
+            finally:
+                db.close()
+        try:
+            stats = await run_in_threadpool(run)
+            if stats["notifications"]:
+                logger.info("Sent %(notifications)s fee reminders covering %(fees)s fees", stats)
+        except Exception:
+            logger.exception("Fee reminder run failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,26 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.models.job import Job
+from app.schemas.job import Job as JobSchema
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=JobSchema)
+def read_job(job_id: int, db: Session = Depends(deps.get_db)) -> Any:
+    """
+    Status, progress and (once done) result of a background job.
+
+    Endpoints that queue work answer 202 with this object and a Location
+    header pointing here; poll until status is "done" or "failed".
+    """
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def accepted(job: Job, response) -> Job:
+    """Point the 202 response of an enqueueing endpoint at the job's status URL."""
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return job
@@ -1,108 +1,208 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, List, Optional
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from jose import JWTError
+from sqlalchemy import and_, case, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.models.notification import Notification, NotificationBatch
+from app.api.api_v1.endpoints.dashboard import invalidate_dashboard
+from app.api.pagination import paginate, paginate_async
+from app.core.config import settings
+from app.core.pubsub import CLOSED, RESET, Event, control_event, notification_broker
+from app.db.session import AsyncSessionLocal
+from app.models.notification import NotificationBatch, NotificationReceipt
 from app.models.student import StudentProfile
-from app.models.user import User
+from app.schemas.token import TokenPrincipal, TokenStudent
 from app.schemas.notification import Notification as NotificationSchema, NotificationUpdate, NotificationCreate, NotificationBatch as NotificationBatchSchema
-from datetime import datetime
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def audience_filter(student: StudentProfile):
+    """
+    SQL condition matching the batches addressed to `student`.
+
+    A batch targets either one student, or everyone in its grade and/or
+    section (a missing grade/section matches any), or the whole school.
+    """
+    return or_(
+        NotificationBatch.target_student_id == student.id,
+        and_(
+            NotificationBatch.target_student_id.is_(None),
+            or_(NotificationBatch.target_grade.is_(None), NotificationBatch.target_grade == student.class_grade),
+            or_(NotificationBatch.target_section.is_(None), NotificationBatch.target_section == student.section),
+        ),
+    )
+
+def is_addressed_to(
+    target_student_id: Optional[int],
+    target_grade: Optional[str],
+    target_section: Optional[str],
+    student: TokenStudent,
+) -> bool:
+    """
+    audience_filter evaluated in Python, for a batch's targeting fields.
+    """
+    if target_student_id:
+        return target_student_id == student.id
+    return (
+        (not target_grade or target_grade == student.class_grade)
+        and (not target_section or target_section == student.section)
+    )
+
+def audience_query(db: Session, batch: NotificationBatch):
+    """
+    Query for the students a batch is addressed to.
+    """
+    query = db.query(StudentProfile)
+    if batch.target_student_id:
+        return query.filter(StudentProfile.id == batch.target_student_id)
+    if batch.target_grade:
+        query = query.filter(StudentProfile.class_grade == batch.target_grade)
+    if batch.target_section:
+        query = query.filter(StudentProfile.section == batch.target_section)
+    return query
+
+def inbox_item(batch: NotificationBatch, student_id: Any, is_read: bool) -> NotificationSchema:
+    """
+    Present a batch as an inbox notification; the batch id doubles as the notification id.
+    """
+    return NotificationSchema(
+        id=batch.id,
+        title=batch.title,
+        message=batch.message,
+        is_read=is_read,
+        attachment_url=batch.attachment_url,
+        student_id=student_id,
+        batch_id=batch.id,
+        created_at=batch.created_at,
+    )
 
 @router.get("/", response_model=List[NotificationSchema])
-def read_notifications(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+async def read_notifications(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: TokenPrincipal = Depends(deps.get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve notifications for the current student.
     """
     if not current_user.student_profile:
         raise HTTPException(status_code=404, detail="Student profile not found")
-    
+
+    profile = current_user.student_profile
+    # 0/1 rather than a boolean so it can take part in keyset comparisons
+    is_read = case((NotificationReceipt.id.isnot(None), 1), else_=0)
     try:
-        notifications = (
-            db.query(Notification)
-            .filter(
-                (Notification.student_id == current_user.student_profile.id) | 
-                (Notification.student_id == None)
+        query = (
+            select(NotificationBatch, is_read)
+            .outerjoin(
+                NotificationReceipt,
+                and_(
+                    NotificationReceipt.batch_id == NotificationBatch.id,
+                    NotificationReceipt.student_id == profile.id,
+                ),
             )
-            .order_by(Notification.is_read.asc(), Notification.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-            .all()
+            .where(audience_filter(profile))
+        )
+        rows = await paginate_async(
+            db,
+            query,
+            [(is_read, False), (NotificationBatch.created_at, True), (NotificationBatch.id, True)],
+            response, cursor=cursor, skip=skip, limit=limit,
+            key=lambda row: [row[1], row[0].created_at, row[0].id],
+            scalars=False,
         )
-        return notifications
-    except Exception as e:
-        print(f"Error fetching notifications: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        return [inbox_item(batch, profile.id, bool(read)) for batch, read in rows]
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Failed to fetch notifications for student %s", profile.id)
+        raise HTTPException(status_code=500, detail="Could not fetch notifications")
 
 @router.put("/{notification_id}/read", response_model=NotificationSchema)
 def mark_notification_as_read(
     notification_id: int,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: TokenPrincipal = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Mark a notification as read.
     """
-    notification = db.query(Notification).filter(Notification.id == notification_id).first()
-    if not notification:
+    if not current_user.student_profile:
+        raise HTTPException(status_code=404, detail="Student profile not found")
+
+    profile = current_user.student_profile
+    batch = db.query(NotificationBatch).filter(NotificationBatch.id == notification_id).first()
+    if not batch:
         raise HTTPException(status_code=404, detail="Notification not found")
-    
-    # Ensure the notification belongs to the user (or is global)
-    if notification.student_id and notification.student_id != current_user.student_profile.id:
+
+    # Ensure the notification is addressed to the user (or is global)
+    if not is_addressed_to(batch.target_student_id, batch.target_grade, batch.target_section, profile):
         raise HTTPException(status_code=403, detail="Not authorized to access this notification")
 
-    notification.is_read = True
-    db.commit()
-    db.refresh(notification)
-    return notification
+    receipt = db.query(NotificationReceipt).filter(
+        NotificationReceipt.batch_id == batch.id,
+        NotificationReceipt.student_id == profile.id,
+    ).first()
+    if not receipt:
+        db.add(NotificationReceipt(batch_id=batch.id, student_id=profile.id))
+        db.query(NotificationBatch).filter(NotificationBatch.id == batch.id).update(
+            {NotificationBatch.read_count: NotificationBatch.read_count + 1},
+            synchronize_session=False,
+        )
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent request already recorded the receipt (and counted it)
+            db.rollback()
+        else:
+            publish_read(db, batch.id, profile.id)
+    return inbox_item(batch, profile.id, True)
 
 @router.get("/sent", response_model=List[NotificationBatchSchema])
 def read_sent_notifications(
+    response: Response,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: TokenPrincipal = Depends(deps.get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Retrieve sent notification batches with statistics.
     """
     # Ideally check for admin/teacher role
-    
-    batches = (
-        db.query(NotificationBatch)
-        .order_by(NotificationBatch.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+
+    # total_count/read_count are stored on the batch, so this is a single query
+    batches = paginate(
+        db.query(NotificationBatch),
+        [(NotificationBatch.created_at, True), (NotificationBatch.id, True)],
+        response, cursor=cursor, skip=skip, limit=limit,
     )
-    
-    # Calculate stats for each batch
-    # This could be optimized with a group by query, but loop is fine for now
-    for batch in batches:
-        total = db.query(Notification).filter(Notification.batch_id == batch.id).count()
-        read = db.query(Notification).filter(Notification.batch_id == batch.id, Notification.is_read == True).count()
-        batch.total_count = total
-        batch.read_count = read
-        
     return batches
 
 @router.post("/", response_model=NotificationSchema)
 def create_notification(
     notification_in: NotificationCreate,
     db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+    current_user: TokenPrincipal = Depends(deps.get_current_active_user),
 ):
     """
-    Create a new notification batch and individual notifications.
+    Create a notification batch.
+
+    Only the batch and its targeting rules are stored; each student's inbox
+    is resolved against it on read, so sending is a single insert no matter
+    how many students it reaches.
     """
-    
-    # Create Batch Record
     batch = NotificationBatch(
         title=notification_in.title,
         message=notification_in.message,
@@ -111,70 +211,170 @@ def create_notification(
         target_student_id=notification_in.student_id,
         attachment_url=notification_in.attachment_url
     )
+    # Snapshot the audience size at send time
+    batch.total_count = audience_query(db, batch).count()
     db.add(batch)
     db.commit()
     db.refresh(batch)
-    
-    created_notifications = []
-
-    # Logic 1: Specific Student ID provided
-    if notification_in.student_id:
-        notification = Notification(
-            title=notification_in.title,
-            message=notification_in.message,
-            student_id=notification_in.student_id,
-            batch_id=batch.id,
-            attachment_url=notification_in.attachment_url
+    invalidate_dashboard()
+    publish_batch(batch)
+
+    return inbox_item(batch, notification_in.student_id, False)
+
+def recompute_batch_counters(db: Session) -> int:
+    """
+    Recompute read_count for every batch from its receipts, in one UPDATE.
+
+    total_count is the audience size snapshotted at send time and is kept:
+    recounting today's classes would rewrite it for students who have since
+    joined or left. It is only raised where it is below the read count,
+    which no consistent batch can be. Returns the number of batches updated.
+    """
+    reads = (
+        select(func.count(NotificationReceipt.id))
+        .where(NotificationReceipt.batch_id == NotificationBatch.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(NotificationBatch)
+        .values(
+            read_count=reads,
+            total_count=case((NotificationBatch.total_count < reads, reads), else_=NotificationBatch.total_count),
         )
-        db.add(notification)
-        created_notifications.append(notification)
-
-    # Logic 2: Grade and/or Section provided
-    elif notification_in.grade or notification_in.section:
-        from app.models.student import StudentProfile
-        
-        query = db.query(StudentProfile)
-        if notification_in.grade:
-            query = query.filter(StudentProfile.class_grade == notification_in.grade)
-        if notification_in.section:
-            query = query.filter(StudentProfile.section == notification_in.section)
-            
-        students = query.all()
-        
-        for student in students:
-            notification = Notification(
-                title=notification_in.title,
-                message=notification_in.message,
-                student_id=student.id,
-                batch_id=batch.id,
-                attachment_url=notification_in.attachment_url
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+def is_staff(principal: TokenPrincipal) -> bool:
+    return principal.role != "student"
+
+def _student(student_id: int) -> Callable[[TokenPrincipal], bool]:
+    return lambda principal: principal.student_profile is not None and principal.student_profile.id == student_id
+
+def publish_batch(batch: NotificationBatch) -> None:
+    """
+    Push a newly sent batch to connected staff and the students it is addressed to.
+    """
+    targets = (batch.target_student_id, batch.target_grade, batch.target_section)
+    notification_broker.publish(
+        "notification",
+        inbox_item(batch, batch.target_student_id, False).model_dump(mode="json"),
+        lambda principal: principal.student_profile is not None and is_addressed_to(*targets, principal.student_profile),
+    )
+    notification_broker.publish("batch", NotificationBatchSchema.model_validate(batch).model_dump(mode="json"), is_staff)
+
+def publish_read(db: Session, batch_id: int, student_id: int) -> None:
+    """
+    Push a newly recorded receipt: to the student's other connections, and
+    the batch's new read count to staff.
+    """
+    notification_broker.publish("read", {"id": batch_id}, _student(student_id))
+    read_count = db.query(NotificationBatch.read_count).filter(NotificationBatch.id == batch_id).scalar()
+    notification_broker.publish("batch_read", {"id": batch_id, "read_count": read_count}, is_staff)
+
+async def _unread_count_event(student: TokenStudent) -> Event:
+    async with AsyncSessionLocal() as db:
+        count = await db.scalar(
+            select(func.count(NotificationBatch.id))
+            .outerjoin(
+                NotificationReceipt,
+                and_(NotificationReceipt.batch_id == NotificationBatch.id, NotificationReceipt.student_id == student.id),
             )
-            db.add(notification)
-            created_notifications.append(notification)
-
-    # Logic 3: Global Notification (no student_id, no grade, no section)
-    else:
-        notification = Notification(
-            title=notification_in.title,
-            message=notification_in.message,
-            student_id=None,
-            batch_id=batch.id,
-            attachment_url=notification_in.attachment_url
+            .where(audience_filter(student), NotificationReceipt.id.is_(None))
         )
-        db.add(notification)
-        created_notifications.append(notification)
+    return control_event("unread_count", {"count": count})
 
-    db.commit()
-    
-    # Return the first one or a dummy one linked to the batch
-    if created_notifications:
-        return created_notifications[0]
-    else:
-        return Notification(
-            id=0, 
-            title=notification_in.title, 
-            message=notification_in.message, 
-            student_id=None, 
-            batch_id=batch.id,
-            created_at=datetime.now()
-        )
+async def notification_events(principal: TokenPrincipal, last_event_id: Optional[str]) -> AsyncIterator[Optional[Event]]:
+    """
+    Events for one stream connection, with None whenever a keep-alive is due.
+
+    A fresh connection starts with the student's unread count; one resuming
+    from `last_event_id` gets the events it missed instead, or a "reset"
+    (refetch) and the count if they are gone. The database is only used for
+    that count, so an idle connection holds no session. The stream ends
+    when the access token expires, making the client reconnect with a
+    fresh one.
+    """
+    subscription = notification_broker.subscribe(principal, last_event_id)
+    try:
+        if not last_event_id and principal.student_profile:
+            yield await _unread_count_event(principal.student_profile)
+        while True:
+            remaining = principal.exp - time.time()
+            if remaining <= 0:
+                return
+            event = await subscription.next(min(settings.NOTIFICATION_STREAM_HEARTBEAT, remaining))
+            if event is CLOSED:
+                return
+            yield event
+            if event is RESET and principal.student_profile:
+                yield await _unread_count_event(principal.student_profile)
+    finally:
+        subscription.close()
+
+@router.get("/stream", response_class=StreamingResponse)
+async def notification_stream(
+    request: Request,
+    current_user: TokenPrincipal = Depends(deps.get_stream_user),
+    last_event_id: Optional[str] = None,
+) -> Any:
+    """
+    Server-sent events replacing polling of the inbox and sent list.
+
+    Students get "notification" (a new inbox item), "read" (marked read on
+    another device) and "unread_count"; staff get "batch" (a new sent batch)
+    and "batch_read" (its new read count). "reset" means events were missed:
+    refetch. Resumes from the Last-Event-ID header, or `?last_event_id=` when
+    the client reconnects by hand.
+    """
+    last_event_id = request.headers.get("last-event-id") or last_event_id
+
+    async def frames() -> AsyncIterator[bytes]:
+        yield b"retry: 3000\n\n"
+        async for event in notification_events(current_user, last_event_id):
+            yield b": keep-alive\n\n" if event is None else event.sse()
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        # X-Accel-Buffering stops nginx holding events back
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+PING = control_event("ping", {})
+
+@router.websocket("/ws")
+async def notification_socket(
+    websocket: WebSocket,
+    access_token: Optional[str] = None,
+    last_event_id: Optional[str] = None,
+):
+    """
+    The /stream events over a WebSocket, as {"id", "event", "data"} messages.
+
+    For clients without EventSource (React Native). A "ping" is sent when
+    idle; pass the last id seen as `?last_event_id=` when reconnecting.
+    """
+    try:
+        principal = deps.principal_from_token(access_token or "")
+    except JWTError:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    async with anyio.create_task_group() as tasks:
+        async def watch_disconnect() -> None:
+            # Nothing is expected from the client; this only notices it leaving
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+            tasks.cancel_scope.cancel()
+
+        tasks.start_soon(watch_disconnect)
+        try:
+            async for event in notification_events(principal, last_event_id):
+                await websocket.send_text((event or PING).message())
+            await websocket.close()
+        except WebSocketDisconnect:
+            pass
+        tasks.cancel_scope.cancel()
@@ -1,20 +1,71 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import csv
+import io
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
+from fastapi.responses import FileResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import case, func, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from app.api.etag import conditional_get
+from app.api.api_v1.endpoints.attendance import attendance_summary_query
 from app.api.api_v1.endpoints.auth import get_db
+from app.api.api_v1.endpoints.jobs import accepted
+from app.api.pagination import paginate
+from app.api.response_cache import cached_json, query_cache, store_json
+from app.core.config import settings
+from app.core.jobs import JobContext, PermanentJobError, enqueue, job_handler
+from app.core.report_cards import report_card_generator
+from app.db.table_versions import bump_shared_versions, shared_version, table_versions
+from app.db.upsert import bulk_upsert
+from app.models.job import Job
 from app.models.result import Result
 from app.models.student import StudentProfile
-from app.schemas.result import Result as ResultSchema, ResultCreate
+from app.models.user import User
+from app.schemas.job import Job as JobSchema
+from app.schemas.result import (
+    ExamAnalytics,
+    ExamStudentResult,
+    ReportCardRequest,
+    Result as ResultSchema,
+    ResultCreate,
+    ResultImportError,
+    ResultImportReport,
+    SubjectStatistics,
+)
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ResultSchema])
+RESULT_KEY = ["student_id", "exam_title", "subject"]
+IMPORT_CHUNK_SIZE = 1000
+MAX_IMPORT_ERRORS = 1000
+
+analytics_adapter = TypeAdapter(ExamAnalytics)
+
+def exam_version_name(exam_title: str) -> str:
+    """
+    Shared change counter for one exam's marks, so writing marks for one
+    exam retires only that exam's cached analytics. Kept in the database as
+    imports run in worker processes.
+    """
+    return f"exam:{exam_title}"
+
+@router.get("/", response_model=List[ResultSchema], dependencies=[Depends(conditional_get)])
 def read_results(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     student_id: Optional[int] = None,
     exam_title: Optional[str] = None,
     subject: Optional[str] = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ) -> Any:
     """
@@ -29,7 +80,267 @@ def read_results(
     if subject:
         query = query.filter(Result.subject == subject)
         
-    return query.offset(skip).limit(limit).all()
+    return paginate(query, [(Result.id, False)], response, cursor=cursor, skip=skip, limit=limit)
+
+@router.get("/analytics", response_model=ExamAnalytics, dependencies=[Depends(conditional_get)])
+def read_exam_analytics(
+    exam_title: str,
+    class_grade: Optional[str] = None,
+    section: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Per-student totals, percentages, ranks and percentiles for an exam, and
+    per-subject mean/median/stddev and grade distribution.
+
+    Everything is aggregated in the database (window functions for ranks and
+    medians). Responses are cached per exam until marks for that exam are
+    written again.
+    """
+    key = (
+        "exam_analytics",
+        shared_version(db, exam_version_name(exam_title)),
+        table_versions.get("student_profiles"),
+        exam_title, class_grade, section,
+    )
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached_json(cached)
+
+    conditions = [Result.exam_title == exam_title]
+    if class_grade:
+        conditions.append(StudentProfile.class_grade == class_grade)
+    if section:
+        conditions.append(StudentProfile.section == section)
+
+    analytics = ExamAnalytics(
+        exam_title=exam_title,
+        class_grade=class_grade,
+        section=section,
+        students=_student_standings(db, conditions),
+        subjects=_subject_statistics(db, conditions),
+    )
+    return store_json(key, analytics_adapter, analytics)
+
+def _student_standings(db: Session, conditions: list) -> List[ExamStudentResult]:
+    """
+    Totals per student, ranked by percentage (ties share a rank).
+
+    Percentile is the share of the other students scoring strictly lower,
+    so the top scorer is at 100 and the lowest at 0.
+    """
+    totals = (
+        select(
+            Result.student_id,
+            StudentProfile.class_grade,
+            StudentProfile.section,
+            func.count(Result.id).label("subjects"),
+            func.sum(Result.marks_obtained).label("marks_obtained"),
+            func.sum(Result.total_marks).label("total_marks"),
+        )
+        .join(StudentProfile, StudentProfile.id == Result.student_id)
+        .where(*conditions)
+        .group_by(Result.student_id, StudentProfile.class_grade, StudentProfile.section)
+        .subquery("totals")
+    )
+    percentage = case(
+        (totals.c.total_marks > 0, totals.c.marks_obtained * 100.0 / totals.c.total_marks),
+        else_=0.0,
+    )
+    rows = db.execute(
+        select(
+            totals,
+            percentage.label("percentage"),
+            func.rank().over(order_by=percentage.desc()).label("rank"),
+            func.percent_rank().over(order_by=percentage).label("percent_rank"),
+        ).order_by(percentage.desc(), totals.c.student_id)
+    )
+    return [
+        ExamStudentResult(
+            student_id=row.student_id,
+            class_grade=row.class_grade,
+            section=row.section,
+            subjects=row.subjects,
+            marks_obtained=row.marks_obtained,
+            total_marks=row.total_marks,
+            percentage=round(row.percentage, 2),
+            rank=row.rank,
+            percentile=round(row.percent_rank * 100, 1),
+        )
+        for row in rows
+    ]
+
+def _subject_statistics(db: Session, conditions: list) -> List[SubjectStatistics]:
+    """
+    Mark statistics per subject from two grouped queries.
+
+    The median averages the one or two middle rows of each subject, found by
+    numbering its marks in order; the standard deviation (population) comes
+    from the mean and the mean of squares, as SQLite has no STDDEV.
+    """
+    scored = (
+        select(
+            Result.subject,
+            Result.marks_obtained.label("marks"),
+            func.row_number().over(partition_by=Result.subject, order_by=Result.marks_obtained).label("position"),
+            func.count().over(partition_by=Result.subject).label("n"),
+        )
+        .join(StudentProfile, StudentProfile.id == Result.student_id)
+        .where(*conditions)
+        .subquery("scored")
+    )
+    middle = scored.c.position.in_([(scored.c.n + 1) // 2, (scored.c.n + 2) // 2])
+    stats = db.execute(
+        select(
+            scored.c.subject,
+            func.count().label("students"),
+            func.avg(scored.c.marks).label("mean"),
+            func.avg(scored.c.marks * scored.c.marks).label("mean_square"),
+            func.min(scored.c.marks).label("min"),
+            func.max(scored.c.marks).label("max"),
+            func.avg(case((middle, scored.c.marks))).label("median"),
+        )
+        .group_by(scored.c.subject)
+        .order_by(scored.c.subject)
+    ).all()
+
+    distribution = {}
+    for subject, grade, count in db.execute(
+        select(Result.subject, Result.grade, func.count())
+        .join(StudentProfile, StudentProfile.id == Result.student_id)
+        .where(*conditions)
+        .group_by(Result.subject, Result.grade)
+        .order_by(Result.subject, Result.grade)
+    ):
+        distribution.setdefault(subject, {})[grade] = count
+
+    return [
+        SubjectStatistics(
+            subject=row.subject,
+            students=row.students,
+            mean=round(row.mean, 2),
+            median=round(row.median, 2),
+            stddev=round(math.sqrt(max(row.mean_square - row.mean ** 2, 0.0)), 2),
+            min=row.min,
+            max=row.max,
+            grade_distribution=distribution.get(row.subject, {}),
+        )
+        for row in stats
+    ]
+
+@router.post("/report-cards", response_model=JobSchema, status_code=202)
+def create_report_cards(
+    request: ReportCardRequest,
+    response: Response,
+    db: Session = Depends(get_db),
+) -> Any:
+    """
+    Queue rendering of report card PDFs for a class and exam.
+
+    Poll the returned job (GET /jobs/{id}) for progress; its result carries
+    the throughput, and the zip is served by .../report-cards/{id}/download.
+    """
+    return accepted(enqueue(db, "results.report_cards", request.model_dump(mode="json")), response)
+
+@router.get("/report-cards/{job_id}/download")
+def download_report_cards(job_id: int, db: Session = Depends(get_db)) -> Any:
+    """
+    The finished batch as a zip of per-student PDFs.
+    """
+    job = db.get(Job, job_id)
+    if not job or job.kind != "results.report_cards":
+        raise HTTPException(status_code=404, detail="Report card job not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Report cards are not ready (status: {job.status})")
+    path = job.result["path"]
+    if not os.path.exists(path):
+        # Finished zips are pruned a day after they are rendered
+        raise HTTPException(status_code=410, detail="Report cards have expired; generate them again")
+    request = job.payload
+    section = f"-{request['section']}" if request.get("section") else ""
+    filename = re.sub(r"\W+", "_", f"{request['exam_title']} class {request['class_grade']}{section}").strip("_") + ".zip"
+    return FileResponse(path, media_type="application/zip", filename=filename)
+
+@job_handler("results.report_cards")
+def generate_report_cards(db: Session, context: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    cards = build_report_cards(db, ReportCardRequest(**payload))
+    db.rollback()  # release the read transaction while rendering
+    context.progress(0, len(cards))
+    return report_card_generator.render(cards, f"job-{context.job_id}", progress=context.progress)
+
+def build_report_cards(db: Session, request: ReportCardRequest) -> List[Dict[str, Any]]:
+    """
+    Gather everything the cards show for a class in a fixed number of queries.
+
+    Returns one plain dict per student (cheap to send to render workers).
+    """
+    conditions = [Result.exam_title == request.exam_title, StudentProfile.class_grade == request.class_grade]
+    if request.section:
+        conditions.append(StudentProfile.section == request.section)
+
+    standings = _student_standings(db, conditions)
+    if not standings:
+        return []
+
+    subjects: Dict[int, List[Dict[str, Any]]] = {}
+    exam_date = None
+    for result in db.query(Result).join(StudentProfile, StudentProfile.id == Result.student_id).filter(
+        *conditions
+    ).order_by(Result.student_id, Result.subject):
+        subjects.setdefault(result.student_id, []).append({
+            "subject": result.subject,
+            "marks_obtained": result.marks_obtained,
+            "total_marks": result.total_marks,
+            "grade": result.grade,
+        })
+        exam_date = max(exam_date or result.exam_date, result.exam_date)
+
+    students = {
+        row.id: row
+        for row in db.query(
+            StudentProfile.id, StudentProfile.admission_number, StudentProfile.class_grade,
+            StudentProfile.section, User.full_name,
+        ).join(User, User.id == StudentProfile.user_id).filter(
+            StudentProfile.id.in_([standing.student_id for standing in standings])
+        )
+    }
+
+    # Indian academic years start in June
+    attendance_to = request.attendance_to or exam_date
+    attendance_from = request.attendance_from or date(
+        attendance_to.year if attendance_to.month >= 6 else attendance_to.year - 1, 6, 1
+    )
+    attendance = {
+        row.student_id: row
+        for row in db.execute(attendance_summary_query(
+            request.class_grade, request.section, attendance_from, attendance_to,
+        ))
+    }
+
+    cards = []
+    for standing in standings:
+        student = students[standing.student_id]
+        name = student.full_name or f"Student {student.id}"
+        days = attendance.get(student.id)
+        cards.append({
+            "filename": re.sub(r"\W+", "_", f"{student.admission_number or student.id} {name}").strip("_") + ".pdf",
+            "exam_title": request.exam_title,
+            "class_size": len(standings),
+            "student": {
+                "name": name,
+                "admission_number": student.admission_number,
+                "class_grade": student.class_grade,
+                "section": student.section,
+            },
+            "subjects": subjects.get(student.id, []),
+            "standing": standing.model_dump(),
+            "attendance": {
+                "working_days": days.working_days,
+                "present_days": float(days.present_days or 0),
+                "attendance_percentage": round(float(days.present_days or 0) / days.working_days * 100, 1),
+            } if days and days.working_days else None,
+        })
+    return cards
 
 @router.post("/batch", response_model=List[ResultSchema])
 def create_batch_results(
@@ -39,29 +350,157 @@ def create_batch_results(
     """
     Create or update results for multiple students.
     """
-    created_results = []
-    for result in results_in:
-        # Check if result already exists for this student, exam, and subject
-        existing = db.query(Result).filter(
-            Result.student_id == result.student_id,
-            Result.exam_title == result.exam_title,
-            Result.subject == result.subject
-        ).first()
-        
-        if existing:
-            # Update existing
-            for key, value in result.dict().items():
-                setattr(existing, key, value)
-            db.add(existing)
-            created_results.append(existing)
-        else:
-            # Create new
-            new_result = Result(**result.dict())
-            db.add(new_result)
-            created_results.append(new_result)
-            
+    records = bulk_upsert(
+        db,
+        Result,
+        (result.dict() for result in results_in),
+        index_elements=RESULT_KEY,
+    )
+    by_key = {
+        (record.student_id, record.exam_title, record.subject): ResultSchema.model_validate(record)
+        for record in records
+    }
+    bump_shared_versions(db, (exam_version_name(result.exam_title) for result in results_in))
     db.commit()
-    for result in created_results:
-        db.refresh(result)
-        
-    return created_results
+
+    return [by_key[(result.student_id, result.exam_title, result.subject)] for result in results_in]
+
+def _iter_import_rows(file: BinaryIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Lazily yield (row_number, raw_row) from an uploaded CSV or NDJSON file.
+
+    Rows that cannot be decoded are yielded as exceptions so the caller can
+    report them without aborting the import.
+    """
+    stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        # Row numbers refer to data rows; the header line is row 0
+        for row_number, row in enumerate(csv.DictReader(stream), start=1):
+            yield row_number, row
+    else:
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as e:
+                yield row_number, e
+
+def _import_chunk(
+    db: Session,
+    chunk: List[Tuple[int, Any]],
+    report: ResultImportReport,
+) -> None:
+    """
+    Validate one chunk of raw rows and upsert the valid ones in one statement.
+    """
+    valid = []
+    for row_number, raw in chunk:
+        report.processed += 1
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            valid.append((row_number, ResultCreate(**raw)))
+        except ValidationError as e:
+            _record_import_error(report, row_number, "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            ))
+        except (ValueError, TypeError) as e:
+            _record_import_error(report, row_number, str(e))
+
+    # Unknown students would violate the foreign key and sink the whole chunk
+    student_ids = {result.student_id for _, result in valid}
+    known_ids = {
+        student_id for (student_id,) in
+        db.query(StudentProfile.id).filter(StudentProfile.id.in_(student_ids))
+    } if student_ids else set()
+
+    rows = []
+    for row_number, result in valid:
+        if result.student_id in known_ids:
+            rows.append(result.dict())
+        else:
+            _record_import_error(report, row_number, f"Student {result.student_id} not found")
+
+    if not rows:
+        return
+    try:
+        # Rows repeating a key within the chunk are collapsed into one upsert
+        upserted = bulk_upsert(db, Result, rows, index_elements=RESULT_KEY)
+        bump_shared_versions(db, (exam_version_name(row["exam_title"]) for row in rows))
+        db.commit()
+        report.upserted += len(upserted)
+    except SQLAlchemyError as e:
+        db.rollback()
+        for row_number, result in valid:
+            if result.student_id in known_ids:
+                _record_import_error(report, row_number, f"Database error: {e.__class__.__name__}")
+
+def _record_import_error(report: ResultImportReport, row_number: int, message: str) -> None:
+    report.failed += 1
+    if len(report.errors) < MAX_IMPORT_ERRORS:
+        report.errors.append(ResultImportError(row=row_number, error=message))
+    else:
+        report.errors_truncated = True
+
+@router.post("/import", response_model=JobSchema, status_code=202)
+def import_results(
+    response: Response,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Queue a CSV or NDJSON mark sheet for import into results.
+
+    The upload is saved and processed by a background worker; the job's
+    result (GET /jobs/{id}) is the import report.
+    """
+    fmt = format
+    if fmt is None:
+        filename = (file.filename or "").lower()
+        fmt = "ndjson" if filename.endswith((".ndjson", ".jsonl")) else "csv"
+
+    os.makedirs(settings.JOB_FILES_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=settings.JOB_FILES_DIR, prefix="results-import-", suffix=f".{fmt}")
+    with os.fdopen(fd, "wb") as saved:
+        shutil.copyfileobj(file.file, saved, 1024 * 1024)
+    return accepted(enqueue(db, "results.import", {"path": path, "format": fmt, "filename": file.filename}), response)
+
+@job_handler("results.import")
+def run_results_import(db: Session, context: JobContext, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Stream a saved mark sheet into results.
+
+    The file is parsed incrementally and upserted in chunks of IMPORT_CHUNK_SIZE
+    rows, each committed on its own, so memory stays bounded and bad rows are
+    reported individually instead of failing the whole import. Upserts make a
+    retry after a partial run safe.
+    """
+    report = ResultImportReport()
+    chunk = []
+    keep_file = False
+    try:
+        with open(payload["path"], "rb") as file:
+            for item in _iter_import_rows(file, payload["format"]):
+                chunk.append(item)
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    _import_chunk(db, chunk, report)
+                    context.progress(report.processed)
+                    chunk = []
+            if chunk:
+                _import_chunk(db, chunk, report)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise PermanentJobError(f"Could not parse file: {str(e)}")
+    except FileNotFoundError:
+        raise PermanentJobError("The uploaded file is no longer available")
+    except Exception:
+        # Unexpected (e.g. the database went away): the retry needs the file
+        keep_file = not context.last_attempt
+        raise
+    finally:
+        if not keep_file and os.path.exists(payload["path"]):
+            os.remove(payload["path"])
+
+    context.progress(report.processed, report.processed)
+    return report.model_dump()
@@ -1,10 +1,15 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Response
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
-from app.api.api_v1.endpoints.auth import get_db, get_password_hash
+from app.api.api_v1.endpoints.auth import get_db
+from app.core.security import password_hasher
+from app.api.api_v1.endpoints.dashboard import invalidate_dashboard
+from app.api.fields import load_options, parse_fields, sparse_adapter
+from app.api.pagination import paginate
+from app.api.response_cache import cache_key, cached_json, query_cache, store_json
 from app.models.user import User
 from app.schemas import teacher as teacher_schemas
 
@@ -14,15 +19,30 @@ router = APIRouter()
 
 @router.get("/", response_model=List[teacher_schemas.Teacher])
 def read_teachers(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     db: Session = Depends(get_db),
 ) -> Any:
     """
     Retrieve teachers.
+
+    `fields=` selects a sparse fieldset; teacher_profile is joined into the
+    page query when requested.
     """
-    teachers = db.query(User).filter(User.role == "teacher").offset(skip).limit(limit).all()
-    return teachers
+    fieldset = parse_fields(fields, teacher_schemas.Teacher)
+    key = cache_key("teachers", ["users", "teacher_profiles"], skip=skip, limit=limit, cursor=cursor, fields=fieldset)
+    cached = query_cache.get(key)
+    if cached is not None:
+        return cached_json(cached)
+
+    query = db.query(User).filter(User.role == "teacher").options(*load_options(
+        User, fieldset, {"teacher_profile": User.teacher_profile}, always=(User.id,),
+    ))
+    teachers = paginate(query, [(User.id, False)], response, cursor=cursor, skip=skip, limit=limit)
+    return store_json(key, sparse_adapter(teacher_schemas.Teacher, fieldset), teachers, response)
 
 @router.post("/", response_model=teacher_schemas.Teacher)
 def create_teacher(
@@ -40,7 +60,7 @@ def create_teacher(
             detail="The user with this username already exists in the system.",
         )
     
-    hashed_password = get_password_hash(teacher_in.password)
+    hashed_password = password_hasher.hash_blocking(teacher_in.password)
     db_obj = User(
         email=teacher_in.email,
         hashed_password=hashed_password,
@@ -62,6 +82,7 @@ def create_teacher(
         db.commit()
         db.refresh(db_profile)
 
+    invalidate_dashboard()
     return db_obj
 
 @router.get("/{teacher_id}", response_model=teacher_schemas.Teacher)
@@ -109,7 +130,7 @@ def update_teacher(
             db.add(db_profile)
 
     if "password" in update_data and update_data["password"]:
-        hashed_password = get_password_hash(update_data["password"])
+        hashed_password = password_hasher.hash_blocking(update_data["password"])
         del update_data["password"]
         teacher.hashed_password = hashed_password
 
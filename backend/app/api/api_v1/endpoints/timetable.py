@@ -1,37 +1,69 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
+from app.api.etag import compute_etag, etag_matches
+from app.api.response_cache import cache_key
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.models.timetable import Timetable
-from app.models.user import User
+from app.schemas.token import TokenPrincipal
 from app.schemas.timetable import Timetable as TimetableSchema
 
 router = APIRouter()
 
+# Serialized timetable and its ETag per class and section. Keys carry the
+# timetable table's version (see app.db.table_versions), so commits through
+# this process retire old entries; the TTL covers writes made outside it
+# (seed scripts, other workers).
+timetable_cache = TTLCache(ttl=settings.TIMETABLE_CACHE_TTL)
+timetable_adapter = TypeAdapter(List[TimetableSchema])
+
 @router.get("/", response_model=List[TimetableSchema])
-def read_timetable(
-    db: Session = Depends(deps.get_db),
-    current_user: User = Depends(deps.get_current_active_user),
+async def read_timetable(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: TokenPrincipal = Depends(deps.get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    if_none_match: Optional[str] = Header(None),
 ) -> Any:
     """
     Retrieve timetable for the current student's class and section.
+
+    Supports If-None-Match: a client holding the current ETag gets a 304
+    straight from the cache, without touching the database.
     """
     if not current_user.student_profile:
         raise HTTPException(status_code=404, detail="Student profile not found")
     
     profile = current_user.student_profile
-    
-    timetable = (
-        db.query(Timetable)
-        .filter(
-            Timetable.class_grade == profile.class_grade,
-            Timetable.section == profile.section
+    # Taken before the query: a write committing meanwhile bumps the version,
+    # so what this request read is stored under a key no later reader uses
+    key = cache_key("timetable", [Timetable.__tablename__], class_grade=profile.class_grade, section=profile.section)
+
+    cached = timetable_cache.get(key)
+    if cached is None:
+        result = await db.execute(
+            select(Timetable)
+            .where(
+                Timetable.class_grade == profile.class_grade,
+                Timetable.section == profile.section
+            )
+            .order_by(Timetable.day_of_week, Timetable.start_time)
         )
-        .order_by(Timetable.day_of_week, Timetable.start_time)
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-    return timetable
+        rows = timetable_adapter.validate_python(result.scalars().all(), from_attributes=True)
+        full_body = timetable_adapter.dump_json(rows)
+        cached = (rows, full_body, compute_etag(full_body))
+        timetable_cache.set(key, cached)
+
+    rows, body, etag = cached
+    if skip or limit < len(rows):
+        body = timetable_adapter.dump_json(rows[skip:skip + limit])
+        etag = compute_etag(body)
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,15 +1,25 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.models.student import StudentProfile, ParentProfile, Address, EmergencyContact
 from app.schemas import student as student_schemas
 from app.api.api_v1.endpoints.auth import get_db
-from app.core.security import get_password_hash
+from app.api.api_v1.endpoints.dashboard import invalidate_dashboard
+from app.api.fields import fieldset_response, load_options, parse_fields
+from app.api.pagination import paginate
+from app.core.security import password_hasher
 
 router = APIRouter()
 
+# One-to-one relations of a student, joined into list queries when requested
+STUDENT_RELATIONS = {
+    "address": StudentProfile.address,
+    "parent_profile": StudentProfile.parent_profile,
+    "emergency_contact": StudentProfile.emergency_contact,
+}
+
 # Helper to get current user (simplified for now, ideally use a proper dependency)
 def get_current_user_id(email: str, db: Session):
     user = db.query(User).filter(User.email == email).first()
@@ -91,12 +101,29 @@ def update_user_profile(
     return student_profile
 
 @router.get("/students", response_model=List[student_schemas.StudentProfile])
-def read_students(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_students(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
     """
     Retrieve all students.
+
+    `fields=id,admission_number,class_grade` returns only those fields; the
+    address, parent and emergency contact relations are joined into the page
+    query when requested, so every page is a single query.
     """
-    students = db.query(StudentProfile).offset(skip).limit(limit).all()
-    return students
+    fieldset = parse_fields(fields, student_schemas.StudentProfile)
+    query = db.query(StudentProfile).options(*load_options(
+        StudentProfile, fieldset, STUDENT_RELATIONS, always=(StudentProfile.id,),
+    ))
+    students = paginate(query, [(StudentProfile.id, False)], response, cursor=cursor, skip=skip, limit=limit)
+    if fieldset is None:
+        return students
+    return fieldset_response(student_schemas.StudentProfile, fieldset, students, response)
 
 @router.post("/students", response_model=student_schemas.StudentProfile)
 def create_student(
@@ -114,7 +141,7 @@ def create_student(
     # Create User
     user = User(
         email=student_in.email,
-        hashed_password=get_password_hash(student_in.password),
+        hashed_password=password_hasher.hash_blocking(student_in.password),
         full_name=student_in.full_name,
         role="student"
     )
@@ -161,6 +188,7 @@ def create_student(
 
     db.commit()
     db.refresh(student_profile)
+    invalidate_dashboard()
     return student_profile
 
 @router.get("/students/{student_id}", response_model=student_schemas.StudentProfile)
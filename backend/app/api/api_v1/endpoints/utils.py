@@ -1,41 +1,81 @@
-from typing import Any
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import shutil
 import os
+from typing import Any, AsyncIterator
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile as StarletteUploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+from app.api.response_cache import query_cache
 from app.core.config import settings
+from app.core.images import image_derivatives
+from app.core.uploads import store_upload
+from app.db.table_versions import table_versions
 
 router = APIRouter()
 
-@router.post("/upload", response_model=dict)
-async def upload_file(file: UploadFile = File(...)) -> Any:
+# The upload route reads its multipart body itself (to enforce the size
+# limit while streaming), so its request body is documented by hand
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                },
+            },
+        },
+    },
+}
+
+async def _limited_stream(request: Request, max_bytes: int) -> AsyncIterator[bytes]:
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+        yield chunk
+
+@router.post("/upload", response_model=dict, openapi_extra=UPLOAD_REQUEST_BODY)
+async def upload_file(request: Request) -> Any:
     """
     Upload a file and return its URL.
+
+    The multipart body is parsed as it arrives and the request is cut off
+    with 413 as soon as it passes UPLOAD_MAX_BYTES. File data is spooled
+    and stored off the event loop; identical files get the same URL.
     """
+    max_bytes = settings.UPLOAD_MAX_BYTES
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+
+    try:
+        parser = MultiPartParser(request.headers, _limited_stream(request, max_bytes), max_files=1, max_fields=10)
+        form = await parser.parse()
+    except MultiPartException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    file = form.get("file")
+    if not isinstance(file, StarletteUploadFile):
+        raise HTTPException(status_code=422, detail="A 'file' form field is required")
+
     try:
-        # Create uploads directory if it doesn't exist
-        upload_dir = "static/uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate a unique filename (or keep original if simple)
-        # For simplicity, using original filename but handling duplicates could be better
-        # ideally use uuid or timestamp
-        import time
-        timestamp = int(time.time())
-        filename = f"{timestamp}_{file.filename}"
-        file_path = os.path.join(upload_dir, filename)
-        
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # Construct URL
-        # Assuming static files are served at /static
-        # We need the base URL, but for now returning relative path or absolute URL if domain known
-        # Let's return a relative path that frontend can prepend API_URL or similar to
-        # Or better, return the full URL if we knew the host.
-        # For now, returning /static/uploads/filename
-        
-        url = f"/static/uploads/{filename}"
-        return {"url": url}
-        
-    except Exception as e:
+        relative_path, size, _ = await run_in_threadpool(store_upload, file.file, file.filename, settings.UPLOAD_DIR)
+    except OSError as e:
         raise HTTPException(status_code=500, detail=f"Could not upload file: {str(e)}")
+    finally:
+        await form.close()
+
+    # Resized copies are made in the background; ?variant= requests that
+    # arrive first render them on demand
+    image_derivatives.generate(os.path.join(settings.UPLOAD_DIR, relative_path))
+    url = "/static/uploads/" + relative_path.replace(os.sep, "/")
+    return {"url": url, "size": size}
+
+@router.get("/cache-stats", response_model=dict)
+def read_cache_stats() -> Any:
+    """
+    Hit/miss statistics of the reference-data response cache, for monitoring.
+    """
+    return {"query_cache": query_cache.stats(), "table_versions": table_versions.snapshot()}
@@ -0,0 +1,174 @@
+import zlib
+from typing import List, Optional, Sequence
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+# Bodies at least this large are compressed in a worker thread
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+
+def accepted_encodings(accept_encoding: str, candidates: Sequence[str] = ("br", "gzip")) -> List[str]:
+    """
+    The `candidates` an Accept-Encoding header allows, most preferred first.
+
+    Higher q-values win; on a tie the order of `candidates` decides.
+    """
+    offered = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip()] = q
+
+    weights = {name: offered.get(name, offered.get("*", 0.0)) for name in candidates}
+    return sorted((name for name in candidates if weights[name] > 0), key=lambda name: -weights[name])
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick "br" or "gzip" from an Accept-Encoding header, or None for identity.
+
+    On a tie brotli is preferred, being ~15-20% smaller than gzip on JSON at
+    a similar CPU cost for the quality used here.
+    """
+    encodings = accepted_encodings(accept_encoding, ("br", "gzip") if brotli is not None else ("gzip",))
+    return encodings[0] if encodings else None
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = "W/" + etag
+
+
+def _match_revalidated_etag(headers: MutableHeaders, request_headers: Headers) -> None:
+    # A 304 has no body to encode, but must repeat the tag of the 200 it
+    # revalidates: weak if the client holds the weak form this middleware
+    # gave an encoded body
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/") and "W/" + etag in request_headers.get("if-none-match", ""):
+        headers["ETag"] = "W/" + etag
+
+
+class _Encoder:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.gzip = encoding == "gzip"
+        if self.gzip:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        else:
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        c = self._compressor
+        if self.gzip:
+            return c.compress(data) + c.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+        return c.process(data) + (c.finish() if final else c.flush())
+
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip compression of text and JSON responses.
+
+    Bodies smaller than `minimum_size` are sent as-is, since headers and CPU
+    would outweigh the saving. Responses that are already encoded, partial
+    (206) or of a non-text type pass through. The ETag of a body this
+    middleware encodes is weakened, as the bytes sent no longer match the
+    identity representation a strong tag was computed for; everything else
+    keeps its tag, so If-Range (strong comparison) still resumes downloads.
+    A 304 repeats the weak form when the client revalidates with it.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def compress(data: bytes, final: bool) -> bytes:
+            if len(data) >= THREAD_MINIMUM_SIZE:
+                return await anyio.to_thread.run_sync(encoder.compress, data, final)
+            return encoder.compress(data, final)
+
+        async def compressing_send(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").lower()
+                if message["status"] == 304:
+                    _match_revalidated_etag(MutableHeaders(raw=message["headers"]), request_headers)
+                passthrough = (
+                    message["status"] in (204, 206, 304)
+                    or "content-encoding" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    # Event streams: a compressor per open connection would
+                    # cost far more memory than their small frames save
+                    or content_type.startswith("text/event-stream")
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                if start is not None:
+                    # e.g. http.response.pathsend: the server sends the file
+                    # itself, so it goes out uncompressed
+                    await send(start)
+                    start = None
+                    passthrough = True
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                encoder = _Encoder(encoding, self.gzip_level, self.brotli_quality)
+                body = await compress(body, not more_body)
+                headers["Content-Encoding"] = encoding
+                _weaken_etag(headers)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+            else:
+                body = await compress(body, not more_body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
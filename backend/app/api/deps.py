@@ -1,8 +1,13 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
-from app.models.user import User
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.security import decode_token
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.schemas.token import TokenPrincipal
+
+bearer_scheme = HTTPBearer(auto_error=False)
 
 def get_db() -> Generator:
     try:
@@ -11,15 +16,54 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_active_user(
-    db: Session = Depends(get_db),
-) -> User:
-    # For now, since we have fake auth, we'll return the admin user
-    # In a real app, we would parse the JWT token here
-    user = db.query(User).filter(User.email == "admin@school.com").first()
-    if not user:
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def principal_from_token(token: str) -> TokenPrincipal:
+    """
+    The user an access token was issued to; raises JWTError if it is not valid.
+    """
+    claims = decode_token(token, "access")
+    return TokenPrincipal(
+        id=int(claims["sub"]),
+        email=claims["email"],
+        full_name=claims.get("name"),
+        role=claims["role"],
+        student_profile=claims.get("student"),
+        jti=claims["jti"],
+        exp=claims["exp"],
+    )
+
+def _principal_or_401(token: Optional[str]) -> TokenPrincipal:
+    # Everything comes from the signed access token: no database round trip
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        return principal_from_token(token)
+    except JWTError:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+
+async def get_current_active_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> TokenPrincipal:
+    return _principal_or_401(credentials.credentials if credentials else None)
+
+async def get_stream_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    access_token: Optional[str] = None,
+) -> TokenPrincipal:
+    """
+    Like get_current_active_user, but also accepts `?access_token=`.
+
+    Browsers' EventSource cannot send an Authorization header.
+    """
+    return _principal_or_401(credentials.credentials if credentials else access_token)
@@ -0,0 +1,101 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.pagination import NEXT_CURSOR_HEADER
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    True when an If-None-Match header names `etag` (or is `*`).
+
+    Comparison is weak, as RFC 9110 requires for If-None-Match, so a W/ prefix
+    added by a proxy still matches.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def conditional_get(request: Request) -> None:
+    """
+    Route dependency opting a GET endpoint into ConditionalGetMiddleware.
+    """
+    request.state.conditional_get = True
+
+
+class ConditionalGetMiddleware:
+    """
+    ETag / If-None-Match handling for routes that depend on `conditional_get`.
+
+    Successful responses of opted-in routes are tagged with a hash of their
+    body, unless the endpoint already set an ETag (cached responses carry one
+    computed when they were stored). When the request's If-None-Match names
+    that tag the body is dropped and a 304 is sent instead. Other routes are
+    passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Optional[Message] = None
+        chunks = []
+
+        async def buffered_send(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                state = scope.get("state") or {}
+                if message["status"] != 200 or not state.get("conditional_get"):
+                    await send(message)
+                    return
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=list(start["headers"]))
+            etag = headers.get("etag")
+            if etag is None:
+                etag = compute_etag(body)
+                headers["ETag"] = etag
+            headers.setdefault("Cache-Control", "private, no-cache")
+            if etag_matches(if_none_match, etag):
+                not_modified = MutableHeaders()
+                for name in ("etag", "cache-control", "vary", NEXT_CURSOR_HEADER.lower()):
+                    if name in headers:
+                        not_modified[name] = headers[name]
+                await send({"type": "http.response.start", "status": 304, "headers": not_modified.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, buffered_send)
@@ -0,0 +1,73 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Type
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy.orm import joinedload, load_only
+
+from app.api.pagination import NEXT_CURSOR_HEADER
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a `fields=a,b,c` sparse-fieldset parameter against `schema`.
+
+    Returns None when no fieldset was requested; unknown names are a 400.
+    """
+    if not fields:
+        return None
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+@lru_cache(maxsize=128)
+def sparse_adapter(schema: Type[BaseModel], fields: Optional[FrozenSet[str]]) -> TypeAdapter:
+    """
+    List adapter for `schema` restricted to `fields` (all fields when None).
+
+    Validation only reads the requested attributes, so columns and relations
+    left out of the fieldset are never loaded.
+    """
+    if fields is None:
+        return TypeAdapter(List[schema])
+    model = create_model(
+        f"{schema.__name__}Sparse",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (info.annotation, info) for name, info in schema.model_fields.items() if name in fields},
+    )
+    return TypeAdapter(List[model])
+
+
+def fieldset_response(schema: Type[BaseModel], fields: FrozenSet[str], rows, response: Response) -> Response:
+    """
+    Serialize `rows` restricted to `fields`, keeping the pagination cursor set on `response`.
+    """
+    adapter = sparse_adapter(schema, fields)
+    headers = {}
+    if NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def load_options(model, fields: Optional[FrozenSet[str]], relations: Dict[str, object], always: tuple = ()):
+    """
+    Loader options for listing `model` as `fields`.
+
+    One-to-one `relations` named in the fieldset are joined into the page
+    query, so a page costs one round trip however many rows it has. With a
+    fieldset, other columns are deferred; `always` lists columns the query
+    itself needs (primary and cursor keys).
+    """
+    options = [joinedload(rel) for name, rel in relations.items() if fields is None or name in fields]
+    if fields is not None:
+        columns = {column.key for column in model.__table__.columns}
+        wanted = [getattr(model, name) for name in fields if name in columns]
+        options.append(load_only(*wanted, *always))
+    return options
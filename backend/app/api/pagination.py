@@ -0,0 +1,130 @@
+import base64
+import json
+from datetime import date, datetime, time
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Response header carrying the cursor for the page after the one returned.
+# List bodies stay plain JSON arrays so offset-based clients are unaffected.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# (column or SQL expression, descending)
+SortKey = Tuple[Any, bool]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    def default(value):
+        if isinstance(value, (date, datetime, time)):
+            return value.isoformat()
+        raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+    raw = json.dumps(list(values), default=default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: Sequence[SortKey]) -> List[Any]:
+    """
+    Decode an opaque cursor back into typed sort-key values.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(order_by):
+            raise ValueError("cursor does not match this listing")
+        typed = []
+        for value, (column, _) in zip(values, order_by):
+            python_type = column.type.python_type
+            if value is not None and python_type in (date, datetime, time):
+                value = python_type.fromisoformat(value)
+            elif value is not None and not isinstance(value, python_type):
+                # An edited cursor would otherwise reach the database as a bad comparison
+                raise ValueError(f"expected {python_type.__name__}, got {type(value).__name__}")
+            typed.append(value)
+        return typed
+    except (ValueError, TypeError, NotImplementedError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {str(e)}")
+
+
+def _after(order_by: Sequence[SortKey], values: Sequence[Any]):
+    """
+    Condition selecting rows strictly after `values` in `order_by` order.
+
+    Expanded as (a > x) OR (a = x AND b > y) OR ... so mixed ascending and
+    descending keys work on every backend.
+    """
+    clauses = []
+    for i, (column, descending) in enumerate(order_by):
+        equal_prefix = [col == values[j] for j, (col, _) in enumerate(order_by[:i])]
+        step = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def _page_query(query: Any, order_by: Sequence[SortKey], cursor: Optional[str], skip: int, limit: int) -> Any:
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in order_by])
+    if cursor:
+        query = query.filter(_after(order_by, decode_cursor(cursor, order_by)))
+    elif skip:
+        query = query.offset(skip)
+    # One extra row tells us whether another page follows
+    return query.limit(limit + 1)
+
+
+def _trim_page(
+    rows: List[Any],
+    order_by: Sequence[SortKey],
+    response: Response,
+    limit: int,
+    key: Optional[Callable[[Any], Sequence[Any]]],
+) -> List[Any]:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        values = key(last) if key else [getattr(last, column.key) for column, _ in order_by]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(values)
+    return rows
+
+
+def paginate(
+    query: Any,
+    order_by: Sequence[SortKey],
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    key: Optional[Callable[[Any], Sequence[Any]]] = None,
+) -> List[Any]:
+    """
+    Apply ordering and either keyset (`cursor`) or offset (`skip`) paging.
+
+    The sort keys must end in a unique column (usually id) so positions are
+    unambiguous. When more rows follow, the cursor for the next page is set on
+    the X-Next-Cursor response header. `key` extracts the sort values from a
+    result row; by default they are read as attributes named after the columns.
+    """
+    rows = _page_query(query, order_by, cursor, skip, limit).all()
+    return _trim_page(rows, order_by, response, limit, key)
+
+
+async def paginate_async(
+    db: AsyncSession,
+    stmt: Select,
+    order_by: Sequence[SortKey],
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    key: Optional[Callable[[Any], Sequence[Any]]] = None,
+    scalars: bool = True,
+) -> List[Any]:
+    """
+    `paginate` for a select() statement on an async session.
+
+    Returns ORM objects when `scalars` is set, otherwise result rows.
+    """
+    result = await db.execute(_page_query(stmt, order_by, cursor, skip, limit))
+    rows = result.scalars().all() if scalars else result.all()
+    return _trim_page(list(rows), order_by, response, limit, key)
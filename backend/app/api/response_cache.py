@@ -0,0 +1,45 @@
+from typing import Any, Hashable, Iterable, Optional, Sequence
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.api.etag import compute_etag
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.core.cache import CachedResponse, QueryCache
+from app.core.config import settings
+from app.db.table_versions import table_versions
+
+# Serialized list responses for reference data. Keys carry the versions of
+# the tables each response reads, so committed writes retire old entries.
+query_cache = QueryCache(max_bytes=settings.QUERY_CACHE_MAX_BYTES, ttl=settings.QUERY_CACHE_TTL)
+
+
+def cache_key(endpoint: str, tables: Sequence[str], **params: Any) -> Hashable:
+    """
+    Key for one endpoint call.
+
+    Take it before running the query: a write that commits in between bumps
+    the version, so the result is stored under a key no later reader uses.
+    The versions are this process's own: writes committed by worker.py or
+    another API process are served stale for up to QUERY_CACHE_TTL.
+    """
+    return (endpoint, table_versions.get(*tables), tuple(sorted(params.items())))
+
+
+def cached_json(entry: CachedResponse) -> Response:
+    return Response(content=entry.body, media_type="application/json", headers=entry.headers)
+
+
+def store_json(key: Hashable, adapter: TypeAdapter, rows: Iterable[Any], response: Optional[Response] = None) -> Response:
+    """
+    Serialize `rows` with `adapter`, cache the body and return it.
+
+    The pagination cursor set on `response` is kept with the body so cached
+    pages link to the next page as well, and the ETag is computed once here
+    rather than on every conditional request.
+    """
+    body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+    headers = {"ETag": compute_etag(body)}
+    if response is not None and NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return cached_json(query_cache.set(key, body, headers))
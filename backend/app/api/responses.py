@@ -0,0 +1,34 @@
+from typing import Any, Type
+
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (several times faster than json.dumps)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def default_response_class() -> Type[Response]:
+    """
+    Response class to install as the app default.
+
+    FastAPI releases that deprecate ORJSONResponse serialize `response_model`
+    routes straight to JSON bytes in pydantic-core, but only while the default
+    class is left unset; overriding it would put every route back on the
+    jsonable_encoder + render path. Older releases always take that path, and
+    there orjson is the faster renderer when it is installed.
+    """
+    if getattr(ORJSONResponse, "__deprecated__", None):
+        return Default(JSONResponse)
+    if orjson is not None:
+        return FastJSONResponse
+    return JSONResponse
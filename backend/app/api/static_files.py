@@ -0,0 +1,118 @@
+import os
+import re
+import stat
+from mimetypes import guess_type
+from typing import Dict, Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, QueryParams
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.api.compression import COMPRESSIBLE_TYPES, accepted_encodings
+from app.core.images import VARIANTS, image_derivatives, is_image
+
+# Files named by their SHA-256 (uploads, see app/core/uploads.py) never
+# change at the same URL, so clients may keep them for a year unrevalidated
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Anything else may be replaced in place; clients revalidate with its ETag
+DEFAULT_CACHE_CONTROL = "public, no-cache"
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+_CONTENT_HASHED = re.compile(r"(^|/)[0-9a-f]{64}(\.[a-z0-9]+)?$")
+
+
+class StaticFileResponse(FileResponse):
+    # Fewer, larger reads per file than Starlette's 64 KiB; each read is a
+    # thread hop. Servers offering the ASGI pathsend extension skip this and
+    # hand the file to sendfile() themselves.
+    chunk_size = 512 * 1024
+
+
+class AppStaticFiles(StaticFiles):
+    """
+    StaticFiles with cache headers, precompressed files and image variants.
+
+    - Content-hashed paths get a one-year immutable Cache-Control, others
+      `no-cache` so they are revalidated (304) rather than refetched.
+    - For compressible types, a `.br` or `.gz` file next to the requested
+      one is sent as-is when the client accepts that encoding, instead of
+      compressing on every request (see precompress_static.py).
+    - `?variant=thumbnail|medium` on an image returns a resized WebP copy,
+      rendered on first request if the upload-time job has not (or never
+      ran, for older files). Without Pillow the original is served.
+
+    Range requests (resuming large attachments) are handled by FileResponse.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] in ("GET", "HEAD"):
+            variant = QueryParams(scope["query_string"]).get("variant")
+            if variant is not None:
+                return await self._variant_response(path, variant, scope)
+            precompressed = await self._precompressed_response(path, scope)
+            if precompressed is not None:
+                return precompressed
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+        media_type: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        headers = dict(headers or {})
+        headers["Cache-Control"] = (
+            IMMUTABLE_CACHE_CONTROL if _CONTENT_HASHED.search(scope["path"]) else DEFAULT_CACHE_CONTROL
+        )
+        if (media_type or guess_type(str(full_path))[0] or "").startswith(COMPRESSIBLE_TYPES):
+            headers.setdefault("Vary", "Accept-Encoding")
+        response = StaticFileResponse(
+            full_path, status_code=status_code, stat_result=stat_result, media_type=media_type, headers=headers,
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    async def _lookup_file(self, path: str):
+        try:
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        except (OSError, ValueError):
+            return None, None
+        if not stat_result or not stat.S_ISREG(stat_result.st_mode):
+            return None, None
+        return full_path, stat_result
+
+    async def _precompressed_response(self, path: str, scope: Scope) -> Optional[Response]:
+        media_type = guess_type(path)[0]
+        if not media_type or not media_type.startswith(COMPRESSIBLE_TYPES):
+            return None
+        # Sent as stored, so .br files work even where the brotli module is missing
+        for encoding in accepted_encodings(Headers(scope=scope).get("accept-encoding", "")):
+            full_path, stat_result = await self._lookup_file(path + PRECOMPRESSED_SUFFIXES[encoding])
+            if full_path is not None:
+                return self.file_response(
+                    full_path, stat_result, scope, media_type=media_type, headers={"Content-Encoding": encoding},
+                )
+        return None
+
+    async def _variant_response(self, path: str, variant: str, scope: Scope) -> Response:
+        if variant not in VARIANTS:
+            raise HTTPException(status_code=400, detail=f"Unknown variant; expected one of {', '.join(VARIANTS)}")
+        if not image_derivatives.available or not is_image(path):
+            return await super().get_response(path, scope)
+
+        full_path, stat_result = await self._lookup_file(path)
+        if full_path is None:
+            return await super().get_response(path, scope)
+        try:
+            derivative, derivative_stat = await image_derivatives.variant(full_path, stat_result.st_mtime_ns, variant)
+        except Exception:
+            # Not a readable image after all; fall back to the original
+            return self.file_response(full_path, stat_result, scope)
+        return self.file_response(derivative, derivative_stat, scope)
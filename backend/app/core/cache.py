@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache whose entries expire after `ttl` seconds.
+
+    Writers call `invalidate()` after changing the underlying data, or
+    readers key entries on table versions, so the TTL only bounds staleness
+    from writes this process does not see (other workers, manual SQL).
+    Expired entries are swept out on `set()`, so keys that are never read
+    again do not pile up.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [k for k, (expires_at, _) in self._entries.items() if expires_at < now]
+            for k in expired:
+                del self._entries[k]
+            self._entries[key] = (now + self.ttl, value)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or everything when no key is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class CachedResponse:
+    """A serialized response body plus the headers that go with it."""
+
+    __slots__ = ("body", "headers", "expires_at")
+
+    def __init__(self, body: bytes, headers: Dict[str, str], expires_at: float):
+        self.body = body
+        self.headers = headers
+        self.expires_at = expires_at
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+
+class QueryCache:
+    """
+    Read-through cache of serialized response bodies with LRU eviction.
+
+    Keys include the current version of every table the response reads (see
+    app.db.table_versions), so a write makes older entries unreachable and
+    they age out of the LRU; nothing has to be invalidated explicitly. Total
+    body size is capped at `max_bytes`, and `ttl` bounds staleness from writes
+    made by other processes.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: Hashable, body: bytes, headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        entry = CachedResponse(body, dict(headers or {}), time.monotonic() + self.ttl)
+        if entry.size > self.max_bytes:
+            return entry
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return entry
+
+    def _remove(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
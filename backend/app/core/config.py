@@ -1,4 +1,7 @@
 import os
+import secrets
+import tempfile
+from typing import List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -18,15 +21,115 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "school_sms")
     SQLALCHEMY_DATABASE_URI: str = ""
 
+    # Signing key for access/refresh tokens (render.yaml generates one). Left
+    # unset, a random key is made per process, so tokens would not survive
+    # restarts or be accepted across workers; check_secret_key() only allows
+    # that against a local SQLite database.
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "")
+    JWT_ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+
+    # bcrypt cost for new hashes; older hashes are upgraded on the next login
+    PASSWORD_HASH_ROUNDS: int = 12
+    # Password hashing process pool size (0 = one per CPU) and how many hashes
+    # may wait for it before requests are rejected with 503
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Seconds a cached /dashboard/stats snapshot may be served without a rebuild
+    DASHBOARD_CACHE_TTL: int = 60
+    # Seconds a class timetable is cached; commits through this process
+    # invalidate it sooner
+    TIMETABLE_CACHE_TTL: int = 600
+    # Response cache for rarely-changing reference data (events, feed, teachers)
+    QUERY_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    QUERY_CACHE_TTL: int = 300
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESSLEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    # Report card batches: render processes (0 = one per CPU), name printed on
+    # every card, and where finished zips are kept until downloaded
+    REPORT_CARD_WORKERS: int = 0
+    REPORT_CARD_SCHOOL_NAME: str = "School Management System"
+    REPORT_CARD_DIR: str = os.path.join(tempfile.gettempdir(), "report_cards")
+    # Attachments are stored by content hash under UPLOAD_DIR (served at
+    # /static/uploads); larger request bodies are rejected with 413
+    UPLOAD_DIR: str = "static/uploads"
+    UPLOAD_MAX_BYTES: int = 25 * 1024 * 1024
+    # Resized WebP copies of images (?variant=thumbnail|medium on a /static
+    # URL): resize processes (0 = one per CPU) and where they are kept
+    IMAGE_WORKERS: int = 0
+    IMAGE_CACHE_DIR: str = "image_cache"
+    # Pending fees get a reminder when they come within each of these many
+    # days of their due date (negative = overdue by that many days). The
+    # job runs in-process every FEE_REMINDER_INTERVAL seconds when enabled,
+    # or via send_fee_reminders.py from cron
+    FEE_REMINDER_DAYS: List[int] = [7, 1, 0]
+    FEE_REMINDER_IN_PROCESS: bool = True
+    FEE_REMINDER_INTERVAL: int = 3600
+    # Background job queue (app/core/jobs.py): worker threads started inside
+    # each API process (0 = only standalone `python worker.py` processes),
+    # idle poll interval, attempts per job and base retry delay in seconds
+    # (doubling per attempt), and how long a running job's lease lasts
+    # without renewal (its worker renews it every third of that) before
+    # another worker takes the job over
+    JOB_IN_PROCESS_WORKERS: int = 1
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: float = 10.0
+    JOB_LEASE_SECONDS: int = 300
+    # Uploaded files waiting for their job; must be shared with the workers
+    JOB_FILES_DIR: str = os.path.join(tempfile.gettempdir(), "job_files")
+    # Notification push stream (/notifications/stream and /ws): seconds
+    # between keep-alives on an idle connection, how many recent events are
+    # kept for clients resuming after a reconnect, and how many undelivered
+    # events a slow client may have queued before it is told to refetch
+    NOTIFICATION_STREAM_HEARTBEAT: float = 15.0
+    NOTIFICATION_STREAM_BUFFER: int = 1000
+    NOTIFICATION_STREAM_QUEUE: int = 100
+
     @property
     def assemble_db_connection(self) -> str:
+        # An explicit URI (e.g. sqlite:///./school_sms.db for local runs) wins
+        if self.SQLALCHEMY_DATABASE_URI:
+            return self.SQLALCHEMY_DATABASE_URI
         from urllib.parse import quote_plus
         encoded_user = quote_plus(self.POSTGRES_USER)
         encoded_password = quote_plus(self.POSTGRES_PASSWORD)
         return f"postgresql://{encoded_user}:{encoded_password}@{self.POSTGRES_SERVER}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def assemble_async_db_connection(self) -> str:
+        # Same database, through the asyncio drivers (asyncpg / aiosqlite)
+        url = self.assemble_db_connection
+        for scheme, async_scheme in (("postgresql://", "postgresql+asyncpg://"), ("sqlite://", "sqlite+aiosqlite://")):
+            if url.startswith(scheme):
+                return async_scheme + url[len(scheme):]
+        return url
+
     class Config:
         case_sensitive = True
         env_file = ".env"
 
 settings = Settings()
+
+# Whether SECRET_KEY is the per-process fallback rather than configured
+SECRET_KEY_GENERATED = not settings.SECRET_KEY
+if SECRET_KEY_GENERATED:
+    settings.SECRET_KEY = secrets.token_urlsafe(32)
+
+
+def check_secret_key() -> None:
+    """
+    Refuse to start with the random fallback SECRET_KEY outside local SQLite runs.
+
+    Every restart would log all users out, and with several workers each
+    would reject the tokens the others sign.
+    """
+    if SECRET_KEY_GENERATED and not settings.assemble_db_connection.startswith("sqlite"):
+        raise RuntimeError(
+            "SECRET_KEY is not set. Set it to a long random value shared by every "
+            "API process (e.g. python -c 'import secrets; print(secrets.token_urlsafe(32))')."
+        )
@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import anyio.to_thread
+
+from app.core.config import settings
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # originals are served as-is
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels of each derivative a client can ask for with ?variant=
+VARIANTS = {"thumbnail": 240, "medium": 960}
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp")
+WEBP_QUALITY = 80
+
+_CONTENT_HASH = re.compile(r"[0-9a-f]{64}")
+
+
+def is_image(path: str) -> bool:
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _render_variants(source: str, cache_dir: str, sizes: Dict[str, int], digest: Optional[str] = None) -> Dict[str, str]:
+    """
+    Make sure a WebP derivative of `source` exists for each size; return their paths.
+
+    Runs in a pool worker. Derivatives are named <sha256>_<size>.webp, so
+    the same picture uploaded under several names is resized once, and a
+    replaced file gets fresh derivatives.
+    """
+    digest = digest or _file_digest(source)
+    paths = {variant: os.path.join(cache_dir, digest[:2], f"{digest}_{size}.webp") for variant, size in sizes.items()}
+    missing = {variant: sizes[variant] for variant, path in paths.items() if not os.path.exists(paths[variant])}
+    if not missing:
+        return paths
+
+    with Image.open(source) as original:
+        # Let the JPEG decoder downscale by a power of two while decoding,
+        # which is most of the cost for camera photos
+        largest = max(missing.values())
+        original.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+        os.makedirs(os.path.dirname(paths[next(iter(missing))]), exist_ok=True)
+        for variant, size in sorted(missing.items(), key=lambda item: -item[1]):
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(paths[variant]), prefix=".derivative-")
+            try:
+                with os.fdopen(fd, "wb") as tmp:
+                    resized.save(tmp, "WEBP", quality=WEBP_QUALITY, method=4)
+                os.chmod(tmp_path, 0o644)
+                os.replace(tmp_path, paths[variant])
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            # Smaller variants are resized from the larger one just made
+            image = resized
+    return paths
+
+
+class ImageDerivatives:
+    """
+    Resizes uploaded images to the sizes in VARIANTS, in a process pool.
+
+    Uploads queue every variant in the background; a request for a variant
+    that does not exist yet (older uploads, student photos copied in by
+    hand) waits for just that one. Concurrent requests for the same
+    derivative share one render.
+    """
+
+    def __init__(self, workers: int, cache_dir: str):
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self._pending: Dict[Tuple[str, int, str], Future] = {}
+        # (source, mtime, variant) -> derivative path, so serving a known
+        # derivative does not round-trip through the pool
+        self._known: Dict[Tuple[str, int, str], str] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def _submit(self, source: str, mtime_ns: int, variants: Tuple[str, ...]) -> Future:
+        key = (source, mtime_ns, ",".join(variants))
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            stem = os.path.splitext(os.path.basename(source))[0]
+            # Content-addressed uploads are already named by their hash
+            digest = stem if _CONTENT_HASH.fullmatch(stem) else None
+            future = self._executor.submit(
+                _render_variants, source, self.cache_dir, {v: VARIANTS[v] for v in variants}, digest,
+            )
+            self._pending[key] = future
+        future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return future
+
+    def generate(self, source: str) -> None:
+        """Queue every variant of a new upload without waiting for it."""
+        if not self.available or not is_image(source):
+            return
+
+        def log_failure(future: Future) -> None:
+            if future.exception() is not None:
+                logger.warning("Could not make derivatives of %s: %s", source, future.exception())
+
+        self._submit(source, os.stat(source).st_mtime_ns, tuple(VARIANTS)).add_done_callback(log_failure)
+
+    async def variant(self, source: str, mtime_ns: int, variant: str) -> Tuple[str, os.stat_result]:
+        """Path and stat of `variant` of `source`, rendering it first if needed."""
+        key = (source, mtime_ns, variant)
+        path = self._known.get(key)
+        if path is not None:
+            try:
+                return path, await anyio.to_thread.run_sync(os.stat, path)
+            except FileNotFoundError:  # cache directory was cleaned
+                pass
+        paths = await asyncio.wrap_future(self._submit(source, mtime_ns, (variant,)))
+        if len(self._known) >= 4096:
+            self._known.clear()
+        self._known[key] = paths[variant]
+        return paths[variant], await anyio.to_thread.run_sync(os.stat, paths[variant])
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+image_derivatives = ImageDerivatives(
+    workers=settings.IMAGE_WORKERS or os.cpu_count() or 1,
+    cache_dir=settings.IMAGE_CACHE_DIR,
+)
@@ -0,0 +1,281 @@
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, case, func, null, or_, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# kind -> handler(db, context, payload); the return value is stored as the job's result
+JOB_HANDLERS: Dict[str, Callable[[Session, "JobContext", Dict[str, Any]], Any]] = {}
+
+# Recorded on a job whose worker stopped renewing the lease on its last attempt
+ABANDONED_ERROR = "LeaseExpired: the worker running the last attempt stopped responding"
+
+# Set by enqueue() so workers in this process pick new work up without waiting for the next poll
+_wakeup = threading.Event()
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (bad input); the job fails at once."""
+
+
+def job_handler(kind: str):
+    def register(fn):
+        JOB_HANDLERS[kind] = fn
+        return fn
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue(db: Session, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> Job:
+    """Queue a job and commit; returns it with its id."""
+    job = Job(
+        kind=kind,
+        payload=payload,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=_now(),
+        progress_done=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _wakeup.set()
+    return job
+
+
+def claim_job(db: Session, worker_id: str) -> Optional[int]:
+    """
+    Atomically take the next due job for `worker_id`, returning its id.
+
+    One UPDATE ... WHERE id = (SELECT ... LIMIT 1 FOR UPDATE SKIP LOCKED):
+    on PostgreSQL concurrent workers skip rows another is claiming instead of
+    queueing behind its lock. SQLite has no row locks (FOR UPDATE is not
+    rendered), but it runs one writer at a time, so the single statement is
+    just as atomic there.
+
+    Running jobs whose lease lapsed are reclaimed, which counts as another
+    attempt; one whose last attempt lapsed (its worker crashed or was killed
+    each time) is failed by the same statement rather than run again, and
+    the next job is claimed instead.
+    """
+    while True:
+        now = _now()
+        claimable = or_(
+            and_(Job.status == "queued", Job.run_after <= now),
+            and_(Job.status == "running", Job.locked_at < now - timedelta(seconds=settings.JOB_LEASE_SECONDS)),
+        )
+        next_job = (
+            select(Job.id)
+            .where(claimable)
+            .order_by(Job.run_after, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        # Queued jobs always have attempts left, so only a reclaim can be exhausted
+        exhausted = Job.attempts >= Job.max_attempts
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == next_job, claimable)
+            .values(
+                status=case((exhausted, "failed"), else_="running"),
+                locked_by=case((exhausted, null()), else_=worker_id),
+                locked_at=now,
+                attempts=case((exhausted, Job.attempts), else_=Job.attempts + 1),
+                error=case((exhausted, ABANDONED_ERROR), else_=Job.error),
+                started_at=func.coalesce(Job.started_at, now),
+                finished_at=case((exhausted, now), else_=Job.finished_at),
+            )
+            .returning(Job.id, Job.status)
+        ).first()
+        db.commit()
+        if claimed is None:
+            return None
+        if claimed.status == "running":
+            return claimed.id
+        logger.warning("Job %s failed: its last attempt's lease expired", claimed.id)
+
+
+class JobContext:
+    """
+    Handed to handlers for reporting progress.
+
+    The job's lease is renewed by a heartbeat while the handler runs (see
+    run_job), and by each progress write, so a handler need not report
+    progress to keep its job.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        worker_id: str,
+        session_factory: Callable[[], Session],
+        min_interval: float = 0.5,
+        attempt: int = 1,
+        max_attempts: int = 1,
+    ):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.attempt = attempt
+        self.max_attempts = max_attempts
+        self._session_factory = session_factory
+        self._min_interval = min_interval
+        self._last_write = 0.0
+
+    @property
+    def last_attempt(self) -> bool:
+        """Whether a failure now is final, e.g. so the handler can clean up its inputs."""
+        return self.attempt >= self.max_attempts
+
+    def progress(self, done: int, total: Optional[int] = None) -> None:
+        # Throttled; written through its own session so the handler's
+        # transaction is left alone
+        now = time.monotonic()
+        if now - self._last_write < self._min_interval and done != total:
+            return
+        self._last_write = now
+        values = {"progress_done": done, "locked_at": _now()}
+        if total is not None:
+            values["progress_total"] = total
+        self._write(values)
+
+    def renew_lease(self) -> None:
+        self._write({"locked_at": _now()})
+
+    def _write(self, values: Dict[str, Any]) -> None:
+        db = self._session_factory()
+        try:
+            db.execute(update(Job).where(Job.id == self.job_id, Job.locked_by == self.worker_id).values(**values))
+            db.commit()
+        finally:
+            db.close()
+
+
+def _heartbeat(context: JobContext, stop: threading.Event) -> None:
+    """Renew `context`'s lease every third of the lease period until `stop` is set."""
+    while not stop.wait(settings.JOB_LEASE_SECONDS / 3):
+        try:
+            context.renew_lease()
+        except OperationalError as e:
+            # e.g. SQLite "database is locked" while the handler writes; the next beat retries
+            logger.debug("Could not renew the lease of job %s: %s", context.job_id, e)
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with 10% jitter, capped at an hour."""
+    delay = min(settings.JOB_RETRY_BACKOFF * 2 ** (attempts - 1), 3600)
+    return delay * random.uniform(1.0, 1.1)
+
+
+def run_job(job_id: int, worker_id: str, session_factory: Callable[[], Session]) -> str:
+    """Run a claimed job and record the outcome; returns the new status."""
+    db = session_factory()
+    try:
+        job = db.get(Job, job_id)
+        kind, payload, attempts, max_attempts = job.kind, job.payload, job.attempts, job.max_attempts
+        handler = JOB_HANDLERS.get(kind)
+        context = JobContext(job_id, worker_id, session_factory, attempt=attempts, max_attempts=max_attempts)
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(
+            target=_heartbeat, args=(context, stop_heartbeat), name=f"job-{job_id}-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job kind {kind!r}")
+            result = handler(db, context, payload)
+        except Exception as e:
+            db.rollback()
+            retry = not isinstance(e, PermanentJobError) and attempts < max_attempts
+            logger.warning("Job %s (%s) attempt %s failed: %s", job_id, kind, attempts, e, exc_info=not retry)
+            values = {"status": "queued" if retry else "failed", "error": f"{e.__class__.__name__}: {e}", "locked_by": None}
+            if retry:
+                values["run_after"] = _now() + timedelta(seconds=retry_delay(attempts))
+            else:
+                values["finished_at"] = _now()
+        else:
+            values = {"status": "done", "result": result, "error": None, "locked_by": None, "finished_at": _now()}
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+        # A worker that overran its lease no longer owns the job; its outcome is dropped
+        db.execute(update(Job).where(Job.id == job_id, Job.locked_by == worker_id).values(**values))
+        db.commit()
+        return values["status"]
+    finally:
+        db.close()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def run_worker(
+    session_factory: Callable[[], Session],
+    stop: threading.Event,
+    worker_id: Optional[str] = None,
+    poll_interval: Optional[float] = None,
+    max_jobs: Optional[int] = None,
+) -> int:
+    """
+    Claim and run jobs until `stop` is set (or `max_jobs` have run); returns the count.
+
+    Sleeps `poll_interval` seconds when the queue is empty, or less if a job
+    is enqueued from this process.
+    """
+    worker_id = worker_id or default_worker_id()
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    while not stop.is_set() and (max_jobs is None or processed < max_jobs):
+        db = session_factory()
+        try:
+            job_id = claim_job(db, worker_id)
+        except OperationalError as e:
+            # e.g. SQLite "database is locked" under contention
+            db.rollback()
+            logger.debug("Could not claim a job: %s", e)
+            job_id = None
+        finally:
+            db.close()
+        if job_id is None:
+            _wakeup.wait(poll_interval)
+            _wakeup.clear()
+            continue
+        run_job(job_id, worker_id, session_factory)
+        processed += 1
+    return processed
+
+
+def start_worker_threads(session_factory: Callable[[], Session], count: int) -> Callable[[], None]:
+    """Run `count` workers in daemon threads of this process; returns a function that stops them."""
+    stop = threading.Event()
+    threads: List[threading.Thread] = [
+        threading.Thread(target=run_worker, args=(session_factory, stop), name=f"job-worker-{i}", daemon=True)
+        for i in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+
+    def shutdown() -> None:
+        stop.set()
+        _wakeup.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    return shutdown
@@ -0,0 +1,93 @@
+"""
+A very small PDF writer for single-page, text-and-rules documents.
+
+It only knows the standard Helvetica fonts (no embedding) and WinAnsi text,
+which is all report cards need, and keeps the project free of a PDF library.
+"""
+import zlib
+from typing import Iterable, List, Tuple
+
+PAGE_WIDTH = 595  # A4 in points
+PAGE_HEIGHT = 842
+
+FONTS = {"regular": "F1", "bold": "F2"}
+
+
+def escape(text: str) -> bytes:
+    """Encode `text` as the body of a PDF literal string."""
+    data = str(text).encode("cp1252", errors="replace")
+    return data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class Canvas:
+    """Accumulates content-stream operators for one page."""
+
+    def __init__(self):
+        self._ops: List[bytes] = []
+
+    def text(self, x: float, y: float, text: str, size: float = 10, font: str = "regular") -> None:
+        self._ops.append(
+            b"BT /%s %g Tf %g %g Td (%s) Tj ET" % (FONTS[font].encode(), size, x, y, escape(text))
+        )
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 0.5) -> None:
+        self._ops.append(b"%g w %g %g m %g %g l S" % (width, x1, y1, x2, y2))
+
+    def rect(self, x: float, y: float, w: float, h: float, gray: float = 0.9) -> None:
+        self._ops.append(b"q %g g %g %g %g %g re f Q" % (gray, x, y, w, h))
+
+    def stream(self) -> bytes:
+        return b"\n".join(self._ops)
+
+
+class PageTemplate:
+    """
+    A one-page PDF whose static part is compiled once.
+
+    Every object except the variable content stream - catalog, page tree,
+    fonts and the static drawing (`background`) - is serialized up front
+    with its byte offset, so rendering a document only serializes the
+    variable stream and the cross-reference table.
+    """
+
+    def __init__(self, background: bytes):
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents [6 0 R 7 0 R] >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+            _stream(background),
+        ]
+        head = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets: List[int] = []
+        for number, body in enumerate(objects, start=1):
+            self._offsets.append(len(head))
+            head += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        self._head = bytes(head)
+
+    def render(self, content: bytes) -> bytes:
+        """The complete PDF with `content` drawn over the background."""
+        offsets = self._offsets + [len(self._head)]
+        body = b"7 0 obj\n%s\nendobj\n" % _stream(content)
+        xref_at = len(self._head) + len(body)
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)]
+        xref.extend(b"%010d 00000 n \n" % offset for offset in offsets)
+        trailer = b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref_at)
+        return self._head + body + b"".join(xref) + trailer
+
+
+def _stream(data: bytes) -> bytes:
+    data = zlib.compress(data)
+    return b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(data), data)
+
+
+def column_positions(widths: Iterable[float], left: float) -> List[Tuple[float, float]]:
+    """(x, width) of consecutive table columns starting at `left`."""
+    positions, x = [], left
+    for width in widths:
+        positions.append((x, width))
+        x += width
+    return positions
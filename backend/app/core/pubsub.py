@@ -0,0 +1,181 @@
+import asyncio
+import json
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from app.core.config import settings
+
+# audience(subscriber) -> whether the subscriber should receive an event
+Audience = Callable[[Any], bool]
+
+
+class Event:
+    """A published event; its JSON payload is encoded once, whatever the number of subscribers."""
+
+    __slots__ = ("seq", "id", "name", "data", "audience", "_sse")
+
+    def __init__(self, seq: int, id: Optional[str], name: str, data: str, audience: Optional[Audience] = None):
+        self.seq = seq
+        self.id = id
+        self.name = name
+        self.data = data
+        self.audience = audience
+        self._sse: Optional[bytes] = None
+
+    def sse(self) -> bytes:
+        """The event as a text/event-stream frame."""
+        if self._sse is None:
+            frame = f"event: {self.name}\ndata: {self.data}\n\n"
+            self._sse = (f"id: {self.id}\n" + frame if self.id else frame).encode()
+        return self._sse
+
+    def message(self) -> str:
+        """The event as a JSON WebSocket message."""
+        return f'{{"id":{json.dumps(self.id)},"event":{json.dumps(self.name)},"data":{self.data}}}'
+
+
+def control_event(name: str, data: Dict[str, Any]) -> Event:
+    """An event for one connection only; it has no id, so it is never resumed from."""
+    return Event(0, None, name, json.dumps(data, separators=(",", ":")))
+
+
+# Queued for a subscriber that must refetch: it fell too far behind, or
+# asked to resume from an event no longer buffered
+RESET = control_event("reset", {})
+# Queued when the broker shuts down
+CLOSED = control_event("closed", {})
+
+
+class Subscription:
+    def __init__(self, broker: "Broker", subscriber: Any, max_queue: int):
+        self.subscriber = subscriber
+        self._broker = broker
+        self._queue: "asyncio.Queue[Event]" = asyncio.Queue(max_queue)
+
+    def deliver(self, event: Event) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Rather than buffer without bound for a stalled client, drop its
+            # backlog and have it refetch
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESET)
+
+    def end(self) -> None:
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(CLOSED)
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """The next event, or None if there was none within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+
+class Broker:
+    """
+    In-process publish/subscribe for pushing events to open connections.
+
+    publish() may be called from any thread (sync endpoints run in the
+    threadpool); delivery happens on the event loop, where each subscriber
+    has a bounded queue. The last `buffer_size` events are kept so a client
+    that reconnects with the id of the last event it saw gets what it missed.
+    Ids carry a per-process epoch, so an id from before a restart is
+    recognised as stale rather than mistaken for a recent one.
+
+    Only connections to this process are reached; with several API worker
+    processes each client is told of events published by the one it is
+    connected to, and catches up on the rest when it refetches.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._seq = 0
+        self._recent: Deque[Event] = deque(maxlen=buffer_size)
+        self._subscriptions: Set[Subscription] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    @property
+    def active(self) -> bool:
+        """Whether anything has subscribed in this process, i.e. whether publishing does anything."""
+        return self._loop is not None and not self._loop.is_closed()
+
+    def publish(self, name: str, data: Dict[str, Any], audience: Audience) -> None:
+        """Send `data` (JSON-serialisable) as event `name` to the subscribers `audience` accepts."""
+        if not self.active:
+            return
+        loop = self._loop
+        payload = json.dumps(data, separators=(",", ":"))
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._dispatch(name, payload, audience)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, name, payload, audience)
+
+    def _dispatch(self, name: str, payload: str, audience: Audience) -> None:
+        self._seq += 1
+        event = Event(self._seq, f"{self.epoch}-{self._seq}", name, payload, audience)
+        self._recent.append(event)
+        for subscription in self._subscriptions:
+            if audience(subscription.subscriber):
+                subscription.deliver(event)
+
+    def _missed(self, last_event_id: str) -> Optional[List[Event]]:
+        # Buffered events after `last_event_id`, or None if some are gone
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit() or int(seq) > self._seq:
+            return None
+        oldest = self._recent[0].seq if self._recent else self._seq + 1
+        if int(seq) < oldest - 1:
+            return None
+        return [event for event in self._recent if event.seq > int(seq)]
+
+    def subscribe(self, subscriber: Any, last_event_id: Optional[str] = None) -> Subscription:
+        """
+        Start receiving events for `subscriber`; call on the event loop.
+
+        With `last_event_id`, the events published since are queued first,
+        or RESET if they are no longer buffered.
+        """
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(self, subscriber, self.queue_size)
+        self._subscriptions.add(subscription)
+        if last_event_id:
+            missed = self._missed(last_event_id)
+            if missed is None:
+                subscription.deliver(RESET)
+            else:
+                for event in missed:
+                    if event.audience(subscriber):
+                        subscription.deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def close(self) -> None:
+        """End every open subscription, e.g. on shutdown."""
+        for subscription in list(self._subscriptions):
+            subscription.end()
+        self._subscriptions.clear()
+
+
+notification_broker = Broker(
+    buffer_size=settings.NOTIFICATION_STREAM_BUFFER,
+    queue_size=settings.NOTIFICATION_STREAM_QUEUE,
+)
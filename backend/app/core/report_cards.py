@@ -0,0 +1,193 @@
+"""
+Report card rendering and zipping of a class's cards.
+
+Cards are rendered in a process pool. Each worker compiles the page
+template once, in its initializer, and reuses it for every card it draws;
+the parent only gathers data and appends finished PDFs to the zip as they
+complete.
+"""
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.pdf import PAGE_HEIGHT, PAGE_WIDTH, Canvas, PageTemplate, column_positions
+
+LEFT = 50
+RIGHT = PAGE_WIDTH - 50
+TABLE_TOP = 630
+ROW_HEIGHT = 20
+COLUMNS = column_positions([215, 95, 95, 90], LEFT)  # subject, marks, max marks, grade
+
+
+def compile_template(school_name: str) -> PageTemplate:
+    """The parts of a card that are the same for every student."""
+    c = Canvas()
+    c.rect(0, PAGE_HEIGHT - 80, PAGE_WIDTH, 80, gray=0.92)
+    c.text(LEFT, PAGE_HEIGHT - 48, school_name, size=20, font="bold")
+    c.text(RIGHT - 95, PAGE_HEIGHT - 48, "REPORT CARD", size=12, font="bold")
+    for y, label in [(730, "Student"), (712, "Admission No."), (694, "Class"), (676, "Examination")]:
+        c.text(LEFT, y, label, size=10, font="bold")
+    c.rect(LEFT, TABLE_TOP - 6, RIGHT - LEFT, ROW_HEIGHT, gray=0.85)
+    for (x, _), heading in zip(COLUMNS, ["Subject", "Marks Obtained", "Max Marks", "Grade"]):
+        c.text(x + 6, TABLE_TOP, heading, size=10, font="bold")
+    c.line(LEFT, 110, LEFT + 150, 110)
+    c.line(RIGHT - 150, 110, RIGHT, 110)
+    c.text(LEFT, 96, "Class Teacher", size=9)
+    c.text(RIGHT - 150, 96, "Principal", size=9)
+    return PageTemplate(c.stream())
+
+
+def draw_card(template: PageTemplate, card: Dict[str, Any]) -> bytes:
+    """Render one student's card over the compiled template."""
+    c = Canvas()
+    student = card["student"]
+    for y, value in [
+        (730, student["name"]),
+        (712, student["admission_number"] or "-"),
+        (694, f"{student['class_grade'] or '-'} {student['section'] or ''}".strip()),
+        (676, card["exam_title"]),
+    ]:
+        c.text(LEFT + 110, y, value, size=10)
+
+    y = TABLE_TOP
+    for subject in card["subjects"]:
+        y -= ROW_HEIGHT
+        values = [subject["subject"], f"{subject['marks_obtained']:g}", f"{subject['total_marks']:g}", subject["grade"]]
+        for (x, _), value in zip(COLUMNS, values):
+            c.text(x + 6, y, value, size=10)
+        c.line(LEFT, y - 6, RIGHT, y - 6, width=0.25)
+
+    y -= ROW_HEIGHT + 10
+    standing = card["standing"]
+    c.text(LEFT + 6, y, "Total", size=10, font="bold")
+    c.text(COLUMNS[1][0] + 6, y, f"{standing['marks_obtained']:g}", size=10, font="bold")
+    c.text(COLUMNS[2][0] + 6, y, f"{standing['total_marks']:g}", size=10, font="bold")
+    y -= 30
+    c.text(LEFT, y, f"Percentage: {standing['percentage']:.2f}%", size=11, font="bold")
+    c.text(LEFT + 200, y, f"Rank: {standing['rank']} of {card['class_size']}", size=11)
+    c.text(LEFT + 340, y, f"Percentile: {standing['percentile']:g}", size=11)
+
+    attendance = card.get("attendance")
+    if attendance:
+        y -= 22
+        c.text(
+            LEFT, y,
+            f"Attendance: {attendance['present_days']:g} of {attendance['working_days']} days "
+            f"({attendance['attendance_percentage']:g}%)",
+            size=11,
+        )
+    return template.render(c.stream())
+
+
+# Set in each pool worker by _init_worker
+_template: Optional[PageTemplate] = None
+
+
+def _init_worker(school_name: str) -> None:
+    global _template
+    _template = compile_template(school_name)
+
+
+def _render_chunk(cards: List[Dict[str, Any]]) -> List[Tuple[str, bytes]]:
+    return [(card["filename"], draw_card(_template, card)) for card in cards]
+
+
+class ReportCardGenerator:
+    """
+    Owns the render pool and writes each batch's zip.
+
+    The pool is created on first use and kept, so worker start-up and
+    template compilation are paid once per process rather than per batch.
+    Cards are sent to workers in chunks of `chunk_size` to amortize
+    inter-process overhead, as one card takes well under a millisecond.
+    Zips in `output_dir` older than `retention` seconds are deleted when
+    the next batch starts.
+    """
+
+    def __init__(self, workers: int, output_dir: str, school_name: str, chunk_size: int = 25, retention: float = 86400):
+        self.workers = workers
+        self.output_dir = output_dir
+        self.school_name = school_name
+        self.chunk_size = chunk_size
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_init_worker, initargs=(self.school_name,),
+                )
+            return self._executor
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for entry in os.scandir(self.output_dir):
+            if entry.name.endswith(".zip") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+
+    def render(
+        self,
+        cards: List[Dict[str, Any]],
+        name: str,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Render `cards` into `<output_dir>/<name>.zip`, calling `progress(done, total)` as chunks finish.
+
+        Returns the path and throughput of the batch.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._prune()
+        path = os.path.join(self.output_dir, f"{name}.zip")
+        partial = path + ".part"
+        started = time.perf_counter()
+        completed = 0
+        try:
+            pool = self._pool()
+            pending = {
+                pool.submit(_render_chunk, cards[i:i + self.chunk_size])
+                for i in range(0, len(cards), self.chunk_size)
+            }
+            # PDF streams are already deflated by the workers
+            with zipfile.ZipFile(partial, "w", zipfile.ZIP_STORED) as archive:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for filename, pdf in future.result():
+                            archive.writestr(filename, pdf)
+                            completed += 1
+                    if progress:
+                        progress(completed, len(cards))
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        elapsed = time.perf_counter() - started
+        cards_per_second = completed / elapsed if completed else 0.0
+        return {
+            "path": path,
+            "cards": completed,
+            "seconds": round(elapsed, 3),
+            "workers": self.workers,
+            "cards_per_second": round(cards_per_second, 1),
+            "cards_per_second_per_core": round(cards_per_second / self.workers, 1),
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+report_card_generator = ReportCardGenerator(
+    workers=settings.REPORT_CARD_WORKERS or os.cpu_count() or 1,
+    output_dir=settings.REPORT_CARD_DIR,
+    school_name=settings.REPORT_CARD_SCHOOL_NAME,
+)
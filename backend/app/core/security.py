@@ -1,9 +1,197 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
+
+# min == max == default, so hashes of any other cost are flagged for rehash
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    # Returns a replacement hash when the stored one uses an outdated cost
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised instead of queueing when too many hashes are already pending."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool with a cap on pending work.
+
+    Keeping hashing off the request threadpool means a login storm can only
+    saturate these workers, not every cheap GET; once `max_pending` hashes are
+    queued, new ones fail fast with PasswordHasherBusy (served as a 503).
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHasherBusy()
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(get_password_hash, password))
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await asyncio.wrap_future(self._submit(_verify_and_update, plain_password, hashed_password))
+
+    def hash_blocking(self, password: str) -> str:
+        """For sync endpoints: same admission control, waits on the pool."""
+        return self._submit(get_password_hash, password).result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+class TokenRevocationList:
+    """
+    In-memory set of revoked token ids (and refresh token families).
+
+    Entries are kept only until the token would have expired anyway, so the
+    list stays small. It is per process and lost on restart, which limits
+    what it guarantees:
+
+    - with several workers, a revocation (logout, a rotated refresh token)
+      is only seen by the worker that handled it; elsewhere access tokens
+      lapse within ACCESS_TOKEN_EXPIRE_MINUTES, but a refresh token could
+      be replayed once on another worker without the theft being noticed;
+    - after a restart, rotated refresh tokens are usable again until they
+      expire.
+
+    Deployments running several workers should move this to shared storage
+    (a table or Redis keyed by jti) behind the same methods.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, key: str, expires_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._revoked[key] = expires_at
+            expired = [k for k, exp in self._revoked.items() if exp < now]
+            for k in expired:
+                del self._revoked[k]
+
+    def revoke_once(self, key: str, expires_at: float) -> bool:
+        """Revoke `key`, returning False if it already was (check and set are atomic)."""
+        with self._lock:
+            if key in self._revoked:
+                return False
+            self._revoked[key] = expires_at
+            return True
+
+    def is_revoked(self, key: Optional[str]) -> bool:
+        return key is not None and key in self._revoked
+
+
+revoked_tokens = TokenRevocationList()
+
+
+def create_access_token(user: Any, student_profile: Any = None) -> Tuple[str, int]:
+    """
+    Sign an access token carrying everything endpoints need about the caller.
+    Returns (token, lifetime in seconds).
+    """
+    lifetime = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    now = int(time.time())
+    claims = {
+        "sub": str(user.id),
+        "type": "access",
+        "email": user.email,
+        "name": user.full_name,
+        "role": user.role,
+        "student": {
+            "id": student_profile.id,
+            "class_grade": student_profile.class_grade,
+            "section": student_profile.section,
+        } if student_profile else None,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + lifetime,
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM), lifetime
+
+
+def create_refresh_token(user_id: int, family: Optional[str] = None) -> str:
+    """
+    Sign a single-use refresh token. Rotated tokens share a `fam` id so that
+    replaying a used one can revoke the whole chain.
+    """
+    now = int(time.time())
+    claims = {
+        "sub": str(user_id),
+        "type": "refresh",
+        "fam": family or uuid.uuid4().hex,
+        "jti": uuid.uuid4().hex,
+        "iat": now,
+        "exp": now + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    }
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def decode_token(token: str, token_type: str, check_revoked: bool = True) -> Dict[str, Any]:
+    """
+    Verify signature, expiry and type; raises JWTError on any failure.
+    """
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    if claims.get("type") != token_type:
+        raise JWTError(f"Expected a {token_type} token")
+    if check_revoked and revoked_tokens.is_revoked(claims.get("jti")):
+        raise JWTError("Token has been revoked")
+    return claims
@@ -0,0 +1,53 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import BinaryIO, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _extension(filename: str) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,10}", ext) else ""
+
+
+def store_upload(source: BinaryIO, filename: str, upload_dir: str) -> Tuple[str, int, bool]:
+    """
+    Copy `source` into content-addressed storage under `upload_dir`.
+
+    Files are stored as <aa>/<sha256><ext>, where <aa> is the first two hex
+    digits of the hash, so identical attachments share one file whatever
+    they were called. The copy is hashed as it is written to a temporary
+    file in the same directory and then renamed into place, so readers
+    never see a partial file. Blocking; run it in a thread.
+
+    Returns (path relative to upload_dir, size in bytes, whether the
+    content was already stored).
+    """
+    digest = hashlib.sha256()
+    size = 0
+    os.makedirs(upload_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            while chunk := source.read(CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                tmp.write(chunk)
+
+        sha256 = digest.hexdigest()
+        relative_path = os.path.join(sha256[:2], sha256 + _extension(filename))
+        path = os.path.join(upload_dir, relative_path)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+            return relative_path, size, True
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Uploaded files are served by StaticFiles; mkstemp creates them 0600
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        return relative_path, size, False
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
@@ -1,6 +1,43 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.assemble_db_connection, pool_pre_ping=True)
+
+def _create_engine(url: str):
+    connect_args = {}
+    if url.startswith("sqlite"):
+        # SQLite connections are shared across FastAPI's threadpool
+        connect_args["check_same_thread"] = False
+    return create_engine(url, pool_pre_ping=True, connect_args=connect_args)
+
+
+engine = _create_engine(settings.assemble_db_connection)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engine for `async def` endpoints, so requests waiting on the database
+# don't each hold a threadpool slot. expire_on_commit=False keeps loaded
+# attributes usable without an implicit (blocking) refresh.
+async_engine = create_async_engine(settings.assemble_async_db_connection, pool_pre_ping=True)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autocommit=False, autoflush=False, expire_on_commit=False
+)
+
+
+def rebind(url: str) -> None:
+    """
+    Point both engines, and the session factories, at another database.
+
+    For the test scripts, which each want a fresh database; read `engine`
+    from this module after calling it, as names imported earlier keep the
+    old engines.
+    """
+    global engine, async_engine
+    settings.SQLALCHEMY_DATABASE_URI = url
+    engine.dispose()
+    # The async pool's connections belong to whichever event loop opened them
+    async_engine.sync_engine.dispose(close=False)
+    engine = _create_engine(settings.assemble_db_connection)
+    async_engine = create_async_engine(settings.assemble_async_db_connection, pool_pre_ping=True)
+    SessionLocal.configure(bind=engine)
+    AsyncSessionLocal.configure(bind=async_engine)
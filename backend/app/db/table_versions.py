@@ -0,0 +1,89 @@
+import threading
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import bulk_upsert
+from app.models.cache_version import CacheVersion
+
+
+class TableVersions:
+    """
+    Per-table change counters, bumped whenever a session commits writes to a table.
+
+    Caches fold the versions of the tables they read into their keys, so any
+    committed write moves readers on to fresh entries.
+
+    The counters live in this process: writes committed by other processes
+    (worker.py, other API workers) only show once the entries they affect
+    expire. Caches that must follow those writes read a shared counter
+    instead (see shared_version).
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, *tables: str) -> Tuple[int, ...]:
+        return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return dict(self._versions)
+
+
+table_versions = TableVersions()
+
+
+def bump_shared_versions(db: Session, names: Iterable[str]) -> None:
+    """
+    Increment the shared counters `names` in `db`'s transaction, so they
+    commit (or roll back) with the write they describe. Does not commit.
+    """
+    # Sorted so concurrent writers lock the rows in the same order
+    rows = [{"name": name, "version": 1} for name in sorted(set(names))]
+    bulk_upsert(db, CacheVersion, rows, index_elements=["name"], increment_columns=["version"], returning=False)
+
+
+def shared_version(db: Session, name: str) -> int:
+    """The current value of a counter bumped with bump_shared_versions, from any process."""
+    return db.scalar(select(CacheVersion.version).where(CacheVersion.name == name)) or 0
+
+
+def _pending(session: Session) -> set:
+    return session.info.setdefault("changed_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_tables(session, flush_context):
+    changed = _pending(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__table__", None)
+        if table is not None:
+            changed.add(table.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_statement_tables(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements (upserts, rollups) skip the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _pending(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed_tables(session):
+    changed = session.info.pop("changed_tables", None)
+    if changed:
+        table_versions.bump(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_uncommitted_tables(session):
+    session.info.pop("changed_tables", None)
@@ -0,0 +1,69 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy.orm import Session
+
+# Bind parameter ceilings per dialect; chunks are sized so one statement
+# never exceeds them (a 45-student class is always a single statement).
+MAX_BIND_PARAMS = {
+    "postgresql": 65535,
+    "sqlite": 32766,
+}
+
+def _dialect_insert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+    return dialect, insert
+
+def bulk_upsert(
+    db: Session,
+    model: Any,
+    rows: Iterable[Dict[str, Any]],
+    index_elements: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    increment_columns: Sequence[str] = (),
+    returning: bool = True,
+) -> List[Any]:
+    """
+    Insert rows or update them on conflict with `index_elements`, returning ORM objects.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE ... RETURNING, so the whole payload is
+    written in one statement per chunk instead of a SELECT + refresh per row.
+    Rows sharing a conflict key are collapsed (last one wins), since a single
+    statement may not touch the same row twice. Columns in `increment_columns`
+    are added to the stored value on conflict instead of replacing it. Does not
+    commit.
+    """
+    unique_rows = {}
+    for row in rows:
+        unique_rows[tuple(row[col] for col in index_elements)] = row
+    if not unique_rows:
+        return []
+
+    values = list(unique_rows.values())
+    columns = list(values[0].keys())
+    if update_columns is None:
+        update_columns = [col for col in columns if col not in index_elements and col not in increment_columns]
+
+    dialect, insert = _dialect_insert(db)
+    chunk_size = max(1, MAX_BIND_PARAMS[dialect] // len(columns))
+
+    upserted = []
+    for start in range(0, len(values), chunk_size):
+        stmt = insert(model).values(values[start:start + chunk_size])
+        set_ = {col: stmt.excluded[col] for col in update_columns}
+        set_.update({col: model.__table__.c[col] + stmt.excluded[col] for col in increment_columns})
+        stmt = stmt.on_conflict_do_update(index_elements=list(index_elements), set_=set_)
+        if not returning:
+            db.execute(stmt)
+            continue
+        upserted.extend(
+            db.scalars(
+                stmt.returning(model),
+                execution_options={"populate_existing": True},
+            ).all()
+        )
+    return upserted
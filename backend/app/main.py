@@ -1,12 +1,65 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from app.api.api_v1.api import api_router
-from app.core.config import settings
+from app.api.api_v1.endpoints.fees import fee_reminder_loop
+from app.api.compression import CompressionMiddleware
+from app.api.etag import ConditionalGetMiddleware
+from app.api.responses import default_response_class
+from app.api.static_files import AppStaticFiles
+from app.core.config import check_secret_key, settings
+from app.core.images import image_derivatives
+from app.core.jobs import start_worker_threads
+from app.core.pubsub import notification_broker
+from app.core.report_cards import report_card_generator
+from app.core.security import PasswordHasherBusy, password_hasher
+from app.db.session import SessionLocal
 
-from fastapi.staticfiles import StaticFiles
 
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_secret_key()
+    reminders = asyncio.create_task(fee_reminder_loop(settings.FEE_REMINDER_INTERVAL)) if settings.FEE_REMINDER_IN_PROCESS else None
+    stop_job_workers = start_worker_threads(SessionLocal, settings.JOB_IN_PROCESS_WORKERS)
+    yield
+    notification_broker.close()
+    if reminders is not None:
+        reminders.cancel()
+    stop_job_workers()
+    password_hasher.shutdown()
+    report_card_generator.shutdown()
+    image_derivatives.shutdown()
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=default_response_class(),
+    lifespan=lifespan,
+)
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Shed load quickly instead of letting a login storm queue up
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+# 304s for GET routes that opt in with Depends(conditional_get)
+app.add_middleware(ConditionalGetMiddleware)
+
+# Negotiated br/gzip; sits outside the ETag middleware so 304s stay empty
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESSLEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
 
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
@@ -17,10 +70,11 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],
     )
 
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", AppStaticFiles(directory="static"), name="static")
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
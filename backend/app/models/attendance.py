@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum, Index, UniqueConstraint, case
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 import enum
@@ -11,8 +11,28 @@ class AttendanceStatus(str, enum.Enum):
     HOLIDAY = "Holiday"
     WEEKEND = "Weekend"
 
+# Share of a day each status counts as attended, wherever an attendance
+# percentage is shown (dashboard and /attendance/summary); others count 0
+ATTENDED_WEIGHTS = {
+    AttendanceStatus.PRESENT.value: 1.0,
+    AttendanceStatus.LATE.value: 1.0,
+    AttendanceStatus.HALF_DAY.value: 0.5,
+}
+
+# Days the school was closed; they don't count towards attendance
+NON_WORKING_STATUSES = [AttendanceStatus.HOLIDAY.value, AttendanceStatus.WEEKEND.value]
+
+def attended_weight(status):
+    """SQL expression for ATTENDED_WEIGHTS of a status column."""
+    return case(*[(status == value, weight) for value, weight in ATTENDED_WEIGHTS.items()], else_=0)
+
 class Attendance(Base):
     __tablename__ = "attendance"
+    __table_args__ = (
+        UniqueConstraint("student_id", "date", name="uq_attendance_student_date"),
+        # Class register views filter by class, section and date range
+        Index("ix_attendance_class_section_date", "class_grade", "section", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
@@ -24,3 +44,18 @@ class Attendance(Base):
     absence_type = Column(String, nullable=True) # Morning, Afternoon, Full Day
 
     student = relationship("StudentProfile", backref="attendance_records")
+
+class AttendanceDailyRollup(Base):
+    """
+    Number of attendance records per date and status, kept in step with
+    attendance writes so dashboards never scan the raw table.
+    """
+    __tablename__ = "attendance_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("date", "status", name="uq_attendance_daily_rollups_date_status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False)
+    status = Column(String, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String
+from app.db.base_class import Base
+
+class CacheVersion(Base):
+    """
+    A change counter shared by every process, for caches that must follow
+    writes made elsewhere (e.g. marks imported by worker.py).
+
+    Bumped in the transaction making the change (see
+    app.db.table_versions.bump_shared_versions), so it commits with it.
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
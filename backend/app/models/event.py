@@ -6,6 +6,6 @@ class Holiday(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
-    date = Column(Date, nullable=False)
+    date = Column(Date, nullable=False, index=True)
     type = Column(String) # 'holiday' or 'event'
     description = Column(String, nullable=True)
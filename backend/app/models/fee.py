@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 import enum
@@ -9,9 +9,13 @@ class FeeStatus(str, enum.Enum):
 
 class Fee(Base):
     __tablename__ = "fees"
+    __table_args__ = (
+        # Range scan for the reminder job: pending fees due between two dates
+        Index("ix_fees_status_due_date", "status", "due_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False, index=True)
     academic_year = Column(String, nullable=False)  # e.g., "2025-2026"
     fee_type = Column(String, nullable=False)  # e.g., "Term 1 Fee", "Transport Fee"
     amount = Column(Float, nullable=False)
@@ -22,3 +26,19 @@ class Fee(Base):
     reference_number = Column(String, nullable=False) # e.g., "FR/JP/2025-26/6729"
 
     student = relationship("StudentProfile", backref="fees")
+
+class FeeReminder(Base):
+    """
+    A reminder sent for a fee within one reminder window (days before the
+    due date), so reruns of the reminder job do not send it again.
+    """
+    __tablename__ = "fee_reminders"
+    __table_args__ = (
+        UniqueConstraint("fee_id", "window_days", name="uq_fee_reminders_fee_window"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    fee_id = Column(Integer, ForeignKey("fees.id", ondelete="CASCADE"), nullable=False)
+    window_days = Column(Integer, nullable=False)
+    batch_id = Column(Integer, ForeignKey("notification_batches.id"), nullable=True)
+    sent_on = Column(Date, nullable=False)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, DateTime, Index, Integer, JSON, String
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class Job(Base):
+    """
+    A unit of background work, claimed by workers through app/core/jobs.py.
+
+    status goes queued -> running -> done | failed; a failed attempt with
+    attempts left goes back to queued with a later run_after. locked_at is
+    refreshed by its worker's heartbeat and by progress updates, and a
+    running job whose lock is older than JOB_LEASE_SECONDS is presumed
+    abandoned and claimed again, as another attempt (or failed, if that was
+    its last).
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claim query: next queued job that is due
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    progress_done = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -12,13 +12,39 @@ class NotificationBatch(BaseModel):
     message = Column(String, nullable=False)
     target_grade = Column(String, nullable=True)
     target_section = Column(String, nullable=True)
-    target_student_id = Column(Integer, nullable=True)
+    target_student_id = Column(Integer, nullable=True, index=True)
     attachment_url = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    # Maintained on send and on read; repair_notification_counters.py recomputes them
+    total_count = Column(Integer, nullable=False, default=0, server_default="0")
+    read_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     notifications = relationship("Notification", back_populates="batch")
+    receipts = relationship("NotificationReceipt", back_populates="batch")
+
+class NotificationReceipt(Base):
+    """
+    Per-student read marker for a batch, written lazily when the student reads it.
+    """
+    __tablename__ = "notification_receipts"
+    __table_args__ = (
+        UniqueConstraint("batch_id", "student_id", name="uq_notification_receipts_batch_student"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    batch_id = Column(Integer, ForeignKey("notification_batches.id"), nullable=False)
+    student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
+    read_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    batch = relationship("NotificationBatch", back_populates="receipts")
 
 class Notification(Base):
+    """
+    Legacy fanned-out copy of a batch, one row per recipient.
+
+    No longer written; inboxes are resolved from NotificationBatch targeting.
+    migrate_notification_batches.py converts existing rows into receipts.
+    """
     __tablename__ = "notifications"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 class Result(Base):
     __tablename__ = "results"
+    __table_args__ = (
+        UniqueConstraint("student_id", "exam_title", "subject", name="uq_results_student_exam_subject"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("student_profiles.id"), nullable=False)
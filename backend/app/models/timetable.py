@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Time, Enum
+from sqlalchemy import Column, Integer, String, Time, Enum, Index
 from app.db.base_class import Base
 import enum
 
@@ -12,6 +12,10 @@ class DayOfWeek(str, enum.Enum):
 
 class Timetable(Base):
     __tablename__ = "timetable"
+    __table_args__ = (
+        # Serves the per-class lookup in timetable order without a sort
+        Index("ix_timetable_class_section_day_start", "class_grade", "section", "day_of_week", "start_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     class_grade = Column(String, nullable=False) # e.g., "1"
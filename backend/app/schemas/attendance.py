@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import date
 
@@ -19,3 +19,31 @@ class Attendance(AttendanceBase):
 
     class Config:
         from_attributes = True
+
+class StudentAttendanceSummary(BaseModel):
+    student_id: int
+    class_grade: Optional[str] = None
+    section: Optional[str] = None
+    working_days: int
+    present_days: float
+    absent_days: int
+    half_days: int
+    late_count: int
+    attendance_percentage: float
+    longest_absence_streak: int
+
+class ClassAttendanceSummary(BaseModel):
+    class_grade: Optional[str] = None
+    section: Optional[str] = None
+    students: int
+    student_days: int
+    present_days: float
+    absent_days: int
+    late_count: int
+    attendance_percentage: float
+
+class AttendanceSummary(BaseModel):
+    date_from: date
+    date_to: date
+    classes: List[ClassAttendanceSummary]
+    students: List[StudentAttendanceSummary]
@@ -21,3 +21,34 @@ class Fee(FeeBase):
 
     class Config:
         from_attributes = True
+
+class FeeBulkCreate(BaseModel):
+    academic_year: str
+    fee_type: str
+    amount: float
+    due_date: date
+    class_grade: str
+    # Every section of the grade when omitted
+    section: Optional[str] = None
+
+class FeeBulkResult(BaseModel):
+    created: int
+    # Students that already had this fee for the year are skipped
+    skipped: int
+    reference_prefix: str
+
+class FeeLedgerEntry(BaseModel):
+    class_grade: Optional[str] = None
+    section: Optional[str] = None
+    student_id: Optional[int] = None
+    student_name: Optional[str] = None
+    admission_number: Optional[str] = None
+    students: int
+    fee_count: int
+    total_amount: float
+    paid_amount: float
+    outstanding_amount: float
+    overdue_amount: float
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: str
+    attempts: int
+    max_attempts: int
+    progress_done: int
+    progress_total: Optional[int] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    run_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
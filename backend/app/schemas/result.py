@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 from datetime import date
 
@@ -19,3 +19,50 @@ class Result(ResultBase):
 
     class Config:
         from_attributes = True
+
+class ResultImportError(BaseModel):
+    row: int
+    error: str
+
+class ResultImportReport(BaseModel):
+    processed: int = 0
+    upserted: int = 0
+    failed: int = 0
+    errors: List[ResultImportError] = []
+    errors_truncated: bool = False
+
+class ExamStudentResult(BaseModel):
+    student_id: int
+    class_grade: Optional[str] = None
+    section: Optional[str] = None
+    subjects: int
+    marks_obtained: float
+    total_marks: float
+    percentage: float
+    rank: int
+    percentile: float
+
+class SubjectStatistics(BaseModel):
+    subject: str
+    students: int
+    mean: float
+    median: float
+    stddev: float
+    min: float
+    max: float
+    grade_distribution: Dict[str, int]
+
+class ExamAnalytics(BaseModel):
+    exam_title: str
+    class_grade: Optional[str] = None
+    section: Optional[str] = None
+    students: List[ExamStudentResult]
+    subjects: List[SubjectStatistics]
+
+class ReportCardRequest(BaseModel):
+    exam_title: str
+    class_grade: str
+    section: Optional[str] = None
+    # Attendance period printed on the cards; defaults to the academic year up to the exam
+    attendance_from: Optional[date] = None
+    attendance_to: Optional[date] = None
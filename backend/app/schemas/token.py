@@ -0,0 +1,22 @@
+from typing import Optional
+from pydantic import BaseModel
+
+class TokenStudent(BaseModel):
+    id: int
+    class_grade: Optional[str] = None
+    section: Optional[str] = None
+
+class TokenPrincipal(BaseModel):
+    """
+    The authenticated user, rebuilt from access token claims without a DB query.
+    """
+    id: int
+    email: str
+    full_name: Optional[str] = None
+    role: str
+    student_profile: Optional[TokenStudent] = None
+    jti: str
+    exp: int
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
@@ -0,0 +1,51 @@
+"""
+Benchmark POST /attendance/batch: database round trips and latency per batch size.
+
+    python bench_attendance_batch.py [--url postgresql://...] [--runs 5]
+
+Round trips should stay flat as the batch grows (one upsert per chunk plus
+the transaction bookkeeping), for both fresh inserts and re-marking.
+"""
+from datetime import date
+
+from app.api.api_v1.endpoints.attendance import mark_batch_attendance
+from app.schemas.attendance import AttendanceCreate
+from bench_utils import QueryCounter, make_session, parse_args, timed, User, StudentProfile
+
+BATCH_SIZES = [1, 45, 500, 3000]
+
+
+def seed_students(db, count):
+    users = [User(email=f"student{i}@school.com", hashed_password="x", role="student") for i in range(count)]
+    db.add_all(users)
+    db.flush()
+    profiles = [StudentProfile(user_id=u.id, admission_number=f"ADM{i:05d}", class_grade="5", section="A")
+                for i, u in enumerate(users)]
+    db.add_all(profiles)
+    db.commit()
+    return [p.id for p in profiles]
+
+
+def main():
+    args = parse_args(__doc__, runs=5)
+    engine, Session = make_session(args.url)
+    db = Session()
+    student_ids = seed_students(db, max(BATCH_SIZES))
+
+    print(f"{'batch':>6} {'mode':>7} {'round trips':>12} {'avg ms':>9}")
+    for size in BATCH_SIZES:
+        for run in range(args.runs):
+            day = date(2025, 6, 1 + (size % 28))
+            status = "Present" if run % 2 == 0 else "Absent"
+            payload = [AttendanceCreate(student_id=sid, date=day, status=status, class_grade="5", section="A")
+                       for sid in student_ids[:size]]
+            with QueryCounter(engine) as counter, timed() as elapsed:
+                mark_batch_attendance(payload, db)
+            mode = "insert" if run == 0 else "update"
+            if run <= 1:
+                print(f"{size:>6} {mode:>7} {counter.count:>12} {elapsed['ms']:>9.1f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
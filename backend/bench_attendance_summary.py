@@ -0,0 +1,105 @@
+"""
+Benchmark GET /attendance/summary on a year of data for a 3,000-student school.
+
+    python bench_attendance_summary.py [--url postgresql://...] [--students 3000] [--days 365]
+
+Compares the single aggregating query against what teachers' clients did
+before: pull the raw rows and compute percentages and streaks in Python.
+Students are spread over grades 1-12, sections A-E; weekends are not
+recorded.
+
+In-process SQLite makes shipping raw rows nearly free, which flatters the
+client-side column; the rows column shows what each approach moves over the
+wire (and through the API) against a networked database. Repeat requests
+are served from the response cache and skip both.
+"""
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+from app.api.api_v1.endpoints.attendance import attendance_summary_query, summarize_attendance
+from bench_utils import Attendance, StudentProfile, User, make_session, parse_args, percentile, timed
+
+STATUSES = ["Present"] * 88 + ["Absent"] * 6 + ["Late"] * 4 + ["Half Day"] * 2
+START = date(2024, 6, 1)
+
+
+def seed(db, students, days):
+    rng = random.Random(42)
+    db.bulk_insert_mappings(User, [
+        {"id": i, "email": f"student{i}@school.com", "hashed_password": "x", "role": "student"}
+        for i in range(1, students + 1)
+    ])
+    classes = {i: (str(1 + i % 12), "ABCDE"[i // 12 % 5]) for i in range(1, students + 1)}
+    db.bulk_insert_mappings(StudentProfile, [
+        {"id": i, "user_id": i, "class_grade": grade, "section": section} for i, (grade, section) in classes.items()
+    ])
+    rows = 0
+    for offset in range(days):
+        day = START + timedelta(days=offset)
+        if day.weekday() >= 5:
+            continue
+        db.bulk_insert_mappings(Attendance, [
+            {"student_id": i, "date": day, "status": rng.choice(STATUSES), "class_grade": grade, "section": section}
+            for i, (grade, section) in classes.items()
+        ])
+        rows += students
+    db.commit()
+    return rows
+
+
+def client_side(db, class_grade, section, date_from, date_to):
+    """What the admin portal did: fetch every row and aggregate locally. Returns the rows fetched."""
+    query = db.query(Attendance.student_id, Attendance.date, Attendance.status).filter(
+        Attendance.class_grade == class_grade, Attendance.date.between(date_from, date_to),
+    )
+    if section:
+        query = query.filter(Attendance.section == section)
+    per_student = defaultdict(list)
+    rows = query.order_by(Attendance.student_id, Attendance.date).all()
+    for student_id, day, status in rows:
+        per_student[student_id].append(status)
+    summary = {}
+    for student_id, statuses in per_student.items():
+        present = sum(1 if s in ("Present", "Late") else 0.5 if s == "Half Day" else 0 for s in statuses)
+        longest = run = 0
+        for s in statuses:
+            run = run + 1 if s == "Absent" else 0
+            longest = max(longest, run)
+        summary[student_id] = (present / len(statuses) * 100, longest)
+    return len(rows)
+
+
+def main():
+    args = parse_args(__doc__, students=3000, days=365, runs=5)
+    engine, Session = make_session(args.url)
+    db = Session()
+    with timed() as elapsed:
+        rows = seed(db, args.students, args.days)
+    print(f"{rows} attendance rows seeded in {elapsed['ms'] / 1000:.1f} s")
+
+    end = START + timedelta(days=args.days - 1)
+    cases = [
+        ("class 5-A, one month", "5", "A", START, START + timedelta(days=29)),
+        ("class 5-A, full year", "5", "A", START, end),
+        ("grade 5, full year", "5", None, START, end),
+    ]
+    print(f"{'range':24} {'students':>8} {'SQL p50 ms':>11} {'rows':>6} {'client p50 ms':>14} {'rows':>7}")
+    for name, grade, section, date_from, date_to in cases:
+        sql_ms, client_ms = [], []
+        for _ in range(args.runs):
+            with timed() as elapsed:
+                summary = summarize_attendance(
+                    db.execute(attendance_summary_query(grade, section, date_from, date_to)).all(), date_from, date_to,
+                )
+            sql_ms.append(elapsed["ms"])
+            with timed() as elapsed:
+                raw_rows = client_side(db, grade, section, date_from, date_to)
+            client_ms.append(elapsed["ms"])
+        print(f"{name:24} {len(summary.students):>8} {percentile(sql_ms, 50):>11.1f} {len(summary.students):>6} "
+              f"{percentile(client_ms, 50):>14.1f} {raw_rows:>7}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
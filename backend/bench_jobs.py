@@ -0,0 +1,102 @@
+"""
+Benchmark the background job queue.
+
+    python bench_jobs.py [--jobs 400] [--workers 1,2,4] [--work-ms 5] [--url postgresql://...]
+
+Queues --jobs jobs whose handler sleeps --work-ms (standing in for I/O such
+as sending mail), then drains them with each number of worker processes
+and reports jobs/sec. Every run also checks that each job ran exactly once
+and that nothing was left queued or running.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from bench_utils import Job, use_app_database
+
+BENCH_KIND = "bench.sleep"
+
+
+def drain(log_path: str, work_ms: float) -> None:
+    from app.core.jobs import job_handler, run_worker
+    from app.db.session import SessionLocal, engine
+
+    engine.dispose(close=False)
+
+    @job_handler(BENCH_KIND)
+    def sleep(db, context, payload):
+        time.sleep(work_ms / 1000)
+        # O_APPEND writes of one short line are atomic across processes
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            os.write(fd, f"{context.job_id}\n".encode())
+        finally:
+            os.close(fd)
+
+    # Stop once nothing is left to claim rather than polling forever
+    stop = threading.Event()
+
+    def watch_queue():
+        while not stop.wait(0.05):
+            db = SessionLocal()
+            try:
+                if not db.query(Job).filter(Job.status.in_(("queued", "running"))).count():
+                    stop.set()
+            finally:
+                db.close()
+
+    threading.Thread(target=watch_queue, daemon=True).start()
+    run_worker(SessionLocal, stop, poll_interval=0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--jobs", type=int, default=400)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--work-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    use_app_database(args.url)
+
+    from app.db.session import SessionLocal, engine
+
+    print(f"{args.jobs} jobs of {args.work_ms:g} ms, {os.cpu_count()} CPUs, {engine.url.get_backend_name()}")
+    print(f"{'workers':>8} {'seconds':>9} {'jobs/s':>9} {'ran twice':>10} {'left':>6}")
+    for workers in sorted({int(n) for n in args.workers.split(",")}):
+        db = SessionLocal()
+        db.query(Job).delete()
+        db.bulk_insert_mappings(Job, [
+            {"kind": BENCH_KIND, "payload": {}, "status": "queued", "attempts": 0, "max_attempts": 3,
+             "run_after": datetime.now(timezone.utc), "progress_done": 0}
+            for _ in range(args.jobs)
+        ])
+        db.commit()
+        db.close()
+        engine.dispose()
+
+        log_path = tempfile.mkstemp(suffix=".log")[1]
+        processes = [multiprocessing.Process(target=drain, args=(log_path, args.work_ms)) for _ in range(workers)]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        with open(log_path) as f:
+            runs = f.read().split()
+        os.remove(log_path)
+        db = SessionLocal()
+        left = db.query(Job).filter(Job.status != "done").count()
+        db.close()
+        twice = len(runs) - len(set(runs))
+        print(f"{workers:>8} {elapsed:>9.2f} {len(set(runs)) / elapsed:>9.0f} {twice:>10} {left:>6}")
+        assert twice == 0 and left == 0 and len(set(runs)) == args.jobs
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark a login storm: logins/sec, and the latency of cheap non-auth
+requests (GET /events/) served at the same time.
+
+    python bench_login_storm.py [--url postgresql://...] [--logins 200] [--probes 8]
+
+Run with PASSWORD_HASH_WORKERS / PASSWORD_HASH_MAX_PENDING set to compare
+pool sizes; rejected logins (503) are counted separately.
+"""
+import asyncio
+import time
+
+import httpx
+
+from bench_utils import parse_args, percentile, use_app_database
+
+
+async def probe(client, latencies, stop):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/api/v1/events/")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(args):
+    from app.core.security import get_password_hash, password_hasher
+    from app.db.session import SessionLocal
+    from app.main import app
+    from bench_utils import Holiday, User
+    from datetime import date
+
+    db = SessionLocal()
+    hashed = get_password_hash("password123")
+    db.add_all([User(email=f"student{i}@school.com", hashed_password=hashed, role="student") for i in range(args.logins)])
+    db.add_all([Holiday(name=f"Holiday {i}", date=date(2025, 1, 1 + i), type="holiday") for i in range(20)])
+    db.commit()
+    db.close()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Baseline: probes alone
+        baseline, stop = [], asyncio.Event()
+        tasks = [asyncio.create_task(probe(client, baseline, stop)) for _ in range(args.probes)]
+        await asyncio.sleep(1)
+        stop.set()
+        await asyncio.gather(*tasks)
+
+        # Storm: every user logs in at once while the probes keep running
+        during, stop = [], asyncio.Event()
+        tasks = [asyncio.create_task(probe(client, during, stop)) for _ in range(args.probes)]
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/api/v1/auth/login", json={"email": f"student{i}@school.com", "password": "password123"})
+            for i in range(args.logins)
+        ])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await asyncio.gather(*tasks)
+
+    password_hasher.shutdown()
+    ok = sum(1 for r in responses if r.status_code == 200)
+    rejected = sum(1 for r in responses if r.status_code == 503)
+    print(f"pool workers: {password_hasher.workers}, max pending: {password_hasher.max_pending}")
+    print(f"logins: {ok} ok, {rejected} rejected (503) in {elapsed:.2f}s -> {ok / elapsed:.1f} logins/sec")
+    print(f"GET /events/ alone:        p50 {percentile(baseline, 50):7.1f} ms  p99 {percentile(baseline, 99):7.1f} ms")
+    print(f"GET /events/ during storm: p50 {percentile(during, 50):7.1f} ms  p99 {percentile(during, 99):7.1f} ms")
+
+
+def main():
+    args = parse_args(__doc__, logins=200, probes=8)
+    use_app_database(args.url)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
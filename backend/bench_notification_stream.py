@@ -0,0 +1,126 @@
+"""
+Benchmark idle notification stream connections.
+
+    python bench_notification_stream.py [--connections 2000]
+
+Starts the API with uvicorn in a child process, opens --connections
+server-sent event streams as one student each (raw sockets, to keep the
+client light), and reports the server's memory per idle connection and
+how long one notification addressed to all of them takes to reach every
+stream. A polling client instead costs a database query per interval.
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+
+from bench_utils import percentile, use_app_database
+
+
+def rss_kib(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+
+
+async def open_stream(port: int, token: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /api/v1/notifications/stream HTTP/1.1\r\nHost: localhost\r\n"
+        f"Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    await reader.readuntil(b"event: unread_count")
+    return reader, writer
+
+
+async def wait_for_notification(reader, started: float) -> float:
+    await reader.readuntil(b"event: notification")
+    return time.perf_counter() - started
+
+
+async def run(args, port: int, pid: int, students, admin_token: str):
+    baseline = rss_kib(pid)
+    start = time.perf_counter()
+    streams = []
+    for i in range(0, args.connections, 200):
+        streams += await asyncio.gather(*(open_stream(port, students[j % len(students)]) for j in range(i, min(i + 200, args.connections))))
+    connect_seconds = time.perf_counter() - start
+    await asyncio.sleep(1)
+    idle = rss_kib(pid)
+
+    import httpx
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        started = time.perf_counter()
+        waits = [asyncio.ensure_future(wait_for_notification(reader, started)) for reader, _ in streams]
+        await client.post(
+            "/api/v1/notifications/", json={"title": "Bench", "message": "To everyone"},
+            headers={"Authorization": f"Bearer {admin_token}"},
+        )
+        latencies = await asyncio.gather(*waits)
+    for _, writer in streams:
+        writer.close()
+
+    print(f"{args.connections} streams opened in {connect_seconds:.1f}s")
+    print(f"server RSS: {baseline / 1024:.0f} MiB before, {idle / 1024:.0f} MiB with all idle, "
+          f"{(idle - baseline) / args.connections:.1f} KiB per connection")
+    print(f"one notification to all: p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.0f} ms, last {max(latencies) * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=2000)
+    args = parser.parse_args()
+    # The server must verify the tokens signed here
+    os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+    use_app_database("sqlite://")
+
+    from app.core.security import create_access_token
+    from app.db.session import SessionLocal
+    from bench_utils import StudentProfile, User
+
+    db = SessionLocal()
+    tokens = []
+    for i in range(100):
+        user = User(email=f"s{i}@school.com", hashed_password="x", full_name=f"Student {i}", role="student")
+        db.add(user)
+        db.flush()
+        student = StudentProfile(user_id=user.id, class_grade="5", section="A")
+        db.add(student)
+        db.flush()
+        tokens.append(create_access_token(user, student)[0])
+    admin = User(email="admin@school.com", hashed_password="x", full_name="Admin", role="admin")
+    db.add(admin)
+    db.commit()
+    admin_token = create_access_token(admin)[0]
+    db.close()
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    env = {**os.environ, "JOB_IN_PROCESS_WORKERS": "0", "FEE_REMINDER_IN_PROCESS": "false"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--timeout-graceful-shutdown", "1"],
+        env=env, stderr=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(200):
+            try:
+                socket.create_connection(("127.0.0.1", port)).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        asyncio.run(run(args, port, server.pid, tokens, admin_token))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark offset vs cursor paging of attendance at increasing depth.
+
+    python bench_pagination.py [--url postgresql://...] [--students 1000] [--days 200]
+
+Offset pages get slower the deeper they are, since the database walks and
+discards every skipped row; cursor pages seek straight to their start.
+"""
+from datetime import date, timedelta
+
+from fastapi import Response
+
+from app.api.pagination import encode_cursor, paginate
+from bench_utils import Attendance, StudentProfile, User, make_session, parse_args, percentile, timed
+
+PAGE_SIZE = 100
+ORDER_BY = [(Attendance.id, False)]
+
+
+def seed(db, students, days):
+    db.bulk_insert_mappings(User, [
+        {"id": i, "email": f"student{i}@school.com", "hashed_password": "x", "role": "student"}
+        for i in range(1, students + 1)
+    ])
+    db.bulk_insert_mappings(StudentProfile, [
+        {"id": i, "user_id": i, "class_grade": "5", "section": "A"} for i in range(1, students + 1)
+    ])
+    start = date(2024, 6, 1)
+    for day in range(days):
+        db.bulk_insert_mappings(Attendance, [
+            {"student_id": sid, "date": start + timedelta(days=day), "status": "Present"}
+            for sid in range(1, students + 1)
+        ])
+    db.commit()
+
+
+def main():
+    args = parse_args(__doc__, students=1000, days=200, runs=5)
+    engine, Session = make_session(args.url)
+    db = Session()
+    seed(db, args.students, args.days)
+    total = args.students * args.days
+
+    print(f"{total} attendance rows, page size {PAGE_SIZE}")
+    print(f"{'depth':>8} {'offset p50 ms':>14} {'cursor p50 ms':>14}")
+    for depth in [0, total // 100, total // 10, total // 2, total - PAGE_SIZE]:
+        offset_ms, cursor_ms = [], []
+        # The cursor for a page is the sort key of the row just before it
+        first_id = db.query(Attendance.id).order_by(Attendance.id).offset(max(depth - 1, 0)).limit(1).scalar()
+        cursor = encode_cursor([first_id]) if depth else None
+        for _ in range(args.runs):
+            # Same paging helper and sort key as GET /attendance/
+            with timed() as elapsed:
+                paginate(db.query(Attendance), ORDER_BY, Response(), skip=depth, limit=PAGE_SIZE)
+            offset_ms.append(elapsed["ms"])
+            with timed() as elapsed:
+                paginate(db.query(Attendance), ORDER_BY, Response(), cursor=cursor, limit=PAGE_SIZE)
+            cursor_ms.append(elapsed["ms"])
+        print(f"{depth:>8} {percentile(offset_ms, 50):>14.2f} {percentile(cursor_ms, 50):>14.2f}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark report card rendering.
+
+    python bench_report_cards.py [--cards 500] [--workers 1,2,4]
+
+Renders synthetic cards through ReportCardGenerator with each worker
+count and reports cards/sec and cards/sec per core, then compares drawing
+on a template compiled once (what each worker does) against compiling the
+page template for every card.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from app.core.report_cards import ReportCardGenerator, compile_template, draw_card
+
+SUBJECTS = ["English", "Kannada", "Hindi", "Mathematics", "Science", "Social Studies", "Computer Science"]
+
+
+def build_cards(count):
+    cards = []
+    for i in range(1, count + 1):
+        subjects = [
+            {"subject": subject, "marks_obtained": (i * 7 + k * 13) % 100, "total_marks": 100, "grade": "ABCD"[(i + k) % 4]}
+            for k, subject in enumerate(SUBJECTS)
+        ]
+        obtained = sum(s["marks_obtained"] for s in subjects)
+        cards.append({
+            "filename": f"ADM{i:06d}_Student_{i}.pdf",
+            "exam_title": "Term 1",
+            "class_size": count,
+            "student": {"name": f"Student {i}", "admission_number": f"ADM{i:06d}", "class_grade": "5", "section": "A"},
+            "subjects": subjects,
+            "standing": {
+                "marks_obtained": obtained, "total_marks": 700, "percentage": round(obtained / 7, 2),
+                "rank": i, "percentile": round(100 - i * 100 / count, 1),
+            },
+            "attendance": {"present_days": 180 - i % 20, "working_days": 200, "attendance_percentage": round((180 - i % 20) / 2, 1)},
+        })
+    return cards
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cards", type=int, default=500)
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}")
+    args = parser.parse_args()
+
+    cards = build_cards(args.cards)
+    output_dir = tempfile.mkdtemp(prefix="bench_report_cards_")
+    try:
+        print(f"{args.cards} cards, {os.cpu_count()} CPUs")
+        print(f"{'workers':>8} {'seconds':>9} {'cards/s':>9} {'cards/s/core':>13} {'zip KiB':>9}")
+        for workers in sorted({int(n) for n in args.workers.split(",")}):
+            generator = ReportCardGenerator(workers=workers, output_dir=output_dir, school_name="Bench School")
+            # Warm the pool so process start-up is not counted
+            generator.render(cards[:workers], "warm-up")
+            batch = generator.render(cards, "bench")
+            generator.shutdown()
+            print(
+                f"{workers:>8} {batch['seconds']:>9.2f} {batch['cards_per_second']:>9.0f}"
+                f" {batch['cards_per_second_per_core']:>13.0f} {os.path.getsize(batch['path']) / 1024:>9.0f}"
+            )
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    sample = cards[:200]
+    start = time.perf_counter()
+    template = compile_template("Bench School")
+    for card in sample:
+        draw_card(template, card)
+    once = (time.perf_counter() - start) / len(sample) * 1000
+    start = time.perf_counter()
+    for card in sample:
+        draw_card(compile_template("Bench School"), card)
+    per_card = (time.perf_counter() - start) / len(sample) * 1000
+    print(f"\nper card, single process: template compiled once {once:.2f} ms, compiled per card {per_card:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark JSON encoding and compression of a /users/students page.
+
+    python bench_serialization.py [--rows 1000,10000] [--runs 5]
+
+Compares the encoders a response_model route can go through: FastAPI's
+classic jsonable_encoder + json.dumps path, the same with orjson rendering,
+and pydantic-core's direct dump_json (what current FastAPI uses when the
+default response class is left alone), then the wire size of the body
+uncompressed, gzipped and brotli-compressed at the levels the app uses.
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import date, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.api.compression import brotli
+from app.core.config import settings
+from app.schemas import student as student_schemas
+from bench_utils import Address, EmergencyContact, ParentProfile, StudentProfile, percentile
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def build_students(count):
+    """Detached ORM objects with every nested relation filled in."""
+    students = []
+    for i in range(1, count + 1):
+        student = StudentProfile(
+            id=i, user_id=i, admission_number=f"ADM{i:06d}", date_of_birth=date(2012, 1, 1) + timedelta(days=i % 900),
+            gender="F" if i % 2 else "M", blood_group="O+", class_grade=str(1 + i % 10), section="ABC"[i % 3],
+            photo_url=f"/static/uploads/student_{i}.jpg",
+        )
+        student.address = Address(id=i, street=f"{i} Main Road", city="Bengaluru", state="Karnataka", zip_code="560001", country="India")
+        student.parent_profile = ParentProfile(
+            id=i, father_name=f"Father {i}", father_occupation="Engineer", father_phone="9800000000",
+            mother_name=f"Mother {i}", mother_occupation="Doctor", mother_phone="9811111111",
+        )
+        student.emergency_contact = EmergencyContact(id=i, contact_name=f"Uncle {i}", relation_type="Uncle", phone_number="9822222222")
+        students.append(student)
+    return students
+
+
+def measure(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, percentile(samples, 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="1000,10000")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(List[student_schemas.StudentProfile])
+    for count in [int(n) for n in args.rows.split(",")]:
+        students = build_students(count)
+        validated = adapter.validate_python(students, from_attributes=True)
+
+        encoders = {
+            "jsonable_encoder + json": lambda: json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode(),
+            "dump_json (pydantic-core)": lambda: adapter.dump_json(validated),
+        }
+        if orjson is not None:
+            encoders["jsonable_encoder + orjson"] = lambda: orjson.dumps(jsonable_encoder(validated))
+
+        print(f"\n{count} students")
+        body = b""
+        for name, fn in encoders.items():
+            body, ms = measure(fn, args.runs)
+            print(f"  {name:28} {ms:8.1f} ms")
+
+        compressors = {"identity": lambda: body, f"gzip -{settings.GZIP_COMPRESSLEVEL}": lambda: gzip.compress(body, settings.GZIP_COMPRESSLEVEL)}
+        if brotli is not None:
+            compressors[f"br q{settings.BROTLI_QUALITY}"] = lambda: brotli.compress(body, quality=settings.BROTLI_QUALITY)
+        for name, fn in compressors.items():
+            wire, ms = measure(fn, args.runs)
+            print(f"  {name:28} {len(wire) / 1024:8.1f} KiB  ({ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark the /static mount against a plain StaticFiles mount.
+
+    python bench_static.py [--size-mb 20] [--runs 20]
+
+Both mounts serve the same temporary directory behind CompressionMiddleware,
+as in the app, and are driven in-process through httpx:
+
+- a large content-addressed PDF, fetched whole and resumed with Range;
+- a ~200 KB script, compressed per request (plain mount) or sent from
+  its precompressed .br sibling (app mount);
+- the Cache-Control each returns, i.e. whether a repeat view needs a request.
+"""
+import argparse
+import asyncio
+import brotli
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.api.compression import CompressionMiddleware
+from app.api.static_files import AppStaticFiles
+from app.core.config import settings
+from bench_utils import percentile
+
+
+def build_app(static_class, directory):
+    app = Starlette(routes=[Mount("/static", static_class(directory=directory))])
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_COMPRESSLEVEL, brotli_quality=settings.BROTLI_QUALITY,
+    )
+    return app
+
+
+async def measure(client, url, runs, headers=None):
+    samples, response = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = await client.get(url, headers=headers or {})
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentile(samples, 50), response
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench_static_")
+    try:
+        pdf = os.urandom(args.size_mb * 1024 * 1024)
+        digest = hashlib.sha256(pdf).hexdigest()
+        os.makedirs(os.path.join(directory, digest[:2]))
+        with open(os.path.join(directory, digest[:2], f"{digest}.pdf"), "wb") as f:
+            f.write(pdf)
+        script = b"".join(b'{"period": %d, "subject": "Mathematics", "teacher": "T%d"},\n' % (i, i % 40) for i in range(3500))
+        with open(os.path.join(directory, "app.js"), "wb") as f:
+            f.write(script)
+        with open(os.path.join(directory, "app.js.br"), "wb") as f:
+            f.write(brotli.compress(script, quality=11))
+        with open(os.path.join(directory, "app.js.gz"), "wb") as f:
+            f.write(gzip.compress(script, 9))
+
+        pdf_url = f"/static/{digest[:2]}/{digest}.pdf"
+        resume = {"Range": f"bytes={len(pdf) * 9 // 10}-"}
+        print(f"{args.size_mb} MB PDF, {len(script) // 1024} KB script, p50 of {args.runs} runs")
+        print(f"{'':34} {'plain StaticFiles':>22} {'app static mount':>22}")
+        rows = {}
+        for name, static_class in [("plain", StaticFiles), ("app", AppStaticFiles)]:
+            transport = httpx.ASGITransport(app=build_app(static_class, directory))
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                full_ms, full = await measure(client, pdf_url, args.runs)
+                resume_ms, resumed = await measure(client, pdf_url, args.runs, resume)
+                js_ms, js = await measure(client, "/static/app.js", args.runs * 5, {"Accept-Encoding": "gzip, br"})
+                rows.setdefault("PDF, whole", []).append(f"{full_ms:7.1f} ms {len(pdf) / 1024 / 1024 / full_ms * 1000:6.0f} MB/s")
+                rows.setdefault("PDF, resume last 10% (Range)", []).append(
+                    f"{resume_ms:7.1f} ms {resumed.status_code} {len(resumed.content) // 1024:>6} KB"
+                )
+                rows.setdefault("script, Accept-Encoding: gzip, br", []).append(
+                    f"{js_ms:7.2f} ms {js.headers.get('content-encoding', 'identity'):>4} {js.num_bytes_downloaded // 1024:>5} KB"
+                )
+                rows.setdefault("PDF Cache-Control", []).append(full.headers.get("cache-control", "(none)"))
+        for label, values in rows.items():
+            print(f"{label:34} " + " ".join(f"{value:>22}" for value in values))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,121 @@
+"""
+Benchmark request latency while attachments are being uploaded.
+
+    python bench_uploads.py [--uploads 4] [--size-mb 20] [--rounds 3]
+
+Sends several large multipart uploads at once (streamed in 64 KiB chunks,
+as they would arrive from the network) through the app in-process, while
+a probe keeps requesting a cheap endpoint on the same event loop. Probe
+latency is reported idle, during uploads to /utils/upload, and during
+uploads to a copy of the previous handler, which copied the spooled file
+into place with blocking calls on the event loop.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+import httpx
+from fastapi import File, UploadFile
+
+from bench_utils import percentile, use_app_database
+
+use_app_database("sqlite://")
+
+from app.core.config import settings
+from app.main import app
+
+PROBE = "/api/v1/utils/cache-stats"
+BOUNDARY = "benchboundary"
+
+
+@app.post("/bench/legacy-upload")
+async def legacy_upload(file: UploadFile = File(...)):
+    # The handler as it was: blocking open() and copyfileobj on the event loop
+    filename = f"{int(time.time())}_{file.filename}"
+    with open(os.path.join(settings.UPLOAD_DIR, filename), "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+    return {"url": f"/static/uploads/{filename}"}
+
+
+async def multipart_body(index, size):
+    yield (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"attachment{index}.bin\"\r\n"
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    chunk = os.urandom(65536)
+    sent = 0
+    while sent < size:
+        # Distinct content per upload so dedup does not short-circuit the work
+        piece = chunk[: size - sent]
+        yield index.to_bytes(4, "big") + piece[4:]
+        sent += len(piece)
+        await asyncio.sleep(0)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def probe_latencies(client, stop):
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get(PROBE)
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+    return samples
+
+
+async def run_round(client, path, uploads, size):
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_latencies(client, stop))
+    start = time.perf_counter()
+    if path:
+        headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+        responses = await asyncio.gather(*[
+            client.post(path, content=multipart_body(i, size), headers=headers) for i in range(uploads)
+        ])
+        assert all(r.status_code == 200 for r in responses), [r.text for r in responses]
+    else:
+        await asyncio.sleep(1)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return await probe, elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=4)
+    parser.add_argument("--size-mb", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    settings.UPLOAD_DIR = tempfile.mkdtemp(prefix="bench_uploads_")
+    settings.UPLOAD_MAX_BYTES = size + 1024 * 1024
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print(f"{args.uploads} concurrent uploads of {args.size_mb} MB, {args.rounds} rounds; probe: GET {PROBE}")
+            print(f"{'':28} {'probes':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'MB/s':>7}")
+            for label, path in [
+                ("idle", None),
+                ("/utils/upload", "/api/v1/utils/upload"),
+                ("previous blocking handler", "/bench/legacy-upload"),
+            ]:
+                samples, elapsed = [], 0.0
+                for _ in range(args.rounds):
+                    round_samples, round_elapsed = await run_round(client, path, args.uploads, size)
+                    samples += round_samples
+                    elapsed += round_elapsed
+                throughput = f"{args.uploads * args.size_mb * args.rounds / elapsed:7.0f}" if path else f"{'-':>7}"
+                print(
+                    f"{label:28} {len(samples):>7} {percentile(samples, 50):>8.1f}"
+                    f" {percentile(samples, 95):>8.1f} {max(samples):>8.1f} {throughput}"
+                )
+    finally:
+        shutil.rmtree(settings.UPLOAD_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+"""
+Shared helpers for the bench_*.py scripts.
+
+Benchmarks default to a throwaway in-memory SQLite database so they can run
+anywhere; pass --url postgresql://... to measure against a real server.
+"""
+import argparse
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base_class import Base
+from app.models.user import User
+from app.models.student import StudentProfile, ParentProfile, Address, EmergencyContact
+from app.models.teacher import TeacherProfile
+from app.models.event import Holiday
+from app.models.fee import Fee, FeeReminder
+from app.models.attendance import Attendance, AttendanceDailyRollup
+from app.models.timetable import Timetable
+from app.models.result import Result
+from app.models.notification import Notification, NotificationBatch, NotificationReceipt
+from app.models.feed import Feed
+from app.models.job import Job
+from app.models.cache_version import CacheVersion
+
+
+def parse_args(description: str, **extra) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--url", default="sqlite://", help="Database URL (default: in-memory SQLite)")
+    for name, default in extra.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, default=default, type=type(default))
+    return parser.parse_args()
+
+
+def use_app_database(url: str) -> None:
+    """
+    Point the app's own engines at `url` (a new temporary SQLite file by default).
+
+    The schema is created fresh and the in-process response caches are
+    emptied, so each test module starts from a clean database; call it from
+    setup_module rather than at import time. In-memory SQLite can't be shared
+    between the sync and async engines, hence the file. The URL is also put
+    in the environment for servers started as subprocesses.
+    """
+    if url == "sqlite://":
+        url = f"sqlite:///{tempfile.mkstemp(suffix='.db')[1]}"
+    os.environ["SQLALCHEMY_DATABASE_URI"] = url
+    from app.db import session
+    from app.api.response_cache import query_cache
+    from app.api.api_v1.endpoints.dashboard import dashboard_cache
+    from app.api.api_v1.endpoints.timetable import timetable_cache
+    session.rebind(url)
+    Base.metadata.drop_all(bind=session.engine)
+    Base.metadata.create_all(bind=session.engine)
+    query_cache.clear()
+    dashboard_cache.invalidate()
+    timetable_cache.invalidate()
+
+
+def override_settings(**values) -> dict:
+    """Change app settings, returning their previous values (pass them back to restore)."""
+    from app.core.config import settings
+    previous = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    return previous
+
+
+def make_session(url: str):
+    """Create a fresh schema on `url` and return (engine, Session factory)."""
+    if url.startswith("sqlite"):
+        engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class QueryCounter:
+    """Counts statements sent to the database while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+@contextmanager
+def timed():
+    """Yield a dict whose 'ms' key is filled with the elapsed wall time."""
+    result = {}
+    start = time.perf_counter()
+    yield result
+    result["ms"] = (time.perf_counter() - start) * 1000
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -1,18 +1,30 @@
+import os
+
+from alembic import command
+from alembic.config import Config
+
 from app.db.session import engine
 from app.db.base_class import Base
 from app.models.user import User
 from app.models.student import StudentProfile, ParentProfile, Address, EmergencyContact
 from app.models.event import Holiday
-from app.models.fee import Fee
-from app.models.attendance import Attendance
+from app.models.fee import Fee, FeeReminder
+from app.models.attendance import Attendance, AttendanceDailyRollup
 from app.models.timetable import Timetable
 from app.models.result import Result
-from app.models.notification import Notification
+from app.models.notification import Notification, NotificationBatch, NotificationReceipt
 from app.models.feed import Feed
+from app.models.job import Job
+from app.models.cache_version import CacheVersion
+
+def stamp_alembic_head():
+    # create_all builds the latest schema, so record it as fully migrated
+    command.stamp(Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")), "head")
 
 def init_db():
     # Create tables
     Base.metadata.create_all(bind=engine)
+    stamp_alembic_head()
 
 if __name__ == "__main__":
     print("Creating tables...")
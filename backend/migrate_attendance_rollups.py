@@ -0,0 +1,14 @@
+from app.db.session import engine
+from app.models.attendance import AttendanceDailyRollup
+from rebuild_attendance_rollups import rebuild
+
+def migrate():
+    print("Creating attendance_daily_rollups table...")
+    AttendanceDailyRollup.__table__.create(bind=engine, checkfirst=True)
+    print("Created attendance_daily_rollups table.")
+
+    # Backfill from existing attendance history
+    rebuild()
+
+if __name__ == "__main__":
+    migrate()
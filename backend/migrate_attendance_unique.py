@@ -0,0 +1,30 @@
+from app.db.session import engine
+from sqlalchemy import text
+
+def migrate():
+    with engine.connect() as connection:
+        with connection.begin():
+            print("Removing duplicate attendance rows (keeping the latest per student/date)...")
+            try:
+                result = connection.execute(text("""
+                    DELETE FROM attendance
+                    WHERE id NOT IN (
+                        SELECT MAX(id) FROM attendance GROUP BY student_id, date
+                    );
+                """))
+                print(f"Removed {result.rowcount} duplicate rows.")
+            except Exception as e:
+                print(f"Error removing duplicates: {e}")
+
+            print("Adding unique (student_id, date) index to attendance...")
+            try:
+                connection.execute(text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_student_date "
+                    "ON attendance (student_id, date);"
+                ))
+                print("Added uq_attendance_student_date.")
+            except Exception as e:
+                print(f"Error adding unique index (might already exist): {e}")
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,68 @@
+"""
+Move fanned-out notifications onto the batch + read-receipt model.
+
+Every legacy `notifications` row without a batch gets one of its own, read
+rows become `notification_receipts`, and with --purge the per-student copies
+are deleted afterwards to reclaim their storage.
+
+Run migrate_notification_counters.py first; batch counters are refreshed
+at the end of this migration.
+"""
+import sys
+from app.db.session import engine, SessionLocal
+from app.models.notification import Notification, NotificationBatch, NotificationReceipt
+from sqlalchemy import text
+from repair_notification_counters import repair
+
+def migrate(purge: bool = False):
+    print("Creating notification_receipts table...")
+    NotificationReceipt.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        print("Creating batches for notifications sent before batching...")
+        orphans = db.query(Notification).filter(Notification.batch_id == None).all()
+        for notification in orphans:
+            batch = NotificationBatch(
+                title=notification.title,
+                message=notification.message,
+                target_student_id=notification.student_id,
+                attachment_url=notification.attachment_url,
+                created_at=notification.created_at,
+            )
+            db.add(batch)
+            db.flush()
+            notification.batch_id = batch.id
+        db.commit()
+        print(f"Created {len(orphans)} batches.")
+    finally:
+        db.close()
+
+    with engine.connect() as connection:
+        with connection.begin():
+            print("Converting read notifications into receipts...")
+            try:
+                result = connection.execute(text("""
+                    INSERT INTO notification_receipts (batch_id, student_id, read_at)
+                    SELECT n.batch_id, n.student_id, MAX(n.created_at)
+                    FROM notifications n
+                    WHERE n.is_read AND n.student_id IS NOT NULL AND n.batch_id IS NOT NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM notification_receipts r
+                          WHERE r.batch_id = n.batch_id AND r.student_id = n.student_id
+                      )
+                    GROUP BY n.batch_id, n.student_id;
+                """))
+                print(f"Created {result.rowcount} receipts.")
+            except Exception as e:
+                print(f"Error creating receipts: {e}")
+
+            if purge:
+                print("Deleting migrated per-student notification rows...")
+                result = connection.execute(text("DELETE FROM notifications WHERE batch_id IS NOT NULL;"))
+                print(f"Deleted {result.rowcount} rows.")
+
+    repair()
+
+if __name__ == "__main__":
+    migrate(purge="--purge" in sys.argv)
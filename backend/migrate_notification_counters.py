@@ -0,0 +1,32 @@
+from app.db.session import engine
+from app.models.notification import NotificationReceipt
+from sqlalchemy import text
+from repair_notification_counters import repair
+
+def migrate():
+    with engine.connect() as connection:
+        with connection.begin():
+            for column in ["total_count", "read_count"]:
+                print(f"Adding {column} to notification_batches...")
+                try:
+                    connection.execute(text(f"ALTER TABLE notification_batches ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0;"))
+                    print(f"Added {column}.")
+                except Exception as e:
+                    print(f"Error adding {column} (might already exist): {e}")
+
+            print("Indexing notification_batches.created_at...")
+            try:
+                connection.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_notification_batches_created_at "
+                    "ON notification_batches (created_at);"
+                ))
+                print("Added ix_notification_batches_created_at.")
+            except Exception as e:
+                print(f"Error adding index: {e}")
+
+    # Backfill counters for batches sent before they existed
+    NotificationReceipt.__table__.create(bind=engine, checkfirst=True)
+    repair()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,30 @@
+from app.db.session import engine
+from sqlalchemy import text
+
+def migrate():
+    with engine.connect() as connection:
+        with connection.begin():
+            print("Removing duplicate result rows (keeping the latest per student/exam/subject)...")
+            try:
+                result = connection.execute(text("""
+                    DELETE FROM results
+                    WHERE id NOT IN (
+                        SELECT MAX(id) FROM results GROUP BY student_id, exam_title, subject
+                    );
+                """))
+                print(f"Removed {result.rowcount} duplicate rows.")
+            except Exception as e:
+                print(f"Error removing duplicates: {e}")
+
+            print("Adding unique (student_id, exam_title, subject) index to results...")
+            try:
+                connection.execute(text(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS uq_results_student_exam_subject "
+                    "ON results (student_id, exam_title, subject);"
+                ))
+                print("Added uq_results_student_exam_subject.")
+            except Exception as e:
+                print(f"Error adding unique index (might already exist): {e}")
+
+if __name__ == "__main__":
+    migrate()
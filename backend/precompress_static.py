@@ -0,0 +1,63 @@
+"""
+Write .br and .gz copies of the compressible files under static/.
+
+    python precompress_static.py [--directory static] [--min-size 1024]
+
+The static mount sends these as-is to clients that accept the encoding,
+at maximum compression levels that would be too slow per request. Copies
+are only kept when smaller than the original, and are rewritten when the
+original is newer. Safe to re-run, e.g. after each deploy.
+"""
+import argparse
+import gzip
+import os
+from mimetypes import guess_type
+
+from app.api.compression import COMPRESSIBLE_TYPES, brotli
+from app.api.static_files import PRECOMPRESSED_SUFFIXES
+
+
+def compressors():
+    yield PRECOMPRESSED_SUFFIXES["gzip"], lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield PRECOMPRESSED_SUFFIXES["br"], lambda data: brotli.compress(data, quality=11)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--directory", default="static")
+    parser.add_argument("--min-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    written = skipped = 0
+    for root, _, files in os.walk(args.directory):
+        for name in files:
+            path = os.path.join(root, name)
+            media_type = guess_type(path)[0]
+            if name.endswith(tuple(PRECOMPRESSED_SUFFIXES.values())) or not media_type or not media_type.startswith(COMPRESSIBLE_TYPES):
+                continue
+            stat_result = os.stat(path)
+            if stat_result.st_size < args.min_size:
+                continue
+            data = None
+            for suffix, compress in compressors():
+                target = path + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= stat_result.st_mtime:
+                    skipped += 1
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    continue
+                with open(target + ".tmp", "wb") as f:
+                    f.write(compressed)
+                os.replace(target + ".tmp", target)
+                written += 1
+                print(f"{target}: {len(data)} -> {len(compressed)} bytes")
+    print(f"{written} written, {skipped} up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+from app.db.session import SessionLocal
+from app.api.api_v1.endpoints.attendance import rebuild_attendance_rollups
+
+def rebuild():
+    db = SessionLocal()
+    try:
+        print("Rebuilding attendance daily rollups from raw attendance...")
+        written = rebuild_attendance_rollups(db)
+        print(f"Wrote {written} rollup rows.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild()
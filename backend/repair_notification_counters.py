@@ -0,0 +1,14 @@
+from app.db.session import SessionLocal
+from app.api.api_v1.endpoints.notifications import recompute_batch_counters
+
+def repair():
+    db = SessionLocal()
+    try:
+        print("Recomputing notification batch counters...")
+        updated = recompute_batch_counters(db)
+        print(f"Updated {updated} batches.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    repair()
@@ -1,4 +1,6 @@
 from sqlalchemy.orm import Session
+from app.api.api_v1.endpoints.attendance import rebuild_attendance_rollups
+from app.api.api_v1.endpoints.notifications import audience_query, recompute_batch_counters
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.models.student import StudentProfile, ParentProfile, Address, EmergencyContact
@@ -8,7 +10,7 @@ from app.models.attendance import Attendance, AttendanceStatus
 from app.models.timetable import Timetable, DayOfWeek
 from app.models.result import Result
 from app.models.result import Result
-from app.models.notification import Notification
+from app.models.notification import NotificationBatch, NotificationReceipt
 from app.models.feed import Feed
 from datetime import date, timedelta, time, datetime
 from passlib.context import CryptContext
@@ -209,6 +211,8 @@ def seed_db():
                 db.add(attendance)
             
             db.commit()
+            # The dashboard reads attendance from the daily rollups
+            rebuild_attendance_rollups(db)
             print("Attendance seeded!")
 
             # Seed Timetable
@@ -302,36 +306,43 @@ def seed_db():
                     "message": "Your Term 2 fee is due on 10th Oct 2025. Please pay to avoid late fees.",
                     "created_at": datetime.now() - timedelta(hours=2),
                     "is_read": False,
-                    "student_id": profile.id
+                    "target_student_id": profile.id
                 },
                 {
                     "title": "New Assignment Uploaded",
                     "message": "Math assignment for Chapter 5 has been uploaded. Due date: 15th Oct.",
                     "created_at": datetime.now() - timedelta(days=1),
                     "is_read": True,
-                    "student_id": profile.id
+                    "target_student_id": profile.id
                 },
                 {
                     "title": "Holiday Announcement",
                     "message": "School will remain closed on 2nd Oct for Gandhi Jayanti.",
                     "created_at": datetime.now() - timedelta(days=2),
                     "is_read": True,
-                    "student_id": None # Global announcement
+                    "target_student_id": None # Global announcement
                 },
                 {
                     "title": "Exam Schedule Released",
                     "message": "The schedule for Mid-Term examinations has been released. Check the app for details.",
                     "created_at": datetime.now() - timedelta(days=5),
                     "is_read": True,
-                    "student_id": None # Global announcement
+                    "target_student_id": None # Global announcement
                 },
             ]
 
             for item in notifications_data:
-                notification = Notification(**item)
-                db.add(notification)
+                is_read = item.pop("is_read")
+                batch = NotificationBatch(**item)
+                # Counters as create_notification and a read would leave them
+                batch.total_count = audience_query(db, batch).count()
+                db.add(batch)
+                db.flush()
+                if is_read:
+                    db.add(NotificationReceipt(batch_id=batch.id, student_id=profile.id))
             
             db.commit()
+            recompute_batch_counters(db)
             print("Notifications seeded!")
 
             # Seed Feeds
@@ -0,0 +1,34 @@
+"""
+Send due-date reminders for pending fees (see FEE_REMINDER_DAYS).
+
+    python send_fee_reminders.py [--date 2026-06-01] [--days 7,1,0] [--dry-run]
+
+Safe to run as often as you like, e.g. daily from cron when the in-process
+job is disabled (FEE_REMINDER_IN_PROCESS=false): fees already reminded for
+their current window are skipped.
+"""
+import argparse
+from datetime import date
+
+from app.db.session import SessionLocal
+from app.api.api_v1.endpoints.fees import send_fee_reminders
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="run as if today were this date")
+    parser.add_argument("--days", default=None, help="comma-separated reminder windows, overriding FEE_REMINDER_DAYS")
+    parser.add_argument("--dry-run", action="store_true", help="count what would be sent without sending")
+    args = parser.parse_args()
+
+    windows = [int(d) for d in args.days.split(",")] if args.days else None
+    db = SessionLocal()
+    try:
+        stats = send_fee_reminders(db, today=args.date, windows=windows, dry_run=args.dry_run)
+    finally:
+        db.close()
+    verb = "Would send" if args.dry_run else "Sent"
+    print(f"{verb} {stats['notifications'] if not args.dry_run else stats['students']} notifications "
+          f"to {stats['students']} students covering {stats['fees']} fees.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Check that Alembic finds the database the way the app does.
+
+On Render only POSTGRES_* are set and SQLALCHEMY_DATABASE_URI is empty;
+alembic/env.py must then assemble the PostgreSQL URL itself (init_db.py
+stamps the schema through it). Migrations are rendered offline (--sql),
+so no server is needed.
+
+    python test_alembic_env.py
+"""
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.abspath(__file__))
+
+
+def render_migrations(**env):
+    environ = {k: v for k, v in os.environ.items() if k != "SQLALCHEMY_DATABASE_URI" and not k.startswith("POSTGRES_")}
+    environ.update(env)
+    return subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head", "--sql"],
+        cwd=BACKEND, env=environ, capture_output=True, text=True,
+    )
+
+
+def test_postgres_settings_only():
+    # A password that needs URL-quoting and %-escaping in alembic's config
+    result = render_migrations(POSTGRES_SERVER="db.internal", POSTGRES_USER="sms", POSTGRES_PASSWORD="p@ss%word", POSTGRES_DB="sms")
+    ok = result.returncode == 0 and "TIMESTAMP WITH TIME ZONE" in result.stdout and "CREATE TABLE IF NOT EXISTS jobs" in result.stdout
+    print(f"{'OK  ' if ok else 'FAIL'} POSTGRES_* only -> PostgreSQL migrations rendered")
+    if not ok:
+        print(result.stderr[-2000:])
+    assert ok
+
+
+def test_explicit_uri_wins():
+    result = render_migrations(SQLALCHEMY_DATABASE_URI="sqlite:///./unused.db", POSTGRES_SERVER="db.internal")
+    ok = result.returncode == 0 and "TIMESTAMP WITH TIME ZONE" not in result.stdout
+    print(f"{'OK  ' if ok else 'FAIL'} SQLALCHEMY_DATABASE_URI -> SQLite migrations rendered")
+    assert ok
+
+
+if __name__ == "__main__":
+    test_postgres_settings_only()
+    test_explicit_uri_wins()
+    print("All checks passed.")
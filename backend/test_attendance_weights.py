@@ -0,0 +1,56 @@
+"""
+Check that the dashboard and /attendance/summary weight attendance alike.
+
+One student is marked Present, Late, Half Day and Absent this month, plus
+a Holiday that neither may count as a working day: both must report
+(1 + 1 + 0.5) / 4 = 62.5%.
+
+    python test_attendance_weights.py
+"""
+from datetime import date
+
+from bench_utils import use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import StudentProfile, User
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def test_attendance_weights():
+    db = SessionLocal()
+    user = User(email="weights@school.com", hashed_password="x", full_name="Student", role="student")
+    db.add(user)
+    db.flush()
+    student = StudentProfile(user_id=user.id, class_grade="5", section="A")
+    db.add(student)
+    db.commit()
+    student_id = student.id
+    db.close()
+
+    first = date.today().replace(day=1)
+    client = TestClient(app)
+    marked = client.post("/api/v1/attendance/batch", json=[
+        {"student_id": student_id, "date": first.replace(day=day).isoformat(), "status": status,
+         "class_grade": "5", "section": "A"}
+        for day, status in [(1, "Present"), (2, "Late"), (3, "Half Day"), (4, "Absent"), (5, "Holiday")]
+    ])
+    summary = client.get("/api/v1/attendance/summary", params={"class_grade": "5"}).json()
+    dashboard = client.get("/api/v1/dashboard/stats").json()
+
+    student_pct = summary["students"][0]["attendance_percentage"]
+    dashboard_pct = round(dashboard["stats"]["avg_attendance"], 1)
+    ok = marked.status_code == 200 and student_pct == dashboard_pct == 62.5
+    print(f"{'OK  ' if ok else 'FAIL'} summary {student_pct}% and dashboard {dashboard_pct}% agree")
+    assert ok
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_attendance_weights()
+    print("All checks passed.")
@@ -0,0 +1,98 @@
+"""
+Check that a write committed while a cached response is being built is not
+hidden by the cache.
+
+The write is slipped in after the endpoint has read the database but before
+it stores the result: that response is allowed to be stale, the next one is
+not.
+
+    python test_cache_invalidation.py
+"""
+from datetime import time
+
+from bench_utils import use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.api.api_v1.endpoints.dashboard import dashboard_cache, invalidate_dashboard
+from app.api.api_v1.endpoints.timetable import timetable_cache
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import StudentProfile, Timetable, User
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def check(ok, label):
+    print(f"{'OK  ' if ok else 'FAIL'} {label}")
+    return not ok
+
+
+def write_during_set(cache, write):
+    """Make the next `cache.set` commit `write` first, as if it raced the read."""
+    original = cache.set
+
+    def set_after_write(key, value):
+        del cache.set
+        write()
+        original(key, value)
+
+    cache.set = set_after_write
+
+
+def add_period(subject, hour):
+    db = SessionLocal()
+    db.add(Timetable(class_grade="5", section="A", day_of_week="Mon", start_time=time(hour),
+                     end_time=time(hour + 1), subject=subject))
+    db.commit()
+    db.close()
+
+
+def test_timetable_race():
+    db = SessionLocal()
+    user = User(email="timetable@school.com", hashed_password="x", full_name="Student", role="student")
+    db.add(user)
+    db.flush()
+    student = StudentProfile(user_id=user.id, class_grade="5", section="A")
+    db.add(student)
+    db.commit()
+    token, _ = create_access_token(user, student)
+    db.close()
+    add_period("Maths", 9)
+
+    client = TestClient(app)
+    auth = {"Authorization": f"Bearer {token}"}
+    write_during_set(timetable_cache, lambda: add_period("Science", 10))
+    client.get("/api/v1/timetable/", headers=auth)
+    subjects = sorted(row["subject"] for row in client.get("/api/v1/timetable/", headers=auth).json())
+    failures = check(subjects == ["Maths", "Science"], f"timetable written mid-request is served next time: {subjects}")
+    assert not failures
+
+
+def add_teacher(email):
+    db = SessionLocal()
+    db.add(User(email=email, hashed_password="x", full_name="Teacher", role="teacher"))
+    db.commit()
+    db.close()
+    # As the endpoints that write do
+    invalidate_dashboard()
+
+
+def test_dashboard_race():
+    client = TestClient(app)
+    add_teacher("first@school.com")
+    write_during_set(dashboard_cache, lambda: add_teacher("second@school.com"))
+    client.get("/api/v1/dashboard/stats")
+    teachers = client.get("/api/v1/dashboard/stats").json()["stats"]["total_teachers"]
+    failures = check(teachers == 2, f"teacher added mid-request is counted next time: {teachers}")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_timetable_race()
+    test_dashboard_race()
+    print("All checks passed.")
@@ -0,0 +1,93 @@
+"""
+Check ETag / If-None-Match handling on the list endpoints the mobile app polls.
+
+For each endpoint the body is fetched once, then re-requested with the ETag
+it returned: the second response must be an empty 304, and for the cached
+reference-data endpoints (events, feed) it must not reach the database.
+
+    python test_conditional_get.py
+"""
+from datetime import date
+
+from bench_utils import QueryCounter, use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.db import session
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import Attendance, Fee, Feed, Holiday, Result, StudentProfile, User
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def seed():
+    db = SessionLocal()
+    user = User(email="student@school.com", hashed_password="x", full_name="Student", role="student")
+    db.add(user)
+    db.flush()
+    student = StudentProfile(user_id=user.id, class_grade="5", section="A")
+    db.add(student)
+    db.flush()
+    for i in range(50):
+        day = date(2025, 1, 1 + i % 28)
+        db.add(Holiday(name=f"Holiday {i}", date=day, type="holiday", description="School closed " * 5))
+        db.add(Feed(title=f"Post {i}", description="Annual day rehearsal " * 5, author="Admin"))
+        db.add(Fee(student_id=student.id, academic_year="2025-2026", fee_type=f"Term {i}", amount=1000 + i,
+                   due_date=day, status="Pending", reference_number=f"FR/{i}"))
+        db.add(Result(student_id=student.id, exam_title=f"Test {i}", exam_date=day, subject="Maths",
+                      marks_obtained=40 + i % 10, total_marks=50, grade="A1"))
+    db.add(Attendance(student_id=student.id, date=date(2025, 1, 2), status="Present", class_grade="5", section="A"))
+    db.commit()
+    token, _ = create_access_token(user, student)
+    db.close()
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_conditional_get():
+    client = TestClient(app)
+    auth = seed()
+    sync_counter, async_counter = QueryCounter(session.engine), QueryCounter(session.async_engine.sync_engine)
+    failures = 0
+
+    for path, expect_no_queries in [
+        ("/api/v1/events/", True),
+        ("/api/v1/feed/", True),
+        ("/api/v1/fees/", False),
+        ("/api/v1/attendance/", False),
+        ("/api/v1/results/", False),
+    ]:
+        first = client.get(path, headers=auth)
+        etag = first.headers.get("etag")
+        with sync_counter, async_counter:
+            second = client.get(path, headers={**auth, "If-None-Match": etag})
+        queries = sync_counter.count + async_counter.count
+        ok = (
+            first.status_code == 200 and etag
+            and second.status_code == 304 and second.content == b""
+            and second.headers.get("etag") == etag
+            and (queries == 0 or not expect_no_queries)
+        )
+        failures += not ok
+        sent = int(first.headers["content-length"])
+        print(f"{'OK  ' if ok else 'FAIL'} {path:22} {sent:6} bytes -> "
+              f"{len(second.content)} bytes ({sent} saved), {queries} queries on revalidation")
+
+    # A write must change the tag so the next conditional request gets the new body
+    etag = client.get("/api/v1/events/").headers["etag"]
+    client.post("/api/v1/events/", json={"name": "Sports Day", "date": "2025-02-01", "type": "event"})
+    changed = client.get("/api/v1/events/", headers={"If-None-Match": etag})
+    ok = changed.status_code == 200 and changed.headers["etag"] != etag
+    failures += not ok
+    print(f"{'OK  ' if ok else 'FAIL'} events ETag changes after create_event")
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_conditional_get()
@@ -0,0 +1,111 @@
+"""
+Check that the student and teacher lists cost a fixed number of queries per
+page, with and without a sparse fieldset.
+
+    python test_eager_loading.py
+"""
+from bench_utils import QueryCounter, use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.api.response_cache import query_cache
+from app.db import session
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import Address, EmergencyContact, ParentProfile, StudentProfile, TeacherProfile, User
+
+STUDENTS = 250
+TEACHERS = 120
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def seed():
+    db = SessionLocal()
+    for i in range(1, STUDENTS + 1):
+        user = User(email=f"student{i}@school.com", hashed_password="x", full_name=f"Student {i}", role="student")
+        student = StudentProfile(user=user, admission_number=f"ADM{i:05d}", class_grade="5", section="A")
+        student.address = Address(street=f"{i} Main Road", city="Bengaluru")
+        student.parent_profile = ParentProfile(father_name=f"Father {i}", mother_name=f"Mother {i}")
+        student.emergency_contact = EmergencyContact(contact_name=f"Uncle {i}", phone_number="9800000000")
+        db.add(student)
+    for i in range(1, TEACHERS + 1):
+        user = User(email=f"teacher{i}@school.com", hashed_password="x", full_name=f"Teacher {i}", role="teacher")
+        db.add(TeacherProfile(user=user, qualification="M.Sc", subjects="Maths"))
+    db.commit()
+    db.close()
+
+
+def walk(client, path, counter):
+    """Fetch every page of `path`; returns (rows, queries per page)."""
+    rows, per_page, cursor = [], [], None
+    while True:
+        url = path + ("&" if "?" in path else "?") + "limit=100" + (f"&cursor={cursor}" if cursor else "")
+        query_cache.clear()
+        with counter:
+            response = client.get(url)
+        assert response.status_code == 200, response.text
+        rows.extend(response.json())
+        per_page.append(counter.count)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return rows, per_page
+
+
+def check(name, ok, detail):
+    print(f"{'OK  ' if ok else 'FAIL'} {name:48} {detail}")
+    return not ok
+
+
+def test_eager_loading():
+    seed()
+    client = TestClient(app)
+    counter = QueryCounter(session.engine)
+    failures = 0
+
+    rows, per_page = walk(client, "/api/v1/users/students", counter)
+    failures += check(
+        "students: one query per page", len(rows) == STUDENTS and set(per_page) == {1}
+        and all(row["address"] and row["parent_profile"] and row["emergency_contact"] for row in rows),
+        f"{len(rows)} rows, queries per page {per_page}",
+    )
+
+    rows, per_page = walk(client, "/api/v1/users/students?fields=id,admission_number,class_grade", counter)
+    failures += check(
+        "students?fields=...: one query, only those fields", set(per_page) == {1}
+        and all(set(row) == {"id", "admission_number", "class_grade"} for row in rows),
+        f"{len(rows)} rows, queries per page {per_page}",
+    )
+
+    rows, per_page = walk(client, "/api/v1/users/students?fields=id,address", counter)
+    failures += check(
+        "students?fields=id,address: one query", set(per_page) == {1} and all(row["address"] for row in rows),
+        f"{len(rows)} rows, queries per page {per_page}",
+    )
+
+    rows, per_page = walk(client, "/api/v1/teachers/", counter)
+    failures += check(
+        "teachers: one query per page", len(rows) == TEACHERS and set(per_page) == {1}
+        and all(row["teacher_profile"] for row in rows),
+        f"{len(rows)} rows, queries per page {per_page}",
+    )
+
+    rows, per_page = walk(client, "/api/v1/teachers/?fields=id,full_name", counter)
+    failures += check(
+        "teachers?fields=id,full_name: one query", set(per_page) == {1}
+        and all(set(row) == {"id", "full_name"} for row in rows),
+        f"{len(rows)} rows, queries per page {per_page}",
+    )
+
+    response = client.get("/api/v1/users/students?fields=id,password")
+    failures += check("unknown field is rejected", response.status_code == 400, response.text)
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_eager_loading()
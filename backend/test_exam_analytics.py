@@ -0,0 +1,117 @@
+"""
+Check /results/analytics: ranks with ties, percentiles, medians over odd and
+even counts, and that cached analytics follow new marks.
+
+Term 1 Maths is 90/80/80/50 out of 100, so the ranks are 1/2/2/4 and the
+percentiles (share of the others scoring strictly lower) 100/33.3/33.3/0.
+Unit 1 has an odd (30/70/50 -> 50) and an even (20/40/70/100 -> 55) subject.
+Marks imported by another process (as worker.py does) must show as well.
+
+    python test_exam_analytics.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from bench_utils import use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import StudentProfile, User
+
+BACKEND = os.path.dirname(os.path.abspath(__file__))
+IMPORT_IN_ANOTHER_PROCESS = """
+import sys
+from app.api.api_v1.endpoints.results import run_results_import
+from app.core.jobs import JobContext
+from app.db.session import SessionLocal
+print(run_results_import(SessionLocal(), JobContext(0, "other-process", SessionLocal), {"path": sys.argv[1], "format": "csv"}))
+"""
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def check(ok, label):
+    print(f"{'OK  ' if ok else 'FAIL'} {label}")
+    return not ok
+
+
+def add_students(count):
+    db = SessionLocal()
+    ids = []
+    for i in range(count):
+        user = User(email=f"analytics{i}@school.com", hashed_password="x", full_name=f"Student {i}", role="student")
+        db.add(user)
+        db.flush()
+        student = StudentProfile(user_id=user.id, class_grade="5", section="A")
+        db.add(student)
+        db.flush()
+        ids.append(student.id)
+    db.commit()
+    db.close()
+    return ids
+
+
+def marks(exam_title, subject, scores):
+    return [
+        {"student_id": student_id, "exam_title": exam_title, "exam_date": "2026-09-01", "subject": subject,
+         "marks_obtained": score, "total_marks": 100, "grade": "A" if score >= 75 else "B"}
+        for student_id, score in scores
+    ]
+
+
+def test_exam_analytics():
+    ids = add_students(4)
+    client = TestClient(app)
+    saved = client.post("/api/v1/results/batch", json=(
+        marks("Term 1", "Maths", zip(ids, [90, 80, 80, 50]))
+        + marks("Unit 1", "Maths", zip(ids, [30, 70, 50]))
+        + marks("Unit 1", "Science", zip(ids, [20, 40, 70, 100]))
+    ))
+    failures = check(saved.status_code == 200, f"marks saved: {saved.status_code}")
+
+    term = client.get("/api/v1/results/analytics", params={"exam_title": "Term 1", "class_grade": "5"}).json()
+    standings = {row["student_id"]: (row["rank"], row["percentile"]) for row in term["students"]}
+    expected = dict(zip(ids, [(1, 100.0), (2, 33.3), (2, 33.3), (4, 0.0)]))
+    failures += check(standings == expected, f"tied students share a rank, the next one skips: {standings}")
+    maths = term["subjects"][0]
+    failures += check((maths["mean"], maths["median"], maths["stddev"], maths["min"], maths["max"])
+                      == (75.0, 80.0, 15.0, 50.0, 90.0),
+                      f"subject statistics: {maths}")
+    failures += check(maths["grade_distribution"] == {"A": 3, "B": 1},
+                      f"grade distribution: {maths['grade_distribution']}")
+
+    unit = client.get("/api/v1/results/analytics", params={"exam_title": "Unit 1"}).json()
+    medians = {row["subject"]: (row["students"], row["median"]) for row in unit["subjects"]}
+    failures += check(medians == {"Maths": (3, 50.0), "Science": (4, 55.0)},
+                      f"median of the middle mark, or the mean of the two middle marks: {medians}")
+
+    # The last student resits: cached Term 1 analytics must not survive the write
+    client.post("/api/v1/results/batch", json=marks("Term 1", "Maths", [(ids[3], 95)]))
+    term = client.get("/api/v1/results/analytics", params={"exam_title": "Term 1", "class_grade": "5"}).json()
+    top = term["students"][0]
+    failures += check((top["student_id"], top["rank"], top["percentile"]) == (ids[3], 1, 100.0)
+                      and term["subjects"][0]["median"] == 85.0,
+                      f"new marks re-rank the exam: top is student {top['student_id']}, median {term['subjects'][0]['median']}")
+
+    # The first student's marks corrected by an import running in a worker process
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "w") as f:
+        f.write(f"student_id,exam_title,exam_date,subject,marks_obtained,total_marks,grade\n{ids[0]},Term 1,2026-09-01,Maths,60,100,B\n")
+    imported = subprocess.run([sys.executable, "-c", IMPORT_IN_ANOTHER_PROCESS, path], cwd=BACKEND, capture_output=True, text=True)
+    term = client.get("/api/v1/results/analytics", params={"exam_title": "Term 1", "class_grade": "5"}).json()
+    ranks = {row["student_id"]: row["rank"] for row in term["students"]}
+    failures += check(imported.returncode == 0 and ranks.get(ids[0]) == 4,
+                      f"marks imported by another process show at once: rank {ranks.get(ids[0])} {imported.stderr[-300:]}")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_exam_analytics()
+    print("All checks passed.")
@@ -0,0 +1,111 @@
+"""
+Check bulk fee generation and the fee ledger.
+
+Raises a term fee for a whole grade, checks it is one INSERT and safe to
+retry, marks some fees paid, then walks the per-student ledger with
+cursors (one query per page) and compares the section and grade totals
+with sums computed in Python.
+
+    python test_fee_ledger.py
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from bench_utils import QueryCounter, use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.db import session
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import Fee, StudentProfile, User
+
+STUDENTS = 1500
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def seed():
+    db = SessionLocal()
+    users = [User(email=f"student{i}@school.com", hashed_password="x", full_name=f"Student {i}", role="student") for i in range(STUDENTS)]
+    db.add_all(users)
+    db.flush()
+    db.add_all([
+        StudentProfile(user_id=user.id, admission_number=f"ADM{i:05d}", class_grade=str(1 + i % 3), section="ABC"[(i // 3) % 3])
+        for i, user in enumerate(users)
+    ])
+    db.commit()
+    db.close()
+
+
+def test_fee_ledger():
+    seed()
+    client = TestClient(app)
+    counter = QueryCounter(session.engine)
+    failures = 0
+
+    def check(ok, label):
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+
+    term = {"academic_year": "2025-2026", "fee_type": "Term 1 Fee", "amount": 12000, "due_date": str(date.today() - timedelta(days=10))}
+    with counter:
+        created = client.post("/api/v1/fees/bulk", json={**term, "class_grade": "2"}).json()
+    check(created["created"] == STUDENTS // 3 and counter.count <= 3, f"grade 2 term fee: {created['created']} fees in {counter.count} statements")
+    again = client.post("/api/v1/fees/bulk", json={**term, "class_grade": "2"}).json()
+    check(again["created"] == 0 and again["skipped"] == STUDENTS // 3, "retrying skips students who already have the fee")
+    bus = client.post("/api/v1/fees/bulk", json={**term, "fee_type": "Transport", "amount": 3000, "due_date": "2099-01-01", "class_grade": "2", "section": "A"}).json()
+
+    db = SessionLocal()
+    references = {fee.reference_number for fee in db.query(Fee)}
+    check(len(references) == created["created"] + bus["created"], f"reference numbers are unique, e.g. {sorted(references)[0]}")
+    paid = db.query(Fee).filter(Fee.student_id % 4 == 0, Fee.fee_type == "Term 1 Fee").all()
+    for fee in paid:
+        fee.status, fee.payment_date = "Paid", date.today()
+    db.commit()
+
+    expected = defaultdict(lambda: defaultdict(float))
+    for fee, student in db.query(Fee, StudentProfile).join(StudentProfile, StudentProfile.id == Fee.student_id):
+        for key in [(student.class_grade, student.section), (student.class_grade,)]:
+            totals = expected[key]
+            totals["total_amount"] += fee.amount
+            totals["paid_amount"] += fee.amount if fee.status == "Paid" else 0
+            totals["outstanding_amount"] += 0 if fee.status == "Paid" else fee.amount
+            totals["overdue_amount"] += fee.amount if fee.status != "Paid" and fee.due_date < date.today() else 0
+    db.close()
+
+    rows, cursor, queries, pages = [], None, 0, 0
+    while True:
+        with counter:
+            response = client.get("/api/v1/fees/ledger", params={"limit": 200, **({"cursor": cursor} if cursor else {})})
+        queries += counter.count
+        pages += 1
+        rows += response.json()
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    check(
+        len(rows) == STUDENTS // 3 and len({row["student_id"] for row in rows}) == len(rows) and queries == pages,
+        f"per-student ledger: {len(rows)} students over {pages} pages, {queries} queries",
+    )
+
+    for level, key_of in [("section", lambda r: (r["class_grade"], r["section"])), ("grade", lambda r: (r["class_grade"],))]:
+        ledger = client.get("/api/v1/fees/ledger", params={"level": level}).json()
+        ok = len(ledger) == len([k for k in expected if len(k) == len(key_of(ledger[0]))]) and all(
+            abs(row[name] - expected[key_of(row)][name]) < 0.01 for row in ledger for name in expected[key_of(row)]
+        )
+        check(ok, f"{level} totals match: {[(key_of(r), r['outstanding_amount'], r['overdue_amount']) for r in ledger][:3]}")
+
+    outstanding = client.get("/api/v1/fees/ledger", params={"outstanding_only": True, "limit": 1000}).json()
+    check(all(row["outstanding_amount"] > 0 for row in outstanding) and len(outstanding) < len(rows), f"outstanding_only: {len(outstanding)} students owe fees")
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_fee_ledger()
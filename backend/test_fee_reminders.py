@@ -0,0 +1,110 @@
+"""
+Check the fee reminder job: windows, grouping per student and idempotent reruns.
+
+    python test_fee_reminders.py
+"""
+from datetime import date, timedelta
+
+from bench_utils import QueryCounter, use_app_database
+
+from sqlalchemy import event, insert, text
+
+from app.api.api_v1.endpoints.fees import send_fee_reminders
+from app.db import session
+from app.db.session import SessionLocal
+from bench_utils import Fee, FeeReminder, NotificationBatch, StudentProfile, User
+
+TODAY = date(2026, 6, 1)
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def seed(db):
+    for i in range(3):
+        user = User(email=f"student{i}@school.com", hashed_password="x", full_name=f"Student {i}", role="student")
+        db.add(user)
+        db.flush()
+        db.add(StudentProfile(id=i + 1, user_id=user.id, class_grade="5", section="A"))
+    fees = [
+        # student, fee type, days until due, status
+        (1, "Term 1 Fee", 7, "Pending"),
+        (1, "Transport", 5, "Pending"),
+        (2, "Term 1 Fee", 1, "Pending"),
+        (2, "Library", 7, "Paid"),
+        (3, "Term 1 Fee", 30, "Pending"),
+        (3, "Exam Fee", -2, "Pending"),
+    ]
+    for i, (student_id, fee_type, days, status) in enumerate(fees):
+        db.add(Fee(student_id=student_id, academic_year="2026-2027", fee_type=fee_type, amount=1000 * (i + 1),
+                   due_date=TODAY + timedelta(days=days), status=status, reference_number=f"FR/{i}"))
+    db.commit()
+
+
+def test_fee_reminders():
+    db = SessionLocal()
+    seed(db)
+    counter = QueryCounter(session.engine)
+    failures = 0
+
+    def check(ok, label):
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+
+    preview = send_fee_reminders(db, today=TODAY, dry_run=True)
+    check(preview == {"fees": 3, "students": 2, "notifications": 0} and db.query(NotificationBatch).count() == 0,
+          f"dry run counts without sending: {preview}")
+
+    with counter:
+        first = send_fee_reminders(db, today=TODAY)
+    check(first == {"fees": 3, "students": 2, "notifications": 2}, f"first run: {first} in {counter.count} statements")
+    messages = {batch.target_student_id: batch.message for batch in db.query(NotificationBatch)}
+    check("Term 1 Fee" in messages[1] and "Transport" in messages[1], f"one notification per student: {messages[1]!r}")
+
+    with counter:
+        rerun = send_fee_reminders(db, today=TODAY)
+    check(rerun["notifications"] == 0 and counter.count == 2, f"rerun sends nothing ({counter.count} queries)")
+
+    next_week = send_fee_reminders(db, today=TODAY + timedelta(days=6))
+    check(next_week == {"fees": 1, "students": 1, "notifications": 1}, f"day before due, the 1-day window fires again: {next_week}")
+    overdue = send_fee_reminders(db, today=TODAY, windows=[7, 1, 0, -7])
+    check(overdue["fees"] == 1, f"negative window reminds overdue fees: {overdue}")
+
+    # A concurrent run logs student 3's Term 1 reminder between this run's
+    # read of the log and its insert: the run must back off whole
+    race_day = TODAY + timedelta(days=28)
+    term_fee = db.query(Fee.id).filter(Fee.student_id == 3, Fee.fee_type == "Term 1 Fee").scalar()
+    raced_once = []
+
+    def concurrent_run(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO notification_batches") and not raced_once:
+            raced_once.append(True)
+            with session.engine.begin() as other:
+                other.execute(insert(FeeReminder).values(fee_id=term_fee, window_days=7, sent_on=race_day))
+
+    batches_before = db.query(NotificationBatch).count()
+    event.listen(session.engine, "before_cursor_execute", concurrent_run)
+    try:
+        raced = send_fee_reminders(db, today=race_day)
+    except Exception as e:
+        raced = repr(e)
+    finally:
+        event.remove(session.engine, "before_cursor_execute", concurrent_run)
+    check(raced == {"fees": 1, "students": 1, "notifications": 0} and db.query(NotificationBatch).count() == batches_before,
+          f"losing the race on the reminder log rolls back and reports nothing sent: {raced}")
+
+    plan = " ".join(row[-1] for row in db.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM fees WHERE status = 'Pending' AND due_date BETWEEN '2026-06-01' AND '2026-06-08'"
+    )))
+    check("ix_fees_status_due_date" in plan, f"candidates come from a range scan: {plan}")
+    db.close()
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_fee_reminders()
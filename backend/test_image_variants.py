@@ -0,0 +1,104 @@
+"""
+Check ?variant= on /static images: resized WebP derivatives, made on upload
+or on first request.
+
+A fresh upload must get its derivatives from the background pool; an image
+that predates the pipeline (the repo's sample upload) must be rendered on
+its first variant request and reused afterwards. Derivatives go to a
+temporary directory; the upload is removed afterwards.
+
+    python test_image_variants.py
+"""
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from bench_utils import use_app_database
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.core.images import VARIANTS, image_derivatives
+from app.main import app
+
+
+original_cache_dir = image_derivatives.cache_dir
+
+
+def setup_module():
+    use_app_database("sqlite://")
+    image_derivatives.cache_dir = tempfile.mkdtemp(prefix="test_image_variants_")
+
+
+def teardown_module():
+    shutil.rmtree(image_derivatives.cache_dir, ignore_errors=True)
+    image_derivatives.cache_dir = original_cache_dir
+
+
+def test_image_variants():
+    failures = 0
+    stored = None
+
+    def check(ok, label):
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+
+    def cached_files():
+        return [f for _, _, files in os.walk(image_derivatives.cache_dir) for f in files]
+
+    try:
+        with TestClient(app) as client:
+            photo = io.BytesIO()
+            Image.new("RGB", (3000, 2000), (30, 120, 200)).save(photo, "JPEG", quality=90)
+            upload = client.post("/api/v1/utils/upload", files={"file": ("sports-day.jpg", photo.getvalue(), "image/jpeg")})
+            url = upload.json()["url"]
+            stored = url.lstrip("/")
+            for _ in range(100):
+                if len(cached_files()) == len(VARIANTS):
+                    break
+                time.sleep(0.05)
+            check(len(cached_files()) == len(VARIANTS), f"upload queued {len(cached_files())} derivatives in the background")
+
+            for variant, size in VARIANTS.items():
+                response = client.get(f"{url}?variant={variant}")
+                width, height = Image.open(io.BytesIO(response.content)).size
+                check(
+                    response.status_code == 200 and response.headers["content-type"] == "image/webp" and max(width, height) == size,
+                    f"{variant}: {width}x{height} WebP, {len(response.content)} bytes (original {len(photo.getvalue())})",
+                )
+
+            original = client.get(url)
+            check(original.content == photo.getvalue(), "no variant serves the original")
+
+            legacy = "/static/uploads/1764830932_13392330.jpg"
+            before = len(cached_files())
+            first = client.get(f"{legacy}?variant=thumbnail")
+            second = client.get(f"{legacy}?variant=thumbnail", headers={"If-None-Match": first.headers["etag"]})
+            check(
+                first.status_code == 200 and first.headers["content-type"] == "image/webp" and len(cached_files()) == before + 1,
+                f"older upload rendered lazily on first request ({len(first.content)} bytes)",
+            )
+            check(second.status_code == 304, f"derivative revalidates with its ETag -> {second.status_code}")
+
+            check(client.get(f"{url}?variant=huge").status_code == 400, "unknown variant -> 400")
+            avatar = client.get("/static/avatar.png?variant=thumbnail")
+            check(avatar.status_code == 200 and avatar.headers["content-type"] == "image/webp", "PNG gets a WebP variant too")
+    finally:
+        if stored and os.path.exists(stored):
+            os.remove(stored)
+            if not os.listdir(os.path.dirname(stored)):
+                os.rmdir(os.path.dirname(stored))
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_image_variants()
+    finally:
+        teardown_module()
@@ -0,0 +1,201 @@
+"""
+Check the background job queue: 202 + polling, retries, failures and leases.
+
+Runs the API with its in-process worker thread; mark-sheet imports and
+report cards go through the queue, and test-only handlers exercise retry
+with backoff, permanent failures and reclaiming an abandoned job.
+
+    python test_jobs.py
+"""
+import io
+import os
+import tempfile
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta, timezone
+
+from bench_utils import override_settings, use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.api.api_v1.endpoints import results
+from app.api.api_v1.endpoints.results import run_results_import
+from app.core.jobs import JobContext, PermanentJobError, claim_job, enqueue, job_handler, run_job
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import Job, StudentProfile, User
+
+calls = {"flaky": 0}
+import_chunk = results._import_chunk
+
+
+saved_settings = {}
+
+
+def setup_module():
+    use_app_database("sqlite://")
+    saved_settings.update(override_settings(JOB_RETRY_BACKOFF=0.05, JOB_POLL_INTERVAL=0.05))
+
+
+def teardown_module():
+    override_settings(**saved_settings)
+
+
+@job_handler("test.flaky")
+def flaky(db, context, payload):
+    calls["flaky"] += 1
+    if calls["flaky"] < payload["succeed_on"]:
+        raise RuntimeError(f"transient failure {calls['flaky']}")
+    context.progress(1, 1)
+    return {"attempt": calls["flaky"]}
+
+
+@job_handler("test.slow")
+def slow(db, context, payload):
+    # Never reports progress: only the heartbeat keeps the lease
+    time.sleep(payload["seconds"])
+    return {"slept": payload["seconds"]}
+
+
+@job_handler("test.bad_input")
+def bad_input(db, context, payload):
+    raise PermanentJobError("nothing to retry")
+
+
+def wait_for(client, job_id, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/api/v1/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.05)
+    return job
+
+
+def test_jobs():
+    db = SessionLocal()
+    for i in range(1, 21):
+        user = User(email=f"s{i}@school.com", hashed_password="x", full_name=f"Student {i}", role="student")
+        db.add(user)
+        db.flush()
+        db.add(StudentProfile(id=i, user_id=user.id, class_grade="5", section="A", admission_number=f"ADM{i:03d}"))
+    db.commit()
+    failures = 0
+
+    def check(ok, label):
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+
+    with TestClient(app) as client:
+        sheet = "student_id,exam_title,exam_date,subject,marks_obtained,total_marks,grade\n" + "".join(
+            f"{i},Term 1,2026-09-01,{subject},{30 + i},50,A\n" for i in range(1, 22) for subject in ("Maths", "Science")
+        ) + "1,Term 1,2026-09-01,Maths,45,50,A\n"  # a corrected mark for a row already in the sheet
+        queued = client.post("/api/v1/results/import", files={"file": ("marks.csv", sheet.encode(), "text/csv")})
+        check(queued.status_code == 202 and queued.headers["location"] == f"/api/v1/jobs/{queued.json()['id']}",
+              f"import answers 202 with Location {queued.headers.get('location')}")
+        job = wait_for(client, queued.json()["id"])
+        check(job["status"] == "done" and job["result"]["upserted"] == 40 and job["result"]["failed"] == 2,
+              f"import report from the worker (duplicates counted once): upserted {job['result']['upserted']}, failed {job['result']['failed']}")
+
+        broken = client.post("/api/v1/results/import", files={"file": ("marks.csv", b"\xff\xfe\x00bad", "text/csv")})
+        job = wait_for(client, broken.json()["id"])
+        check(job["status"] == "failed" and job["attempts"] == 1, f"unparseable file fails without retries: {job['error']}")
+
+        cards = client.post("/api/v1/results/report-cards", json={"exam_title": "Term 1", "class_grade": "5"})
+        job = wait_for(client, cards.json()["id"])
+        download = client.get(f"/api/v1/results/report-cards/{job['id']}/download")
+        names = zipfile.ZipFile(io.BytesIO(download.content)).namelist() if download.status_code == 200 else []
+        check(job["status"] == "done" and job["progress_done"] == job["progress_total"] == 20 and len(names) == 20,
+              f"report cards via the queue: {len(names)} PDFs, {job['result']['cards_per_second']} cards/s")
+        os.remove(job["result"]["path"])  # as the retention prune does a day later
+        expired = client.get(f"/api/v1/results/report-cards/{job['id']}/download")
+        check(expired.status_code == 410 and "expired" in expired.json()["detail"],
+              f"pruned zip -> {expired.status_code}, not a 500")
+
+        flaky_job = enqueue(db, "test.flaky", {"succeed_on": 3})
+        job = wait_for(client, flaky_job.id)
+        check(job["status"] == "done" and job["attempts"] == 3 and job["result"] == {"attempt": 3},
+              f"transient failures retried with backoff: done after {job['attempts']} attempts")
+        calls["flaky"] = 0
+        doomed = enqueue(db, "test.flaky", {"succeed_on": 10}, max_attempts=2)
+        job = wait_for(client, doomed.id)
+        check(job["status"] == "failed" and job["attempts"] == 2 and "transient failure 2" in job["error"],
+              f"gives up after max_attempts: {job['error']}")
+        job = wait_for(client, enqueue(db, "test.bad_input", {}).id)
+        check(job["status"] == "failed" and job["attempts"] == 1, "PermanentJobError is not retried")
+        check(client.get("/api/v1/jobs/999999").status_code == 404, "unknown job -> 404")
+
+    # Without workers running: an abandoned running job is reclaimed once its lease lapses
+    abandoned = Job(kind="test.flaky", payload={}, status="running", attempts=1, max_attempts=3, progress_done=0,
+                    run_after=datetime.now(timezone.utc), locked_by="dead-worker",
+                    locked_at=datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_LEASE_SECONDS + 5))
+    db.add(abandoned)
+    db.commit()
+    check(claim_job(db, "rescuer") == abandoned.id, "expired lease is reclaimed by another worker")
+    check(claim_job(db, "rescuer") is None, "nothing else to claim")
+
+    # One that keeps taking its worker down is failed once its attempts run out
+    crashing = Job(kind="test.flaky", payload={}, status="running", attempts=3, max_attempts=3, progress_done=0,
+                   run_after=datetime.now(timezone.utc), locked_by="dead-worker",
+                   locked_at=datetime.now(timezone.utc) - timedelta(seconds=settings.JOB_LEASE_SECONDS + 5))
+    db.add(crashing)
+    db.commit()
+    claimed = claim_job(db, "rescuer")
+    db.refresh(crashing)
+    check(claimed is None and crashing.status == "failed" and crashing.attempts == 3,
+          f"expired lease on the last attempt fails the job: {crashing.status} after {crashing.attempts} attempts")
+
+    # A handler running past its lease without reporting progress keeps its job
+    previous = override_settings(JOB_LEASE_SECONDS=0.6)
+    try:
+        long_job = enqueue(db, "test.slow", {"seconds": 1.5})
+        check(claim_job(db, "busy-worker") == long_job.id, "long job claimed")
+        outcome = []
+        runner = threading.Thread(target=lambda: outcome.append(run_job(long_job.id, "busy-worker", SessionLocal)))
+        runner.start()
+        stolen = []
+        while runner.is_alive():
+            time.sleep(0.2)
+            stolen.append(claim_job(db, "rescuer"))
+        runner.join()
+    finally:
+        override_settings(**previous)
+    db.refresh(long_job)
+    check(outcome == ["done"] and long_job.id not in stolen and long_job.attempts == 1,
+          f"heartbeat renews the lease of a silent handler: {outcome}, reclaimed {stolen.count(long_job.id)} times")
+
+    # An unexpected failure keeps the uploaded file for the retry, and removes it after the last attempt
+    fd, path = tempfile.mkstemp(dir=settings.JOB_FILES_DIR, suffix=".csv")
+    with os.fdopen(fd, "w") as f:
+        f.write("student_id,exam_title,exam_date,subject,marks_obtained,total_marks\n1,Term 2,2026-12-01,Maths,40,50\n")
+    kept = []
+
+    def database_down(*args):
+        raise RuntimeError("database went away")
+
+    results._import_chunk = database_down
+    try:
+        for attempt in (1, 2):
+            try:
+                run_results_import(db, JobContext(0, "w", SessionLocal, attempt=attempt, max_attempts=2),
+                                   {"path": path, "format": "csv"})
+            except RuntimeError:
+                kept.append(os.path.exists(path))
+    finally:
+        results._import_chunk = import_chunk
+    check(kept == [True, False], f"payload file kept for retries, removed after the last attempt: {kept}")
+    db.close()
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_jobs()
+    finally:
+        teardown_module()
@@ -0,0 +1,63 @@
+"""
+Check that repairing batch counters recounts reads without rewriting history.
+
+A batch sent to a class of three keeps total_count 3 after a fourth student
+joins the class; read_count is recounted from the receipts.
+
+    python test_notification_counters.py
+"""
+from bench_utils import use_app_database
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.api.api_v1.endpoints.notifications import recompute_batch_counters
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import NotificationBatch, StudentProfile, User
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def add_student(db, i):
+    user = User(email=f"counter{i}@school.com", hashed_password="x", full_name=f"Student {i}", role="student")
+    db.add(user)
+    db.flush()
+    student = StudentProfile(user_id=user.id, class_grade="7", section="B")
+    db.add(student)
+    db.commit()
+    return user, student
+
+
+def test_recompute_batch_counters():
+    db = SessionLocal()
+    students = [add_student(db, i) for i in range(3)]
+    admin = User(email="counter-admin@school.com", hashed_password="x", full_name="Admin", role="admin")
+    db.add(admin)
+    db.commit()
+    admin_token, _ = create_access_token(admin)
+    client = TestClient(app)
+    sent = client.post("/api/v1/notifications/", json={"title": "Trip", "message": "Zoo on Friday", "grade": "7"},
+                       headers={"Authorization": f"Bearer {admin_token}"}).json()
+    token, _ = create_access_token(*students[0])
+    client.put(f"/api/v1/notifications/{sent['id']}/read", headers={"Authorization": f"Bearer {token}"})
+
+    add_student(db, 3)
+    db.execute(update(NotificationBatch).values(read_count=0))
+    db.commit()
+    updated = recompute_batch_counters(db)
+    batch = db.get(NotificationBatch, sent["id"])
+    db.refresh(batch)
+    ok = updated == 1 and (batch.total_count, batch.read_count) == (3, 1)
+    print(f"{'OK  ' if ok else 'FAIL'} recomputed counters: {batch.read_count} / {batch.total_count}")
+    db.close()
+    assert ok
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_recompute_batch_counters()
+    print("All checks passed.")
@@ -0,0 +1,168 @@
+"""
+Check the notification push stream over WebSocket and server-sent events.
+
+Students must get only the notifications addressed to them, staff every
+sent batch and its read count; a reconnect with the last event id must
+replay what was missed, and an unknown id must ask the client to refetch.
+
+    python test_notification_stream.py
+"""
+import json
+import socket
+import threading
+import time
+
+from bench_utils import override_settings, use_app_database
+
+import httpx
+import uvicorn
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import NotificationBatch, StudentProfile, User
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def seed():
+    db = SessionLocal()
+    tokens = {}
+    for name, grade, section in [("s1", "5", "A"), ("s2", "5", "B"), ("s3", "6", "A")]:
+        user = User(email=f"{name}@school.com", hashed_password="x", full_name=name, role="student")
+        db.add(user)
+        db.flush()
+        student = StudentProfile(user_id=user.id, class_grade=grade, section=section)
+        db.add(student)
+        db.flush()
+        tokens[name] = create_access_token(user, student)[0]
+        tokens[name + "_id"] = student.id
+    admin = User(email="admin@school.com", hashed_password="x", full_name="Admin", role="admin")
+    db.add(admin)
+    db.flush()
+    tokens["admin"] = create_access_token(admin)[0]
+    db.add(NotificationBatch(title="Earlier", message="Sent before anyone connected", target_grade="5", total_count=2))
+    db.commit()
+    db.close()
+    return tokens
+
+
+def test_notification_stream():
+    tokens = seed()
+    failures = 0
+
+    def check(ok, label):
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+
+    def send(client, **notification):
+        return client.post(
+            "/api/v1/notifications/", json={"title": "Hi", "message": "Hello", **notification},
+            headers={"Authorization": f"Bearer {tokens['admin']}"},
+        ).json()
+
+    with TestClient(app) as client:
+        ws = "/api/v1/notifications/ws?access_token="
+        with client.websocket_connect(ws + tokens["s1"]) as s1, \
+                client.websocket_connect(ws + tokens["s2"]) as s2, \
+                client.websocket_connect(ws + tokens["admin"]) as admin:
+            first = s1.receive_json()
+            check(first == {"id": None, "event": "unread_count", "data": {"count": 1}}, f"student starts with unread count: {first}")
+            s2.receive_json()
+
+            sent = send(client, grade="5", section="A")
+            pushed = s1.receive_json()
+            check(pushed["event"] == "notification" and pushed["data"]["id"] == sent["id"] and pushed["id"],
+                  f"addressed student gets the notification as event {pushed['id']}")
+            batch = admin.receive_json()
+            check(batch["event"] == "batch" and batch["data"]["id"] == sent["id"] and batch["data"]["total_count"] == 1,
+                  "staff get the sent batch")
+
+            direct = send(client, student_id=tokens["s2_id"])
+            pushed = s2.receive_json()
+            check(pushed["data"]["id"] == direct["id"], "student outside 5-A only sees their own notification")
+            admin.receive_json()
+
+            client.put(f"/api/v1/notifications/{sent['id']}/read", headers={"Authorization": f"Bearer {tokens['s1']}"})
+            read, counted = s1.receive_json(), admin.receive_json()
+            check(read["event"] == "read" and read["data"] == {"id": sent["id"]}, "reader's other connections get the receipt")
+            check(counted["event"] == "batch_read" and counted["data"] == {"id": sent["id"], "read_count": 1},
+                  "staff get the new read count")
+            last_seen = read["id"]
+
+        missed = send(client, grade="5")
+        with client.websocket_connect(f"{ws}{tokens['s1']}&last_event_id={last_seen}") as s1:
+            replayed = s1.receive_json()
+            check(replayed["event"] == "notification" and replayed["data"]["id"] == missed["id"],
+                  "reconnecting with the last id replays the missed notification")
+        with client.websocket_connect(f"{ws}{tokens['s1']}&last_event_id=0123abcd-3") as s1:
+            reset, count = s1.receive_json(), s1.receive_json()
+            check(reset["event"] == "reset" and count["data"] == {"count": 2},
+                  f"stale id asks for a refetch and a fresh count ({count['data']})")
+
+        heartbeat = override_settings(NOTIFICATION_STREAM_HEARTBEAT=0.2)
+        try:
+            with client.websocket_connect(ws + tokens["admin"]) as admin:
+                check(admin.receive_json()["event"] == "ping", "idle connection gets a ping")
+        finally:
+            override_settings(**heartbeat)
+
+        try:
+            with client.websocket_connect(ws + "not-a-token") as bad:
+                bad.receive_json()
+            check(False, "invalid token rejected")
+        except WebSocketDisconnect as e:
+            check(e.code == 1008, f"invalid token closes with {e.code}")
+        check(client.get("/api/v1/notifications/stream").status_code == 401, "stream without a token -> 401")
+
+    # Server-sent events need a real server: TestClient buffers whole responses
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    base = f"http://127.0.0.1:{port}/api/v1/notifications"
+    try:
+        with httpx.Client(timeout=10) as http:
+            with http.stream("GET", f"{base}/stream", headers={"Authorization": f"Bearer {tokens['s3']}",
+                                                                "Accept-Encoding": "gzip"}) as stream:
+                check(stream.headers["content-type"].startswith("text/event-stream")
+                      and "content-encoding" not in stream.headers, "event stream is sent uncompressed")
+                lines = stream.iter_lines()
+
+                def next_event():
+                    fields = {}
+                    for line in lines:
+                        if not line:
+                            if "event" in fields:
+                                return fields
+                            fields = {}
+                            continue
+                        name, _, value = line.partition(": ")
+                        fields[name] = value
+
+                check(next_event() == {"event": "unread_count", "data": '{"count":0}'}, "SSE starts with the unread count")
+                sent = http.post(f"{base}/", json={"title": "Sports day", "message": "Grade 6", "grade": "6"},
+                                 headers={"Authorization": f"Bearer {tokens['admin']}"}).json()
+                event = next_event()
+                check(event["event"] == "notification" and json.loads(event["data"])["id"] == sent["id"] and event.get("id"),
+                      f"SSE delivers the notification with id {event.get('id')}")
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_notification_stream()
@@ -0,0 +1,148 @@
+"""
+Check keyset pagination: following X-Next-Cursor to the end returns every
+row exactly once, in order, for attendance, results, a student's inbox and
+the fee ledger; malformed or edited cursors answer 400.
+
+The inbox sorts on mixed directions (unread first, then newest first, then
+highest id), with batches sharing a timestamp, so a page boundary falls
+inside a run of equal keys.
+
+    python test_pagination.py
+"""
+import base64
+import json
+from datetime import date, datetime, timedelta
+
+from bench_utils import use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import Attendance, Fee, NotificationBatch, NotificationReceipt, Result, StudentProfile, User
+
+STUDENTS = 7
+PAGE = 2
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def check(ok, label):
+    print(f"{'OK  ' if ok else 'FAIL'} {label}")
+    return not ok
+
+
+def seed():
+    """Students (one without a section), their marks, attendance and fees, and an inbox."""
+    db = SessionLocal()
+    students = []
+    for i in range(STUDENTS):
+        user = User(email=f"page{i}@school.com", hashed_password="x", full_name=f"Student {i}", role="student")
+        db.add(user)
+        db.flush()
+        student = StudentProfile(user_id=user.id, class_grade=str(5 + i % 2), section=None if i == 0 else "AB"[i % 2])
+        db.add(student)
+        db.flush()
+        students.append((user, student))
+    for day in range(1, 4):
+        db.add_all([
+            Attendance(student_id=student.id, date=date(2026, 9, day), status="Present",
+                       class_grade=student.class_grade, section=student.section)
+            for _, student in students
+        ])
+    db.add_all([
+        Result(student_id=student.id, exam_title="Term 1", exam_date=date(2026, 9, 1), subject=subject,
+               marks_obtained=40, total_marks=50, grade="A")
+        for _, student in students for subject in ("Maths", "Science")
+    ])
+    db.add_all([
+        Fee(student_id=student.id, academic_year="2026-2027", fee_type="Term 1 Fee", amount=1000,
+            due_date=date(2026, 10, 1), status="Pending", reference_number=f"FR/{student.id}")
+        for _, student in students
+    ])
+
+    noon = datetime(2026, 9, 1, 12)
+    batches = [
+        NotificationBatch(title=f"Notice {i}", message="-", created_at=noon + timedelta(hours=i // 2))
+        for i in range(8)
+    ]
+    db.add_all(batches)
+    db.flush()
+    user, student = students[1]
+    db.add_all([NotificationReceipt(batch_id=batch.id, student_id=student.id) for batch in batches[1::3]])
+    db.commit()
+    # Unread before read, then newest first, the id breaking timestamp ties
+    inbox = sorted(batches, key=lambda batch: (batch in batches[1::3], -batch.created_at.timestamp(), -batch.id))
+    token, _ = create_access_token(user, student)
+    inbox_ids = [batch.id for batch in inbox]
+    db.close()
+    return token, inbox_ids
+
+
+def walk(client, path, headers=None, **params):
+    """Every row of `path`, page by page, and the number of pages."""
+    rows, pages, cursor = [], 0, None
+    while True:
+        response = client.get(path, headers=headers, params={**params, "limit": PAGE, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        rows.extend(response.json())
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return rows, pages
+
+
+def forge(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_pagination():
+    token, inbox_ids = seed()
+    client = TestClient(app)
+    auth = {"Authorization": f"Bearer {token}"}
+    failures = 0
+
+    for path, expected in [("/api/v1/attendance/", STUDENTS * 3), ("/api/v1/results/", STUDENTS * 2)]:
+        rows, pages = walk(client, path)
+        ids = [row["id"] for row in rows]
+        failures += check(ids == sorted(set(ids)) and len(ids) == expected,
+                          f"{path}: {len(ids)} of {expected} rows over {pages} pages, none repeated or skipped")
+
+    rows, pages = walk(client, "/api/v1/notifications/", headers=auth)
+    ids = [row["id"] for row in rows]
+    failures += check(ids == inbox_ids, f"inbox: unread first, newest first, ties by id, over {pages} pages: {ids}")
+    failures += check([row["is_read"] for row in rows] == [False] * 5 + [True] * 3, "read notices follow the unread")
+
+    for level, expected in [("student", STUDENTS), ("section", 3), ("grade", 2)]:
+        rows, pages = walk(client, "/api/v1/fees/ledger", level=level)
+        keys = [tuple(row.get(name) for name in ("class_grade", "section", "student_id")) for row in rows]
+        failures += check(len(keys) == len(set(keys)) == expected
+                          and sum(row["total_amount"] for row in rows) == STUDENTS * 1000,
+                          f"ledger by {level}: {len(keys)} groups over {pages} pages, the missing section included")
+
+    bad = {
+        "not base64": "!!!",
+        "not JSON": base64.urlsafe_b64encode(b"{oops").decode(),
+        "wrong length": forge([1, 2]),
+        "wrong type": forge(["1 OR 1=1"]),
+    }
+    for name, cursor in bad.items():
+        statuses = [
+            client.get("/api/v1/results/", params={"cursor": cursor}).status_code,
+            client.get("/api/v1/attendance/", params={"cursor": cursor}).status_code,
+            client.get("/api/v1/notifications/", headers=auth, params={"cursor": cursor}).status_code,
+        ]
+        failures += check(statuses == [400] * 3, f"{name} cursor -> {statuses}")
+    inbox_cursor = forge([0, "yesterday", 5])
+    status = client.get("/api/v1/notifications/", headers=auth, params={"cursor": inbox_cursor}).status_code
+    failures += check(status == 400, f"unparseable timestamp in an inbox cursor -> {status}")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_pagination()
+    print("All checks passed.")
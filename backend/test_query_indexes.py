@@ -0,0 +1,106 @@
+"""
+Check with EXPLAIN QUERY PLAN that the list endpoints' queries use an index.
+
+The schema is built with init_db's create_all, the Alembic index revision is
+downgraded and upgraded again (so the migration itself is exercised), then
+each endpoint is called and every SELECT it sent is explained. A plan that
+scans a table without an index fails the check.
+
+    python test_query_indexes.py
+
+SQLite only: EXPLAIN QUERY PLAN is SQLite syntax, and replaying the captured
+statements needs the same parameter style.
+"""
+import os
+
+from bench_utils import use_app_database
+
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.security import create_access_token
+from app.db import session
+from app.db.session import SessionLocal
+from app.main import app
+from bench_utils import StudentProfile, User
+
+# Endpoint -> index its main query must use (unique constraints get SQLite autoindex names)
+EXPECTED = [
+    ("/api/v1/attendance/?class_grade=5&section=A&date_from=2025-01-01", "ix_attendance_class_section_date"),
+    ("/api/v1/attendance/?student_id=1", "sqlite_autoindex_attendance"),
+    ("/api/v1/results/?student_id=1&exam_title=Term 1", "sqlite_autoindex_results"),
+    ("/api/v1/events/", "ix_holidays_date"),
+    ("/api/v1/fees/", "ix_fees_student_id"),
+    ("/api/v1/timetable/", "ix_timetable_class_section_day_start"),
+    ("/api/v1/notifications/", "ix_notification_batches_target_student_id"),
+]
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def migrate():
+    config = Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", session.engine.url.render_as_string(hide_password=False))
+    command.stamp(config, "head")
+    command.downgrade(config, "0001")
+    command.upgrade(config, "head")
+
+
+def seed():
+    db = SessionLocal()
+    user = User(email="student@school.com", hashed_password="x", full_name="Student", role="student")
+    db.add(user)
+    db.flush()
+    student = StudentProfile(user_id=user.id, class_grade="5", section="A")
+    db.add(student)
+    db.commit()
+    token, _ = create_access_token(user, student)
+    db.close()
+    return {"Authorization": f"Bearer {token}"}
+
+
+def full_scans(plan):
+    """Plan lines reading a whole table without an index."""
+    return [line for line in plan if line.startswith("SCAN") and "USING" not in line]
+
+
+def test_query_indexes():
+    migrate()
+    auth = seed()
+    client = TestClient(app)
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(session.engine, "before_cursor_execute", capture)
+    event.listen(session.async_engine.sync_engine, "before_cursor_execute", capture)
+
+    failures = 0
+    for path, index in EXPECTED:
+        captured.clear()
+        response = client.get(path, headers=auth)
+        with session.engine.connect() as connection:
+            plan = [
+                row[3]
+                for statement, parameters in captured
+                for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, tuple(parameters)).all()
+            ]
+        ok = response.status_code == 200 and any(index in line for line in plan) and not full_scans(plan)
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {path}")
+        for line in plan:
+            print(f"       {line}")
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_query_indexes()
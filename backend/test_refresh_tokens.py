@@ -0,0 +1,78 @@
+"""
+Check that a refresh token can only be exchanged once, even by two requests
+racing each other through /auth/refresh.
+
+    python test_refresh_tokens.py
+"""
+import asyncio
+
+from bench_utils import override_settings, use_app_database
+
+from fastapi import HTTPException
+
+from app.api.api_v1.endpoints.auth import refresh_token
+from app.core import config
+from app.core.security import create_refresh_token
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.schemas.token import TokenRefresh
+from bench_utils import User
+
+
+async def _refresh(token: str):
+    async with AsyncSessionLocal() as db:
+        try:
+            return await refresh_token(TokenRefresh(refresh_token=token), db)
+        except HTTPException as exc:
+            return exc.status_code
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def test_concurrent_refresh():
+    db = SessionLocal()
+    user = User(email="refresh@school.com", hashed_password="x", full_name="Admin", role="admin")
+    db.add(user)
+    db.commit()
+    token = create_refresh_token(user.id)
+    db.close()
+
+    async def race():
+        return await asyncio.gather(_refresh(token), _refresh(token))
+
+    outcomes = asyncio.run(race())
+    issued = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+    ok = len(issued) == 1 and 401 in outcomes
+    print(f"{'OK  ' if ok else 'FAIL'} one of two concurrent refreshes succeeds ({outcomes.count(401)} rejected)")
+    assert ok
+
+    # The losing request counts as a replay, so the whole family is revoked
+    rotated = asyncio.run(_refresh(issued[0]["refresh_token"]))
+    ok = rotated == 401
+    print(f"{'OK  ' if ok else 'FAIL'} replay revokes the tokens issued to the winner")
+    assert ok
+
+
+def test_random_secret_key_refused_for_a_real_database():
+    generated, config.SECRET_KEY_GENERATED = config.SECRET_KEY_GENERATED, True
+    previous = override_settings(SQLALCHEMY_DATABASE_URI="postgresql://app@db.internal/school_sms")
+    try:
+        config.check_secret_key()
+        refused = False
+    except RuntimeError:
+        refused = True
+    finally:
+        override_settings(**previous)
+        config.SECRET_KEY_GENERATED = generated
+    print(f"{'OK  ' if refused else 'FAIL'} per-process SECRET_KEY refused against PostgreSQL")
+    assert refused
+    # Local SQLite runs (these tests) may use it
+    config.check_secret_key()
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_concurrent_refresh()
+    test_random_secret_key_refused_for_a_real_database()
+    print("All checks passed.")
@@ -0,0 +1,105 @@
+"""
+Check the /static mount: cache headers, Range requests and precompressed files.
+
+Test files are written under static/ and removed afterwards.
+
+    python test_static_files.py
+"""
+import brotli
+import gzip
+import io
+import os
+import shutil
+
+from bench_utils import use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.uploads import store_upload
+from app.main import app
+
+SCRATCH = "static/test_static_files"
+
+
+def setup_module():
+    use_app_database("sqlite://")
+
+
+def test_static_files():
+    client = TestClient(app)
+    failures = 0
+
+    def check(ok, label):
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+
+    pdf = os.urandom(3 * 1024 * 1024)
+    relative_path, _, existed = store_upload(io.BytesIO(pdf), "timetable.pdf", settings.UPLOAD_DIR)
+    stored = os.path.join(settings.UPLOAD_DIR, relative_path)
+    os.makedirs(SCRATCH, exist_ok=True)
+    try:
+        url = "/static/uploads/" + relative_path.replace(os.sep, "/")
+        full = client.get(url)
+        check(full.headers["cache-control"] == "public, max-age=31536000, immutable", f"hashed upload: {full.headers['cache-control']}")
+        check(client.get("/static/avatar.png").headers["cache-control"] == "public, no-cache", "other files are revalidated")
+
+        resumed = client.get(url, headers={"Range": f"bytes={len(pdf) - 1000}-"})
+        check(
+            resumed.status_code == 206 and resumed.content == pdf[-1000:]
+            and resumed.headers["content-range"] == f"bytes {len(pdf) - 1000}-{len(pdf) - 1}/{len(pdf)}",
+            f"Range resumes the download -> {resumed.status_code} {resumed.headers.get('content-range')}",
+        )
+        stale = client.get(url, headers={"Range": "bytes=0-99", "If-Range": '"not-the-etag"'})
+        check(stale.status_code == 200 and len(stale.content) == len(pdf), "mismatched If-Range sends the whole file")
+        # A client that accepts gzip must get a strong tag on the (unencoded)
+        # PDF, or If-Range never matches and the download restarts
+        etag = client.get(url, headers={"Accept-Encoding": "gzip"}).headers["etag"]
+        resumed = client.get(url, headers={"Accept-Encoding": "gzip", "Range": "bytes=0-99", "If-Range": etag})
+        check(resumed.status_code == 206 and resumed.content == pdf[:100] and not resumed.headers["etag"].startswith("W/"),
+              f"If-Range with the tag a gzip client got -> {resumed.status_code}, ETag {etag}")
+
+        script = b"const schedule = " + b'{"period": 1, "subject": "Mathematics"}, ' * 2000 + b";\n"
+        with open(f"{SCRATCH}/app.js", "wb") as f:
+            f.write(script)
+        with open(f"{SCRATCH}/app.js.br", "wb") as f:
+            f.write(brotli.compress(script, quality=11))
+        with open(f"{SCRATCH}/app.js.gz", "wb") as f:
+            f.write(gzip.compress(script, 9))
+
+        br = client.get("/static/test_static_files/app.js", headers={"Accept-Encoding": "gzip, br"})
+        check(
+            br.headers.get("content-encoding") == "br" and br.headers["content-type"].startswith("text/javascript")
+            and br.content == script and "accept-encoding" in br.headers.get("vary", "").lower(),
+            f"precompressed .br served: {br.headers.get('content-length')} bytes on the wire for {len(script)}",
+        )
+        gz = client.get("/static/test_static_files/app.js", headers={"Accept-Encoding": "gzip"})
+        check(gz.headers.get("content-encoding") == "gzip" and gz.content == script, "precompressed .gz served to gzip-only clients")
+        plain = client.get("/static/test_static_files/app.js", headers={"Accept-Encoding": "identity"})
+        check("content-encoding" not in plain.headers and plain.content == script, "identity clients get the original")
+
+        revalidated = client.get(
+            "/static/test_static_files/app.js", headers={"Accept-Encoding": "gzip, br", "If-None-Match": br.headers["etag"]},
+        )
+        check(revalidated.status_code == 304 and revalidated.headers["cache-control"] == "public, no-cache", f"revalidation -> {revalidated.status_code}")
+
+        os.remove(f"{SCRATCH}/app.js.br")
+        os.remove(f"{SCRATCH}/app.js.gz")
+        on_the_fly = client.get("/static/test_static_files/app.js", headers={"Accept-Encoding": "br"})
+        check(on_the_fly.headers.get("content-encoding") == "br" and on_the_fly.content == script
+              and on_the_fly.headers["etag"].startswith("W/"), "without siblings, compressed on the fly with a weak ETag")
+    finally:
+        shutil.rmtree(SCRATCH, ignore_errors=True)
+        if not existed:
+            os.remove(stored)
+            if not os.listdir(os.path.dirname(stored)):
+                os.rmdir(os.path.dirname(stored))
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    test_static_files()
@@ -0,0 +1,95 @@
+"""
+Check /utils/upload: content-addressed storage, dedup and the size limit.
+
+Uploads go to a temporary directory; the same bytes under two names must
+come back with one URL and one stored file, and a body over
+UPLOAD_MAX_BYTES must be rejected with 413 without leaving anything behind.
+
+    python test_uploads.py
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+from bench_utils import override_settings, use_app_database
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+
+
+saved_settings = {}
+
+
+def setup_module():
+    use_app_database("sqlite://")
+    saved_settings.update(override_settings(
+        UPLOAD_DIR=tempfile.mkdtemp(prefix="test_uploads_"), UPLOAD_MAX_BYTES=2 * 1024 * 1024,
+    ))
+
+
+def teardown_module():
+    shutil.rmtree(settings.UPLOAD_DIR, ignore_errors=True)
+    override_settings(**saved_settings)
+
+
+def stored_files(root):
+    return sorted(os.path.relpath(os.path.join(d, f), root) for d, _, files in os.walk(root) for f in files)
+
+
+def test_uploads():
+    client = TestClient(app)
+    failures = 0
+
+    def check(ok, label):
+        nonlocal failures
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {label}")
+
+    data = os.urandom(1536 * 1024)
+    sha256 = hashlib.sha256(data).hexdigest()
+    first = client.post("/api/v1/utils/upload", files={"file": ("Circular.PDF", data, "application/pdf")})
+    url = first.json().get("url")
+    check(first.status_code == 200 and url == f"/static/uploads/{sha256[:2]}/{sha256}.pdf", f"stored by hash: {url}")
+
+    second = client.post("/api/v1/utils/upload", files={"file": ("copy of circular.pdf", data, "application/pdf")})
+    check(second.json().get("url") == url and len(stored_files(settings.UPLOAD_DIR)) == 1, "identical upload reuses the stored file")
+
+    with open(os.path.join(settings.UPLOAD_DIR, url[len("/static/uploads/"):]), "rb") as f:
+        check(f.read() == data, "stored bytes match the upload")
+
+    weird = client.post("/api/v1/utils/upload", files={"file": ("../../etc/passwd", b"x", "text/plain")})
+    check(weird.status_code == 200 and "/.." not in weird.json()["url"], f"client filename is not used in the path: {weird.json()['url']}")
+
+    too_large = client.post("/api/v1/utils/upload", files={"file": ("big.bin", os.urandom(3 * 1024 * 1024), "application/octet-stream")})
+    check(too_large.status_code == 413, f"over the limit -> {too_large.status_code}")
+
+    def chunked():
+        for _ in range(48):
+            yield b"x" * 65536
+
+    # No Content-Length: the limit has to be enforced while the body streams in
+    streamed = client.post(
+        "/api/v1/utils/upload", content=chunked(),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+    check(streamed.status_code == 413, f"over the limit without Content-Length -> {streamed.status_code}")
+
+    missing = client.post("/api/v1/utils/upload", files={"attachment": ("a.txt", b"x", "text/plain")})
+    check(missing.status_code == 422, f"missing file field -> {missing.status_code}")
+    not_multipart = client.post("/api/v1/utils/upload", data={"file": "not a file"})
+    check(not_multipart.status_code == 400, f"non-multipart body -> {not_multipart.status_code}")
+    check(len(stored_files(settings.UPLOAD_DIR)) == 2, "rejected uploads leave no files behind")
+
+    print("All checks passed." if not failures else f"{failures} check(s) failed.")
+    assert not failures
+
+
+if __name__ == "__main__":
+    setup_module()
+    try:
+        test_uploads()
+    finally:
+        teardown_module()
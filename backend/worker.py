@@ -0,0 +1,57 @@
+"""
+Run background job workers (see app/core/jobs.py).
+
+    python worker.py [--workers 4] [--poll-interval 1.0]
+
+Each worker is a separate process claiming jobs from the database queue,
+so any number of these can run alongside the API (and on other hosts,
+given shared JOB_FILES_DIR / REPORT_CARD_DIR storage). Stop with Ctrl+C;
+a job interrupted mid-run is picked up again once its lease expires.
+"""
+import argparse
+import logging
+import multiprocessing
+import signal
+import threading
+
+import app.api.api_v1.api  # noqa: F401 -- registers the job handlers
+from app.core.config import settings
+from app.core.jobs import run_worker
+from app.db.session import SessionLocal, engine
+
+
+def work(poll_interval: float) -> None:
+    # Connections must not be shared with the parent process
+    engine.dispose(close=False)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    run_worker(SessionLocal, stop, poll_interval=poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+
+    if args.workers == 1:
+        work(args.poll_interval)
+        return
+    processes = [
+        multiprocessing.Process(target=work, args=(args.poll_interval,), name=f"worker-{i}")
+        for i in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-import React, { createContext, useState, useEffect, useContext } from 'react';
-import { getNotifications } from '../services/api';
+import React, { createContext, useState, useEffect, useContext, useRef } from 'react';
+import { getNotifications, openNotificationSocket } from '../services/api';
 import { UserContext } from './UserContext';
 
 export const NotificationContext = createContext();
@@ -7,15 +7,35 @@ export const NotificationContext = createContext();
 export const NotificationProvider = ({ children }) => {
     const [unreadCount, setUnreadCount] = useState(0);
     const { isLoggedIn } = useContext(UserContext);
+    // Screens listening to pushed events (see subscribe)
+    const listeners = useRef(new Set());
+    // Ids already counted as read, as this device's own receipts are also
+    // pushed back to it
+    const counted = useRef(new Set());
+
+    const countRead = (id) => {
+        if (counted.current.has(id)) return;
+        counted.current.add(id);
+        setUnreadCount(prev => Math.max(0, prev - 1));
+    };
 
     useEffect(() => {
-        let interval;
-        if (isLoggedIn) {
-            fetchUnreadCount();
-            // Poll every 30 seconds
-            interval = setInterval(fetchUnreadCount, 30000);
-        }
-        return () => clearInterval(interval);
+        if (!isLoggedIn) return;
+        // The server pushes the unread count on connect and every change
+        // after it, instead of the list being refetched on a timer
+        const notify = (event, data) => listeners.current.forEach(listener => listener(event, data));
+        return openNotificationSocket({
+            unread_count: ({ count }) => setUnreadCount(count),
+            notification: (item) => {
+                setUnreadCount(prev => prev + 1);
+                notify('notification', item);
+            },
+            read: ({ id }) => {
+                countRead(id);
+                notify('read', { id });
+            },
+            reset: () => notify('reset', {}),
+        });
     }, [isLoggedIn]);
 
     const fetchUnreadCount = async () => {
@@ -32,12 +52,23 @@ export const NotificationProvider = ({ children }) => {
         setUnreadCount(count);
     };
 
-    const decrementUnreadCount = () => {
+    const decrementUnreadCount = (id) => {
+        if (id !== undefined) {
+            countRead(id);
+            return;
+        }
         setUnreadCount(prev => Math.max(0, prev - 1));
     };
 
+    // listener(event, data) is called for 'notification', 'read' and 'reset';
+    // returns a function removing it
+    const subscribe = (listener) => {
+        listeners.current.add(listener);
+        return () => listeners.current.delete(listener);
+    };
+
     return (
-        <NotificationContext.Provider value={{ unreadCount, updateUnreadCount, decrementUnreadCount, fetchUnreadCount }}>
+        <NotificationContext.Provider value={{ unreadCount, updateUnreadCount, decrementUnreadCount, fetchUnreadCount, subscribe }}>
             {children}
         </NotificationContext.Provider>
     );
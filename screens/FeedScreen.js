@@ -11,7 +11,7 @@ import {
   ActivityIndicator
 } from 'react-native';
 import { Ionicons } from '@expo/vector-icons';
-import { getFeeds } from '../services/api';
+import { getFeeds, imageVariant } from '../services/api';
 
 const { width } = Dimensions.get('window');
 
@@ -66,7 +66,7 @@ const FeedScreen = ({ navigation }) => {
             pagingEnabled
             showsHorizontalScrollIndicator={false}
             renderItem={({ item: img }) => (
-              <Image source={{ uri: img }} style={styles.feedImage} />
+              <Image source={{ uri: imageVariant(img, 'medium') }} style={styles.feedImage} />
             )}
             onScroll={(e) => handleScroll(e, item.id)}
             scrollEventThrottle={16}
@@ -1,21 +1,28 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { View, Text, StyleSheet, TouchableOpacity, FlatList, ActivityIndicator, Linking } from 'react-native';
 import { Ionicons } from '@expo/vector-icons';
 import { getNotifications, markNotificationAsRead } from '../services/api';
 import { NotificationContext } from '../contexts/NotificationContext';
-import { useFocusEffect } from '@react-navigation/native';
 
 export default function NotificationsScreen({ navigation }) {
     const [notifications, setNotifications] = useState([]);
     const [loading, setLoading] = useState(true);
-    const { decrementUnreadCount, fetchUnreadCount } = React.useContext(NotificationContext);
+    const { decrementUnreadCount, subscribe } = React.useContext(NotificationContext);
 
-    useFocusEffect(
-        React.useCallback(() => {
-            fetchNotifications();
-            fetchUnreadCount();
-        }, [])
-    );
+    // Loaded once; new notifications and reads on other devices are pushed
+    // through NotificationContext instead of refetching on every visit
+    useEffect(() => {
+        fetchNotifications();
+        return subscribe((event, data) => {
+            if (event === 'notification') {
+                setNotifications(prev => prev.some(item => item.id === data.id) ? prev : [data, ...prev]);
+            } else if (event === 'read') {
+                setNotifications(prev => prev.map(item => item.id === data.id ? { ...item, is_read: true } : item));
+            } else if (event === 'reset') {
+                fetchNotifications();
+            }
+        });
+    }, []);
 
     const fetchNotifications = async () => {
         try {
@@ -36,7 +43,7 @@ export default function NotificationsScreen({ navigation }) {
                 prev.map(item => item.id === id ? { ...item, is_read: true } : item)
             );
             // Update global count
-            decrementUnreadCount();
+            decrementUnreadCount(id);
         } catch (error) {
             console.log("Failed to mark as read", error);
         }
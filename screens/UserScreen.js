@@ -2,6 +2,7 @@ import React, { useContext, useEffect, useState } from "react";
 import { View, Text, Image, StyleSheet, ScrollView, ActivityIndicator, RefreshControl } from "react-native";
 import { User, Users, Home, MapPin, Phone } from "lucide-react-native";
 import { UserContext } from "../contexts/UserContext";
+import { imageVariant } from "../services/api";
 import { getUserProfile } from "../services/api";
 
 export default function UserScreen() {
@@ -53,7 +54,7 @@ export default function UserScreen() {
       {/* Header */}
       <View style={styles.header}>
         <Image
-          source={profile?.photo_url ? { uri: profile.photo_url } : require("../assets/avatar.png")}
+          source={profile?.photo_url ? { uri: imageVariant(profile.photo_url, "thumbnail") } : require("../assets/avatar.png")}
           style={styles.avatar}
         />
         <Text style={styles.name}>{user?.full_name || 'Student Name'}</Text>
@@ -2,6 +2,86 @@ import { Alert } from 'react-native';
 
 const API_URL = 'http://127.0.0.1:8000/api/v1'; // Use localhost for Simulator
 
+// Tokens from the last login; sent as a Bearer header on authenticated calls
+let accessToken = null;
+let refreshToken = null;
+
+// Refresh tokens are single use, so calls failing together share one refresh
+// rather than each presenting the same token (which the server treats as a
+// replay and answers by revoking the whole session)
+let refreshing = null;
+
+const refreshTokens = () => {
+    if (!refreshing) {
+        refreshing = fetch(`${API_URL}/auth/refresh`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ refresh_token: refreshToken }),
+        })
+            .then(async (refreshed) => {
+                if (!refreshed.ok) return false;
+                const tokens = await refreshed.json();
+                accessToken = tokens.access_token;
+                refreshToken = tokens.refresh_token;
+                return true;
+            })
+            .finally(() => {
+                refreshing = null;
+            });
+    }
+    return refreshing;
+};
+
+const authFetch = async (url, options = {}) => {
+    const withAuth = (token) => fetch(url, {
+        ...options,
+        headers: { ...options.headers, Authorization: `Bearer ${token}` },
+    });
+    const sentToken = accessToken;
+    let response = await withAuth(sentToken);
+    // Access tokens are short-lived: rotate the refresh token once and retry,
+    // unless another call already did while this one was in flight
+    if (response.status === 401 && refreshToken) {
+        if (accessToken !== sentToken || await refreshTokens()) {
+            response = await withAuth(accessToken);
+        }
+    }
+    return response;
+};
+
+// Last body and ETag per URL; unchanged resources come back as an empty 304
+const etagCache = new Map();
+
+const conditionalGet = async (url, fetcher, errorMessage) => {
+    const headers = {
+        'Content-Type': 'application/json',
+    };
+    const cached = etagCache.get(url);
+    if (cached) {
+        headers['If-None-Match'] = cached.etag;
+    }
+    const response = await fetcher(url, {
+        method: 'GET',
+        headers,
+    });
+
+    if (response.status === 304 && cached) {
+        return cached.data;
+    }
+
+    const data = await response.json();
+
+    if (!response.ok) {
+        throw new Error(data.detail || errorMessage);
+    }
+
+    const etag = response.headers.get('ETag');
+    if (etag) {
+        etagCache.set(url, { etag, data });
+    }
+    return data;
+};
+
 const timeout = (ms, promise) => {
     return new Promise((resolve, reject) => {
         setTimeout(() => {
@@ -30,6 +110,8 @@ export const loginUser = async (email, password) => {
             throw new Error(data.detail || data.error || 'Login failed');
         }
 
+        accessToken = data.access_token;
+        refreshToken = data.refresh_token;
         return data;
     } catch (error) {
         console.error('Login Error:', error);
@@ -114,20 +196,7 @@ export const getUserProfile = async (email) => {
 
 export const getEvents = async () => {
     try {
-        const response = await fetch(`${API_URL}/events/`, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-        });
-
-        const data = await response.json();
-
-        if (!response.ok) {
-            throw new Error(data.detail || 'Failed to fetch events');
-        }
-
-        return data;
+        return await conditionalGet(`${API_URL}/events/`, fetch, 'Failed to fetch events');
     } catch (error) {
         console.error('Get Events Error:', error);
         throw error;
@@ -136,20 +205,7 @@ export const getEvents = async () => {
 
 export const getFees = async () => {
     try {
-        const response = await fetch(`${API_URL}/fees/`, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-        });
-
-        const data = await response.json();
-
-        if (!response.ok) {
-            throw new Error(data.detail || 'Failed to fetch fees');
-        }
-
-        return data;
+        return await conditionalGet(`${API_URL}/fees/`, authFetch, 'Failed to fetch fees');
     } catch (error) {
         console.error('Get Fees Error:', error);
         throw error;
@@ -158,20 +214,7 @@ export const getFees = async () => {
 
 export const getAttendance = async () => {
     try {
-        const response = await fetch(`${API_URL}/attendance/`, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-        });
-
-        const data = await response.json();
-
-        if (!response.ok) {
-            throw new Error(data.detail || 'Failed to fetch attendance');
-        }
-
-        return data;
+        return await conditionalGet(`${API_URL}/attendance/`, fetch, 'Failed to fetch attendance');
     } catch (error) {
         console.error('Get Attendance Error:', error);
         throw error;
@@ -180,20 +223,7 @@ export const getAttendance = async () => {
 
 export const getTimetable = async () => {
     try {
-        const response = await fetch(`${API_URL}/timetable/`, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-        });
-
-        const data = await response.json();
-
-        if (!response.ok) {
-            throw new Error(data.detail || 'Failed to fetch timetable');
-        }
-
-        return data;
+        return await conditionalGet(`${API_URL}/timetable/`, authFetch, 'Failed to fetch timetable');
     } catch (error) {
         console.error('Get Timetable Error:', error);
         throw error;
@@ -202,20 +232,7 @@ export const getTimetable = async () => {
 
 export const getResults = async () => {
     try {
-        const response = await fetch(`${API_URL}/results/`, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-        });
-
-        const data = await response.json();
-
-        if (!response.ok) {
-            throw new Error(data.detail || 'Failed to fetch results');
-        }
-
-        return data;
+        return await conditionalGet(`${API_URL}/results/`, fetch, 'Failed to fetch results');
     } catch (error) {
         console.error('Get Results Error:', error);
         throw error;
@@ -224,7 +241,7 @@ export const getResults = async () => {
 
 export const getNotifications = async () => {
     try {
-        const response = await fetch(`${API_URL}/notifications/`, {
+        const response = await authFetch(`${API_URL}/notifications/`, {
             method: 'GET',
             headers: {
                 'Content-Type': 'application/json',
@@ -246,7 +263,7 @@ export const getNotifications = async () => {
 
 export const markNotificationAsRead = async (id) => {
     try {
-        const response = await fetch(`${API_URL}/notifications/${id}/read`, {
+        const response = await authFetch(`${API_URL}/notifications/${id}/read`, {
             method: 'PUT',
             headers: {
                 'Content-Type': 'application/json',
@@ -266,24 +283,74 @@ export const markNotificationAsRead = async (id) => {
     }
 };
 
-export const getFeeds = async () => {
-    try {
-        const response = await fetch(`${API_URL}/feed/`, {
-            method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-        });
-
-        const data = await response.json();
-
-        if (!response.ok) {
-            throw new Error(data.detail || 'Failed to fetch feeds');
+// Live notification events over a WebSocket: 'notification', 'read',
+// 'unread_count' and 'reset' (refetch). `handlers` maps event names to
+// callbacks taking the event data. Reconnects by itself, resuming from the
+// last event seen; returns a function closing the socket for good.
+export const openNotificationSocket = (handlers) => {
+    let socket = null;
+    let lastEventId = null;
+    let closed = false;
+    let retryDelay = 1000;
+
+    const open = () => {
+        if (closed) return;
+        const params = [`access_token=${encodeURIComponent(accessToken || '')}`];
+        if (lastEventId) {
+            params.push(`last_event_id=${encodeURIComponent(lastEventId)}`);
         }
+        socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/notifications/ws?${params.join('&')}`);
+        socket.onopen = () => {
+            retryDelay = 1000;
+        };
+        socket.onmessage = ({ data }) => {
+            const message = JSON.parse(data);
+            if (message.id) {
+                lastEventId = message.id;
+            }
+            const handler = handlers[message.event];
+            if (handler) {
+                handler(message.data);
+            }
+        };
+        socket.onclose = async ({ code }) => {
+            if (closed) return;
+            // The server ends the stream when the access token expires (1000)
+            // or rejects one (1008): any authenticated call refreshes it
+            if (code === 1000 || code === 1008) {
+                try {
+                    await authFetch(`${API_URL}/notifications/?limit=1`);
+                } catch (error) {
+                    console.log('Token refresh before reconnecting failed', error);
+                }
+            }
+            setTimeout(open, retryDelay);
+            retryDelay = Math.min(retryDelay * 2, 30000);
+        };
+    };
+
+    open();
+    return () => {
+        closed = true;
+        socket.close();
+    };
+};
 
-        return data;
+export const getFeeds = async () => {
+    try {
+        return await conditionalGet(`${API_URL}/feed/`, fetch, 'Failed to fetch feeds');
     } catch (error) {
         console.error('Get Feeds Error:', error);
         throw error;
     }
 };
+
+// Resized WebP copy of an image served from the backend's /static folder
+// ('thumbnail' or 'medium'); other URLs and bundled assets pass through
+export const imageVariant = (url, variant) => {
+    if (!url || !url.includes('/static/')) {
+        return url;
+    }
+    const absolute = url.startsWith('/') ? API_URL.replace(/\/api\/v1$/, '') + url : url;
+    return `${absolute}${absolute.includes('?') ? '&' : '?'}variant=${variant}`;
+};